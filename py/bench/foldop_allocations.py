@@ -0,0 +1,48 @@
+#! -*- coding: utf-8 -*-
+
+"""measure peak bytes allocated per Fold comparison, foldop of baseline revision against current foldop
+
+usage: python bench/foldop_allocations.py [revision], revision defaults to the parent of the commit interning NULL/TRUE/FALSE
+"""
+
+import sys
+import subprocess
+import tracemalloc
+
+sys.path.insert(0, 'src')
+
+from theTop.nullable import foldop
+
+N = 100000
+REVISION = '935a541^'
+PATH = 'py/src/theTop/nullable/foldop.py'
+
+def load_foldop(revision):
+    """foldop module as of git revision, imported beside nullable so its relative imports resolve"""
+    source = subprocess.check_output(['git', 'show', '%s:%s' % (revision, PATH)])
+    name = 'theTop.nullable._foldop_%s' % ''.join(c if c.isalnum() else '_' for c in revision)
+    module = type(sys)(name)
+    module.__package__ = 'theTop.nullable'
+    module.__file__ = '%s:%s' % (revision, PATH)
+    sys.modules[name] = module
+    exec(compile(source, module.__file__, 'exec'), module.__dict__)
+    return module
+
+def peak(f):
+    """peak traced bytes per call while all N results are kept alive"""
+    values = [(i, (None if i % 3 == 0 else i + 1)) for i in range(N)]
+    results = [None] * N
+    f(*values[0])
+    tracemalloc.start()
+    if hasattr(tracemalloc, 'reset_peak'): tracemalloc.reset_peak()
+    for (i, (a, b)) in enumerate(values): results[i] = f(a, b)
+    (current, top) = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del results
+    return top / N
+
+if __name__ == '__main__':
+    revision = sys.argv[1] if len(sys.argv) > 1 else REVISION
+    baseline = load_foldop(revision)
+    for (name, f) in ((revision, baseline.lt), ('current', foldop.lt)):
+        print('%-10s %7.2f peak bytes per comparison' % (name, peak(f)))
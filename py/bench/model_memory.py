@@ -0,0 +1,49 @@
+#! -*- coding: utf-8 -*-
+
+"""measure retained bytes per model node of typical query expressions and tables"""
+
+import sys
+import tracemalloc
+
+sys.path.insert(0, 'src')
+
+from theTop.model import models
+from theTop.model import the, T, op
+
+N = 20000
+
+def predicate(i):
+    return op.And(the.PRICE * the.QTY > i, the.NAME.like('a%'), the.ID.in_([i, i + 1]), the.CREATED.year == 2020)
+
+def query(i):
+    return T['ORDERS'].where(the.QTY > i).define(TOTAL=the.PRICE * the.QTY).include('ID', 'TOTAL')
+
+def nodes(m, seen=None):
+    """count model instances reachable from m"""
+    seen = set() if seen is None else seen
+    if id(m) in seen: return 0
+    seen.add(id(m))
+    n = 1 if isinstance(m, models.Model) else 0
+    if isinstance(m, (list, tuple)): children = m
+    elif isinstance(m, dict): children = list(m.values())
+    elif isinstance(m, models.Model):
+        names = [s for c in type(m).__mro__ for s in getattr(c, '__slots__', ())]
+        values = [getattr(m, s, None) for s in names] + list(getattr(m, '__dict__', {}).values())
+        children = [v for v in values if isinstance(v, (models.Model, list, tuple, dict))]
+    else: children = ()
+    return n + sum(nodes(c, seen) for c in children)
+
+def measure(f):
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    results = [f(i) for i in range(N)]
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    size = sum(s.size_diff for s in after.compare_to(before, 'filename'))
+    count = sum(nodes(m) for m in results)
+    return (size / count, count / N)
+
+if __name__ == '__main__':
+    for (name, f) in (('predicate', predicate), ('query', query)):
+        (size, count) = measure(f)
+        print('%-10s %6.1f bytes per node (%d nodes each)' % (name, size, count))
@@ -1,5 +1,6 @@
-from functools import cached_property
+from ..util import assert_slotty, cached_slot
 from ..nullable import nullop
+from ..nullable import castop
 
 ##########
 #  Model Rules
@@ -27,9 +28,13 @@ def expr_as_text(expr):
     # return expr.emit(sql.SqlTextEmitter())
     return ''
 
+def fingerprint(m, constants=True):
+    from . import structure
+    return structure.fingerprint(m, constants)
+
 def eval_expr(expr, **kwargs):
-    from . import evaluator
-    return expr.emit(evaluator.Evaluator(items=kwargs, params=kwargs))
+    from ..sql import evaluator
+    return evaluator.compile_expr(expr)(kwargs, kwargs)
 
 def defined_labels(labels, deflist):
     if labels is None: raise Exception('Cannot determine defined_labels')
@@ -113,19 +118,22 @@ def can_assign(x):
         HostItem))
 
 class Model(object):
+    __slots__ = ('_cache',)
     def emit(self, emitter): raise NotImplementedError()
     def emit_part(self, emitter): return emitter.inner(emitter, self, None)
     def _inner(self, emitter, x): return emitter.inner(emitter, x, self)
     def _inners(self, emitter, xs): return [emitter.inner(emitter, x, self) for x in xs]
+    fingerprint = fingerprint
     __str__ = expr_as_text
     def __repr__(self): return '%s { %s }' % (type(self).__name__, expr_as_text(self))
 
 class Associate(Model):
-    model = None
+    __slots__ = ('model',)
     def __init__(self, model): self.model = model
     def emit(self, emitter): return emitter.Associate(emitter._inner(self.model))
 
 class Composite(Model):
+    __slots__ = ()
     def _compose_inner(self, composer, x): composer.inner(composer, x, self)
     def emit(self, emitter):
         composer = emitter.composer()
@@ -427,15 +435,18 @@ def params(m):
     return emitter.params
 
 class Expression(Model):
+    __slots__ = ()
     eval = eval_expr
 
 class Containable(object):
+    __slots__ = ()
     def contains(self, value): return self._contains(self, make(value))
     def _contains(self, value): return IsIn(value, self)
     def not_contains(self, value): return self._not_contains(self, make(value))
     def _not_contains(self, value): return NotIn(value, self)
 
 class Boolean(Expression):
+    __slots__ = ()
     def and_(self, other):
         other = make(other)
         if isinstance(other, And): return other._rand_(self)
@@ -446,9 +457,10 @@ class Boolean(Expression):
         if isinstance(other, Or): return other._ror_(self)
         return self._or_(other)
     def _or_(self, other): return Or([self, other])
-    not_ = cached_property(lambda self: Not(self))
+    not_ = cached_slot(lambda self: Not(self))
 
 class Comparable(Expression):
+    __slots__ = ()
     def __lt__(self, other): return Comparison.lt(self, make(other))
     def __le__(self, other): return Comparison.le(self, make(other))
     def __eq__(self, other): return Comparison.eq(self, make(other))
@@ -462,10 +474,11 @@ class Comparable(Expression):
             Comparison.lt(self, make(afterlast))])
     def in_(self, S): return make(S)._contains(self)
     def not_in_(self, S): return make(S)._not_contains(self)
-    is_null = cached_property(lambda self: IsNull(self))
-    is_not_null = cached_property(lambda self: NotNull(self))
+    is_null = cached_slot(lambda self: IsNull(self))
+    is_not_null = cached_slot(lambda self: NotNull(self))
 
 class ExpressionList(Comparable, Containable):
+    __slots__ = ('exprs',)
     def __init__(self, exprs): self.exprs = exprs
     def __bool__(self): return bool(self.exprs)
     __nonzero__ = __bool__
@@ -475,6 +488,7 @@ class ExpressionList(Comparable, Containable):
     def emit(self, emitter): return emitter.ExpressionList(self._inners(emitter, self.exprs))
 
 class Numeric(Comparable):
+    __slots__ = ()
     def __neg__(self): return Neg(self)
     def __pos__(self): return Pos(self)
     def __abs__(self): return Call('ABS', [self])
@@ -502,6 +516,7 @@ class Numeric(Comparable):
     def __rmod__(self, other): return Call('MOD', [make(other), self])
 
 class String(Comparable):
+    __slots__ = ()
     def append(self, suffix):
         if isinstance(suffix, Concat): return suffix.prepend(self)
         return Concat([self, make(suffix)])
@@ -524,6 +539,7 @@ class String(Comparable):
         return Like(self, pattern, escape)
 
 class DateTimePart(Numeric):
+    __slots__ = ('date', 'part')
     (YEAR, MONTH, DAY, HOUR, MINUTE, SECOND, MICROSECOND) = range(7)
     (yearof, monthof, dayof, hourof, minuteof, secondof, microsecondof) = [
         (lambda p: staticmethod(lambda d: DateTimePart(make(d), p)))(p)
@@ -536,15 +552,16 @@ class DateTimePart(Numeric):
         return emitter.DateTimePart(date, self.part)
 
 class DateTime(Comparable):
+    __slots__ = ()
     def date(self): return self.daystart
     # part
-    year = cached_property(DateTimePart.yearof)
-    month = cached_property(DateTimePart.monthof)
-    day = cached_property(DateTimePart.dayof)
-    hour = cached_property(DateTimePart.hourof)
-    minute = cached_property(DateTimePart.minuteof)
-    second = cached_property(DateTimePart.secondof)
-    microsecond = cached_property(DateTimePart.microsecondof)
+    year = cached_slot(DateTimePart.yearof)
+    month = cached_slot(DateTimePart.monthof)
+    day = cached_slot(DateTimePart.dayof)
+    hour = cached_slot(DateTimePart.hourof)
+    minute = cached_slot(DateTimePart.minuteof)
+    second = cached_slot(DateTimePart.secondof)
+    microsecond = cached_slot(DateTimePart.microsecondof)
     # start
     def yearstart(self): return PeriodStart(self, DateTimePart.YEAR, 0)
     def monthstart(self): return PeriodStart(self, DateTimePart.MONTH, 0)
@@ -557,6 +574,7 @@ class DateTime(Comparable):
     def hh_mm_ss(self, sep=':'): return HH_MM_SS(self, sep)
 
 class PeriodStart(DateTime):
+    __slots__ = ('date', 'part', 'offset')
     def __init__(self, date, part, offset):
         self.date = date
         self.part = part
@@ -569,6 +587,7 @@ class PeriodStart(DateTime):
         return emitter.PeriodStart(date, self.part, offset)
 
 class YYYY_MM_DD(String):
+    __slots__ = ('date', 'sep')
     def __init__(self, date, sep):
         self.date = date
         self.sep = sep
@@ -579,6 +598,7 @@ class YYYY_MM_DD(String):
             self._inner(emitter, self.sep))
 
 class HH_MM_SS(String):
+    __slots__ = ('date', 'sep')
     def __init__(self, date, sep):
         self.date = date
         self.sep = sep
@@ -589,6 +609,7 @@ class HH_MM_SS(String):
             self._inner(emitter, self.sep))
 
 class Generic(Numeric, String, Boolean, DateTime):
+    __slots__ = ()
     def __add__(self, other):
         if isinstance(other, str): return String.__add__(self, other)
         return Numeric.__add__(self, other)
@@ -597,12 +618,14 @@ class Generic(Numeric, String, Boolean, DateTime):
         return Numeric.__radd__(self, other)
 
 class Parentheses(Generic):
+    __slots__ = ('x',)
     def __init__(self, x): self.x = x
     def emit(self, emitter):
         x = self._inner(emitter, self.x)
         return emitter.Parentheses(x)
 
 class Constant(Generic):
+    __slots__ = ('constant',)
     def __init__(self, constant):
         Generic.__init__(self)
         self.constant = constant
@@ -614,6 +637,7 @@ TRUE = Constant(True)
 FALSE = Constant(False)
 
 class Value(Generic):
+    __slots__ = ('value',)
     def __init__(self, value):
         Generic.__init__(self)
         self.value = value
@@ -621,6 +645,7 @@ class Value(Generic):
         return emitter.Value(self.value)
 
 class Item(Generic):
+    __slots__ = ('name',)
     def __init__(self, name):
         Generic.__init__(self)
         self.name = name
@@ -628,6 +653,7 @@ class Item(Generic):
         return emitter.Item(self.name)
 
 class HostItem(Generic):
+    __slots__ = ('name',)
     def __init__(self, name):
         Generic.__init__(self)
         self.name = name
@@ -635,6 +661,7 @@ class HostItem(Generic):
         return emitter.HostItem(self.name)
 
 class Parameter(Generic):
+    __slots__ = ('name',)
     def __init__(self, name):
         Generic.__init__(self)
         self.name = name
@@ -642,6 +669,7 @@ class Parameter(Generic):
         return emitter.Parameter(self.name)
 
 class Call(Generic):
+    __slots__ = ('name', 'args')
     def __init__(self, name, args):
         Generic.__init__(self)
         self.name = name
@@ -651,15 +679,19 @@ class Call(Generic):
         return emitter.Call(self.name, args)
 
 class Cast(Generic):
+    __slots__ = ('value', 'type')
     def __init__(self, value, type):
         Generic.__init__(self)
         self.value = value
         self.type = type
+    @property
+    def converter(self): return castop.converter(self.type)
     def emit(self, emitter):
         v = self._inner(emitter, self.value)
         return emitter.Cast(v, self.type)
 
 class CaseBase(Generic):
+    __slots__ = ()
     def _inner_cases(self, emitter):
         return [(self._inner(emitter, w),
                  self._inner(emitter, t))
@@ -668,6 +700,7 @@ class CaseBase(Generic):
         return self._inner(emitter, self.whenelse)
 
 class Case(CaseBase):
+    __slots__ = ('cases', 'whenelse')
     def __init__(self, cases, whenelse):
         self.cases = cases
         self.whenelse = whenelse
@@ -677,6 +710,7 @@ class Case(CaseBase):
         return emitter.Case(cases, whenelse)
 
 class Switch(CaseBase):
+    __slots__ = ('switch', 'cases', 'whenelse')
     def __init__(self, switch, cases, whenelse):
         self.switch = switch
         self.cases = cases
@@ -688,6 +722,7 @@ class Switch(CaseBase):
         return emitter.Switch(switch, cases, whenelse)
 
 class Neg(Numeric):
+    __slots__ = ('n',)
     def __init__(self, n):
         Numeric.__init__(self)
         self.n = n
@@ -696,6 +731,7 @@ class Neg(Numeric):
         return emitter.Neg(n)
 
 class Pos(Numeric):
+    __slots__ = ('n',)
     def __init__(self, n):
         Numeric.__init__(self)
         self.n = n
@@ -704,6 +740,7 @@ class Pos(Numeric):
         return emitter.Pos(n)
 
 class Summarize(Numeric):
+    __slots__ = ('N',)
     def __init__(self, N):
         Numeric.__init__(self)
         self.N = N
@@ -718,6 +755,7 @@ class Summarize(Numeric):
         return emitter.Summarize(N)
 
 class Sub(Numeric):
+    __slots__ = ('n1', 'n2')
     def __init__(self, n1, n2):
         Numeric.__init__(self)
         self.n1 = n1
@@ -728,6 +766,7 @@ class Sub(Numeric):
         return emitter.Sub(n1, n2)
 
 class Multiply(Numeric):
+    __slots__ = ('N',)
     def __init__(self, N):
         Numeric.__init__(self)
         self.N = N
@@ -742,6 +781,7 @@ class Multiply(Numeric):
         return emitter.Multiply(N)
 
 class Div(Numeric):
+    __slots__ = ('n1', 'n2')
     def __init__(self, n1, n2):
         Numeric.__init__(self)
         self.n1 = n1
@@ -752,6 +792,7 @@ class Div(Numeric):
         return emitter.Div(n1, n2)
 
 class Concat(String):
+    __slots__ = ('S',)
     def __init__(self, S):
         String.__init__(self)
         self.S = S
@@ -766,6 +807,7 @@ class Concat(String):
         return emitter.Concat(S)
 
 class Comparison(Boolean):
+    __slots__ = ('op', 'a', 'b')
     (LT, LE, EQ, NE, GE, GT) = range(6)
     (lt, le, eq, ne, ge, gt) = [
         (lambda i: staticmethod(lambda a, b: Comparison(i, a, b)))(i)
@@ -783,6 +825,7 @@ class Comparison(Boolean):
         return emitter.Comparison(self.op, a, b)
 
 class Between(Boolean):
+    __slots__ = ('a', 'lo', 'hi')
     def __init__(self, a, lo, hi):
         Boolean.__init__(self)
         self.a = a
@@ -795,6 +838,7 @@ class Between(Boolean):
         return emitter.Between(a, lo, hi)
 
 class IsNull(Boolean):
+    __slots__ = ('a',)
     def __init__(self, a):
         Boolean.__init__(self)
         self.a = a
@@ -803,6 +847,7 @@ class IsNull(Boolean):
         return emitter.IsNull(a)
 
 class NotNull(Boolean):
+    __slots__ = ('a',)
     def __init__(self, a):
         Boolean.__init__(self)
         self.a = a
@@ -811,6 +856,7 @@ class NotNull(Boolean):
         return emitter.NotNull(a)
 
 class IsIn(Boolean):
+    __slots__ = ('a', 'S')
     def __init__(self, a, S):
         Boolean.__init__(self)
         self.a = a
@@ -821,6 +867,7 @@ class IsIn(Boolean):
         return emitter.IsIn(a, S)
 
 class NotIn(Boolean):
+    __slots__ = ('a', 'S')
     def __init__(self, a, S):
         Boolean.__init__(self)
         self.a = a
@@ -831,6 +878,7 @@ class NotIn(Boolean):
         return emitter.NotIn(a, S)
 
 class Like(Boolean):
+    __slots__ = ('s', 'pattern', 'escape')
     def __init__(self, s, pattern, escape=NotImplemented):
         Boolean.__init__(self)
         self.s = s
@@ -843,6 +891,7 @@ class Like(Boolean):
         return emitter.Like(s, pattern, esc)
 
 class And(Boolean):
+    __slots__ = ('B',)
     def __init__(self, B):
         Boolean.__init__(self)
         self.B = B
@@ -857,6 +906,7 @@ class And(Boolean):
         return emitter.And(B)
 
 class Or(Boolean):
+    __slots__ = ('B',)
     def __init__(self, B):
         Boolean.__init__(self)
         self.B = B
@@ -871,6 +921,7 @@ class Or(Boolean):
         return emitter.Or(B)
 
 class Not(Boolean):
+    __slots__ = ('b',)
     def __init__(self, b):
         Boolean.__init__(self)
         self.b = b
@@ -879,44 +930,52 @@ class Not(Boolean):
         return emitter.Not(b)
 
 class Now(DateTime):
+    __slots__ = ()
     def emit(self, emitter): return emitter.Now()
 
 class NextVal(Numeric):
+    __slots__ = ('sequence',)
     def __init__(self, sequence): self.sequence = sequence
     def emit(self, emitter): return emitter.NextVal(self.sequence)
 
 class ComparableAspect(Composite, Comparable):
+    __slots__ = ('table',)
     def __init__(self, t): self.table = t
 
 class AllValue(ComparableAspect):
+    __slots__ = ()
     def compose(self, composer):
         self._compose_inner(composer, self.table)
         composer.AllValue()
 
 class AnyValue(ComparableAspect):
+    __slots__ = ()
     def compose(self, composer):
         self._compose_inner(composer, self.table)
         composer.AnyValue()
 
 class Existence(Composite, Boolean):
+    __slots__ = ('table',)
     def __init__(self, t): self.table = t
     def compose(self, composer):
         self._compose_inner(composer, self.table)
         composer.Existence()
 
 class Count(Composite, Numeric):
+    __slots__ = ('table',)
     def __init__(self, t): self.table = t
     def compose(self, composer):
         self._compose_inner(composer, self.table)
         composer.Count()
 
 class Table(Composite, Generic, Containable):
+    __slots__ = ()
     origin = None
-    all = cached_property(AllValue)
-    any = cached_property(AnyValue)
-    exists = cached_property(Existence)
-    not_exists = cached_property(lambda self: self.exists.not_)
-    count = cached_property(Count)
+    all = cached_slot(AllValue)
+    any = cached_slot(AnyValue)
+    exists = cached_slot(Existence)
+    not_exists = cached_slot(lambda self: self.exists.not_)
+    count = cached_slot(Count)
     def qualify(self): return Qualify(self)
     def alias(self, alias): return Alias(self, alias)
     def nest(self, alias=None): return Nest(self, alias)
@@ -949,19 +1008,22 @@ class Table(Composite, Generic, Containable):
     def merging(self, source, inserting=None): return Merging(self, make(source), make(inserting))
 
 class Origin(Table):
+    __slots__ = ()
     origin = property(lambda self: self)
 
 class Derivative(Table):
-    origin = cached_property(lambda self: self.parent.origin)
+    __slots__ = ('parent',)
+    origin = cached_slot(lambda self: self.parent.origin)
     def __init__(self, parent): self.parent = parent
 
 class Distinct(Derivative):
+    __slots__ = ()
     def compose(self, composer):
         self._compose_inner(composer, self.parent)
         composer.Distinct()
 
 class OrderBy(Derivative):
-    orderbys = None  # [ expr ]
+    __slots__ = ('orderbys',)  # [ expr ]
     def __init__(self, parent, orderbys):
         Derivative.__init__(self, parent)
         self.orderbys = orderbys
@@ -970,6 +1032,7 @@ class OrderBy(Derivative):
         composer.OrderBy(self.orderbys)
 
 class Slice(Derivative):
+    __slots__ = ('first', 'afterlast')
     def __init__(self, parent, first, afterlast):
         Derivative.__init__(self, parent)
         self.first = first
@@ -979,16 +1042,19 @@ class Slice(Derivative):
         composer.Slice(self.first, self.afterlast)
 
 class Primary(Origin):
+    __slots__ = ('name',)
     def __init__(self, name): self.name = name
     def compose(self, composer): composer.Primary(self.name)
 
 class Qualify(Origin):
+    __slots__ = ('parent',)
     def __init__(self, parent): self.parent = parent
     def compose(self, composer):
         self._compose_inner(composer, self.parent)
         composer.Qualify()
 
 class Alias(Origin):
+    __slots__ = ('parent', 'alias')
     def __init__(self, parent, alias):
         self.parent = parent
         self.alias = alias
@@ -997,6 +1063,7 @@ class Alias(Origin):
         composer.Alias(self.alias)
 
 class Nest(Origin):
+    __slots__ = ('parent', 'alias')
     def __init__(self, parent, alias):
         self.parent = parent
         self.alias = alias
@@ -1005,7 +1072,7 @@ class Nest(Origin):
         composer.Nest(self.alias)
 
 class Include(Derivative):
-    inclusions = None  # [ 'name' ]
+    __slots__ = ('inclusions',)  # [ 'name' ]
     def __init__(self, parent, inclusions):
         Derivative.__init__(self, parent)
         self.inclusions = inclusions
@@ -1014,7 +1081,7 @@ class Include(Derivative):
         composer.Include(self.inclusions)
 
 class Exclude(Derivative):
-    exclusions = None  # [ 'name' ]
+    __slots__ = ('exclusions',)  # [ 'name' ]
     def __init__(self, parent, exclusions):
         Derivative.__init__(self, parent)
         self.exclusions = exclusions
@@ -1023,11 +1090,12 @@ class Exclude(Derivative):
         composer.Exclude(self.exclusions)
 
 class Arrange(Derivative):
+    __slots__ = ()
     deflist = None
     deforder = None
 
 class Rename(Arrange):
-    renamings = None  # { 'old': 'name' }
+    __slots__ = ('renamings',)  # { 'old': 'name' }
     def __init__(self, parent, renamings):
         Arrange.__init__(self, parent)
         self.renamings = renamings
@@ -1036,8 +1104,8 @@ class Rename(Arrange):
         composer.Rename(self.renamings)
 
 class Define(Arrange):
-    deflist = None  # [('name', expr)]
-    defdict = cached_property(lambda self: dict(self.deflist))
+    __slots__ = ('deflist',)  # [('name', expr)]
+    defdict = cached_slot(lambda self: dict(self.deflist))
     def __init__(self, parent, deflist):
         Arrange.__init__(self, parent)
         self.deflist = deflist
@@ -1046,8 +1114,8 @@ class Define(Arrange):
         composer.Define(self.deflist)
 
 class Redefine(Arrange):
-    deflist = None  # [('name', expr)]
-    defdict = cached_property(lambda self: dict(self.deflist))
+    __slots__ = ('deflist',)  # [('name', expr)]
+    defdict = cached_slot(lambda self: dict(self.deflist))
     def __init__(self, parent, deflist):
         Arrange.__init__(self, parent)
         self.deflist = deflist
@@ -1056,9 +1124,11 @@ class Redefine(Arrange):
         composer.Redefine(self.deflist)
 
 class Filter(Derivative):
+    __slots__ = ()
     pass
 
 class Where(Filter):
+    __slots__ = ('predicate',)
     def __init__(self, parent, predicate):
         Filter.__init__(self, parent)
         self.predicate = predicate
@@ -1067,7 +1137,7 @@ class Where(Filter):
         composer.Where(self.predicate)
 
 class Group(Origin):
-    groupbys = None  # ['name']
+    __slots__ = ('parent', 'groupbys')  # ['name']
     def __init__(self, parent, groupbys):
         self.parent = parent
         self.groupbys = groupbys
@@ -1076,7 +1146,7 @@ class Group(Origin):
         composer.Group(self.groupbys)
 
 class Assign(Derivative):
-    assignments = None  # { 'name': expr }
+    __slots__ = ('assignments',)  # { 'name': expr }
     def __init__(self, parent, assignments):
         Derivative.__init__(self, parent)
         self.assignments = assignments
@@ -1085,7 +1155,7 @@ class Assign(Derivative):
         composer.Assign(self.assignments)
 
 class Union(Origin):
-    tables = None  # [ table ]
+    __slots__ = ('tables',)  # [ table ]
     def __init__(self, tables):
         self.tables = tables
     def union(self, other):
@@ -1097,32 +1167,37 @@ class Union(Origin):
     def compose(self, composer): composer.Union(self.tables)
 
 class Join(Origin):
+    __slots__ = ('left', 'right')
     def __init__(self, left, right):
         self.left = left
         self.right = right
 
 class InnerJoin(Join):
+    __slots__ = ()
     def compose(self, composer):
         self._compose_inner(composer, self.left)
         composer.InnerJoin(self.right)
 
 class OuterJoin(Join):
+    __slots__ = ()
     def compose(self, composer):
         self._compose_inner(composer, self.left)
         composer.OuterJoin(self.right)
 
 class CrossJoin(Join):
+    __slots__ = ()
     def compose(self, composer):
         self._compose_inner(composer, self.left)
         composer.CrossJoin(self.right)
 
 class Manipulation(Composite):
+    __slots__ = ('table',)
     def __init__(self, table):
         self.table = table
 
 class Inserting(Manipulation):
-    setlist = None  # [('name', expr)]
-    setdict = cached_property(lambda self: dict(self.setlist))
+    __slots__ = ('setlist',)  # [('name', expr)]
+    setdict = cached_slot(lambda self: dict(self.setlist))
     def __init__(self, table, setlist):
         Manipulation.__init__(self, table)
         self.setlist = setlist
@@ -1131,8 +1206,8 @@ class Inserting(Manipulation):
         composer.Inserting(self.setlist)
 
 class UpdatingAll(Manipulation):
-    setlist = None  # [('name', expr)]
-    setdict = cached_property(lambda self: dict(self.setlist))
+    __slots__ = ('setlist',)  # [('name', expr)]
+    setdict = cached_slot(lambda self: dict(self.setlist))
     def __init__(self, table, setlist):
         Manipulation.__init__(self, table)
         self.setlist = setlist
@@ -1141,11 +1216,13 @@ class UpdatingAll(Manipulation):
         composer.UpdatingAll(self.setlist)
 
 class DeletingAll(Manipulation):
+    __slots__ = ()
     def compose(self, composer):
         self._compose_inner(composer, self.table)
-        composer.DeleteAll()
+        composer.DeletingAll()
 
 class Extending(Manipulation):
+    __slots__ = ('extension',)
     def __init__(self, table, extension):
         Manipulation.__init__(self, table)
         self.extension = extension
@@ -1154,6 +1231,7 @@ class Extending(Manipulation):
         composer.Extending(self.extension)
 
 class Merging(Manipulation):
+    __slots__ = ('source', 'inserting')
     def __init__(self, table, source, inserting):
         Manipulation.__init__(self, table)
         self.source = source
@@ -1161,3 +1239,10 @@ class Merging(Manipulation):
     def compose(self, composer):
         self._compose_inner(composer, self.table)
         composer.Merging(self.source, self.inserting)
+
+def _models():
+    return ((k,v) for (k,v) in globals().items()
+            if isinstance(v, type)
+            and issubclass(v, Model))
+
+for (k, v) in list(_models()): assert_slotty(v)
@@ -0,0 +1,240 @@
+#! -*- coding: utf-8 -*-
+
+# structural identity of models, models override __eq__ so they are compared through their shapes
+
+import hashlib
+from . import models
+
+def _tuple(X): return tuple(X)
+def _pairs(X): return tuple((k, v) for (k, v) in X)
+
+class ShapeEmitter(models.Emitter):
+    """emitter returning nested tuples of model structure, constants are kept as their type names only when constants is False"""
+    def __init__(self, constants=True): self.constants = constants
+    def inner(self, emitter, x, outer):
+        if x is NotImplemented: return None
+        if not isinstance(x, models.Model): return emitter.Constant(x)
+        if type(emitter) is not ShapeEmitter: return x.emit(emitter)
+        return _memo(x, ('shape', self.constants), lambda: x.emit(emitter))
+    def shape(self, x):
+        if isinstance(x, models.Model): return self.inner(self, x, None)
+        if isinstance(x, (list, tuple)): return _tuple(self.shape(i) for i in x)
+        return x
+    def value(self, v):
+        if self.constants: return (type(v).__name__, repr(v))
+        return (type(v).__name__,)
+    def composer(self): return ShapeComposer(self)
+    def ExpressionList(self, S): return ('ExpressionList', _tuple(S))
+    def DateTimePart(self, date, part): return ('DateTimePart', date, part)
+    def PeriodStart(self, date, part, offset): return ('PeriodStart', date, part, offset)
+    def YYYY_MM_DD(self, date, sep): return ('YYYY_MM_DD', date, sep)
+    def HH_MM_SS(self, date, sep): return ('HH_MM_SS', date, sep)
+    def Parentheses(self, x): return ('Parentheses', x)
+    def Constant(self, c): return ('Constant',) + self.value(c)
+    def Value(self, v): return ('Value',) + self.value(v)
+    def Item(self, name): return ('Item', name)
+    def HostItem(self, name): return ('HostItem', name)
+    def Parameter(self, name): return ('Parameter', name)
+    def Call(self, name, args): return ('Call', name, _tuple(args))
+    def Cast(self, value, type): return ('Cast', value, repr(type))
+    def Case(self, cases, whenelse): return ('Case', _pairs(cases), whenelse)
+    def Switch(self, switch, cases, whenelse): return ('Switch', switch, _pairs(cases), whenelse)
+    def Neg(self, n): return ('Neg', n)
+    def Pos(self, n): return ('Pos', n)
+    def Summarize(self, N): return ('Summarize', _tuple(N))
+    def Sub(self, n1, n2): return ('Sub', n1, n2)
+    def Multiply(self, N): return ('Multiply', _tuple(N))
+    def Div(self, n1, n2): return ('Div', n1, n2)
+    def Concat(self, S): return ('Concat', _tuple(S))
+    def Comparison(self, op, a, b): return ('Comparison', op, a, b)
+    def Between(self, a, lo, hi): return ('Between', a, lo, hi)
+    def IsNull(self, a): return ('IsNull', a)
+    def NotNull(self, a): return ('NotNull', a)
+    def IsIn(self, a, S): return ('IsIn', a, S)
+    def NotIn(self, a, S): return ('NotIn', a, S)
+    def Like(self, s, pattern, escape): return ('Like', s, pattern, escape)
+    def And(self, B): return ('And', _tuple(B))
+    def Or(self, B): return ('Or', _tuple(B))
+    def Not(self, b): return ('Not', b)
+    def Now(self): return ('Now',)
+    def NextVal(self, sequence): return ('NextVal', sequence)
+
+class ShapeComposer(models.Composer):
+    """composer collecting shapes of table steps, from origin to the last derivative"""
+    def __init__(self, emitter):
+        self.emitter = emitter
+        self.steps = []                     # [('Step', ...)]
+    def shape(self, x): return self.emitter.shape(x)
+    def step(self, *args): self.steps.append(args)
+    def emit(self): return ('Composite', _tuple(self.steps))
+    def AllValue(self): self.step('AllValue')
+    def AnyValue(self): self.step('AnyValue')
+    def Existence(self): self.step('Existence')
+    def Count(self): self.step('Count')
+    def Distinct(self): self.step('Distinct')
+    def OrderBy(self, orderbys): self.step('OrderBy', self.shape(orderbys))
+    def Slice(self, first, afterlast): self.step('Slice', self.shape(first), self.shape(afterlast))
+    def Primary(self, name): self.step('Primary', name)
+    def Qualify(self): self.step('Qualify')
+    def Alias(self, alias): self.step('Alias', alias)
+    def Nest(self, alias): self.step('Nest', alias)
+    def Include(self, inclusions): self.step('Include', _tuple(inclusions))
+    def Exclude(self, exclusions): self.step('Exclude', _tuple(exclusions))
+    def Rename(self, renamings): self.step('Rename', _tuple(sorted(renamings.items())))
+    def Define(self, deflist): self.step('Define', _tuple((k, self.shape(v)) for (k, v) in deflist))
+    def Redefine(self, deflist): self.step('Redefine', _tuple((k, self.shape(v)) for (k, v) in deflist))
+    def Where(self, predicate): self.step('Where', self.shape(predicate))
+    def Group(self, groupbys): self.step('Group', self.shape(groupbys))
+    def Assign(self, assignments):
+        self.step('Assign', _tuple((k, self.shape(v)) for (k, v) in sorted(assignments.items())))
+    def Union(self, tables): self.step('Union', self.shape(tables))
+    def InnerJoin(self, right): self.step('InnerJoin', self.shape(right))
+    def OuterJoin(self, right): self.step('OuterJoin', self.shape(right))
+    def CrossJoin(self, right): self.step('CrossJoin', self.shape(right))
+    def Inserting(self, setlist): self.step('Inserting', _tuple((k, self.shape(v)) for (k, v) in setlist))
+    def UpdatingAll(self, setlist): self.step('UpdatingAll', _tuple((k, self.shape(v)) for (k, v) in setlist))
+    def DeletingAll(self): self.step('DeletingAll')
+    def Extending(self, extension): self.step('Extending', self.shape(extension))
+    def Merging(self, source, inserting): self.step('Merging', self.shape(source), self.shape(inserting))
+
+def _memo(m, key, f):
+    """value of f() kept in dict of slot "_cache" of model m, models are not modified once built"""
+    try:
+        cache = m._cache
+    except AttributeError:
+        cache = m._cache = {}
+    try:
+        return cache[key]
+    except KeyError:
+        v = cache[key] = f()
+        return v
+
+def shape(m, constants=True):
+    """nested tuples describing structure of model m, equal for structurally equal models"""
+    return ShapeEmitter(constants).shape(m)
+
+def fingerprint(m, constants=True):
+    """stable hex digest of shape of model m, constants=False gives the same digest for models differ only in constants"""
+    def digest():
+        text = repr(shape(m, constants)).encode('utf-8')
+        return hashlib.blake2b(text, digest_size=16).hexdigest()
+    if not isinstance(m, models.Model): return digest()
+    return _memo(m, ('fingerprint', constants), digest)
+
+def _key(x):
+    """key of constructor argument, children are already interned so they are compared by identity"""
+    if isinstance(x, models.Model): return id(x)
+    if isinstance(x, (list, tuple)): return (type(x),) + _tuple(_key(i) for i in x)
+    if isinstance(x, dict): return (dict,) + _tuple(sorted((k, _key(v)) for (k, v) in x.items()))
+    return (type(x), x)
+
+class HashConsing(object):
+    """factory sharing structurally equal models, interned models must not be modified"""
+    __slots__ = 'table', 'emitter'
+    def __init__(self):
+        self.table = {}                     # {key: model}
+        self.emitter = ConsEmitter(self)
+    def __len__(self): return len(self.table)
+    def clear(self): self.table.clear()
+    def __call__(self, cls, *args):
+        """return shared instance of cls(*args), args must be already interned"""
+        try:
+            key = (cls,) + _tuple(_key(a) for a in args)
+            m = self.table.get(key)
+        except TypeError:
+            return cls(*args)               # unhashable constant
+        if m is None: m = self.table[key] = cls(*args)
+        return m
+    def intern(self, m):
+        """return shared model structurally equal to m, its sub-models are shared as well"""
+        return self.emitter.intern(m)
+    def make(self, x): return self.intern(models.make(x))
+
+class ConsEmitter(models.Emitter):
+    """emitter rebuilding model from interned sub-models"""
+    def __init__(self, cons): self.cons = cons
+    def inner(self, emitter, x, outer):
+        if x is NotImplemented: return x
+        if not isinstance(x, models.Model): return emitter.Constant(x)
+        return x.emit(emitter)
+    def intern(self, x):
+        if isinstance(x, models.Model): return self.inner(self, x, None)
+        if isinstance(x, (list, tuple)): return type(x)(self.intern(i) for i in x)
+        return x
+    def composer(self): return ConsComposer(self)
+    def ExpressionList(self, S): return self.cons(models.ExpressionList, S)
+    def DateTimePart(self, date, part): return self.cons(models.DateTimePart, date, part)
+    def PeriodStart(self, date, part, offset): return self.cons(models.PeriodStart, date, part, offset)
+    def YYYY_MM_DD(self, date, sep): return self.cons(models.YYYY_MM_DD, date, sep)
+    def HH_MM_SS(self, date, sep): return self.cons(models.HH_MM_SS, date, sep)
+    def Parentheses(self, x): return self.cons(models.Parentheses, x)
+    def Constant(self, c):
+        if c is None: return models.NULL
+        if c is True: return models.TRUE
+        if c is False: return models.FALSE
+        return self.cons(models.Constant, c)
+    def Value(self, v): return self.cons(models.Value, v)
+    def Item(self, name): return self.cons(models.Item, name)
+    def HostItem(self, name): return self.cons(models.HostItem, name)
+    def Parameter(self, name): return self.cons(models.Parameter, name)
+    def Call(self, name, args): return self.cons(models.Call, name, args)
+    def Cast(self, value, type): return self.cons(models.Cast, value, type)
+    def Case(self, cases, whenelse): return self.cons(models.Case, cases, whenelse)
+    def Switch(self, switch, cases, whenelse): return self.cons(models.Switch, switch, cases, whenelse)
+    def Neg(self, n): return self.cons(models.Neg, n)
+    def Pos(self, n): return self.cons(models.Pos, n)
+    def Summarize(self, N): return self.cons(models.Summarize, N)
+    def Sub(self, n1, n2): return self.cons(models.Sub, n1, n2)
+    def Multiply(self, N): return self.cons(models.Multiply, N)
+    def Div(self, n1, n2): return self.cons(models.Div, n1, n2)
+    def Concat(self, S): return self.cons(models.Concat, S)
+    def Comparison(self, op, a, b): return self.cons(models.Comparison, op, a, b)
+    def Between(self, a, lo, hi): return self.cons(models.Between, a, lo, hi)
+    def IsNull(self, a): return self.cons(models.IsNull, a)
+    def NotNull(self, a): return self.cons(models.NotNull, a)
+    def IsIn(self, a, S): return self.cons(models.IsIn, a, S)
+    def NotIn(self, a, S): return self.cons(models.NotIn, a, S)
+    def Like(self, s, pattern, escape): return self.cons(models.Like, s, pattern, escape)
+    def And(self, B): return self.cons(models.And, B)
+    def Or(self, B): return self.cons(models.Or, B)
+    def Not(self, b): return self.cons(models.Not, b)
+    def Now(self): return self.cons(models.Now)
+    def NextVal(self, sequence): return self.cons(models.NextVal, sequence)
+
+class ConsComposer(models.Composer):
+    """composer rebuilding table from interned steps"""
+    def __init__(self, emitter):
+        self.emitter = emitter
+        self.table = None
+    def intern(self, x): return self.emitter.intern(x)
+    def step(self, cls, *args): self.table = self.emitter.cons(cls, self.table, *args)
+    def emit(self): return self.table
+    def AllValue(self): self.step(models.AllValue)
+    def AnyValue(self): self.step(models.AnyValue)
+    def Existence(self): self.step(models.Existence)
+    def Count(self): self.step(models.Count)
+    def Distinct(self): self.step(models.Distinct)
+    def OrderBy(self, orderbys): self.step(models.OrderBy, self.intern(orderbys))
+    def Slice(self, first, afterlast): self.step(models.Slice, self.intern(first), self.intern(afterlast))
+    def Primary(self, name): self.table = self.emitter.cons(models.Primary, name)
+    def Qualify(self): self.step(models.Qualify)
+    def Alias(self, alias): self.step(models.Alias, alias)
+    def Nest(self, alias): self.step(models.Nest, alias)
+    def Include(self, inclusions): self.step(models.Include, inclusions)
+    def Exclude(self, exclusions): self.step(models.Exclude, exclusions)
+    def Rename(self, renamings): self.step(models.Rename, renamings)
+    def Define(self, deflist): self.step(models.Define, [(k, self.intern(v)) for (k, v) in deflist])
+    def Redefine(self, deflist): self.step(models.Redefine, [(k, self.intern(v)) for (k, v) in deflist])
+    def Where(self, predicate): self.step(models.Where, self.intern(predicate))
+    def Group(self, groupbys): self.step(models.Group, self.intern(groupbys))
+    def Assign(self, assignments):
+        self.step(models.Assign, dict((k, self.intern(v)) for (k, v) in assignments.items()))
+    def Union(self, tables): self.table = self.emitter.cons(models.Union, self.intern(tables))
+    def InnerJoin(self, right): self.step(models.InnerJoin, self.intern(right))
+    def OuterJoin(self, right): self.step(models.OuterJoin, self.intern(right))
+    def CrossJoin(self, right): self.step(models.CrossJoin, self.intern(right))
+    def Inserting(self, setlist): self.step(models.Inserting, [(k, self.intern(v)) for (k, v) in setlist])
+    def UpdatingAll(self, setlist): self.step(models.UpdatingAll, [(k, self.intern(v)) for (k, v) in setlist])
+    def DeletingAll(self): self.step(models.DeletingAll)
+    def Extending(self, extension): self.step(models.Extending, self.intern(extension))
+    def Merging(self, source, inserting): self.step(models.Merging, self.intern(source), self.intern(inserting))
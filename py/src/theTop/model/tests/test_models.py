@@ -93,3 +93,27 @@ class TestParamCollectorWithDecorator(TestParamCollector):
         self.assertSetEqual(
             set(params),
             emitter.params)
+
+class TestCast(unittest.TestCase):
+    def testConverter(self):
+        from decimal import Decimal
+        self.assertEqual(Decimal('2.50'), op.cast(the.PRICE, 'DECIMAL(5,2)').converter('2.5'))
+        self.assertIs(int, op.cast(the.PRICE, int).converter)
+
+class TestSlots(unittest.TestCase):
+    def testSlotty(self):
+        from theTop import util
+        for (k, cls) in models._models(): self.assertTrue(util.slotty(cls.__new__(cls)), k)
+        with self.assertRaises(AttributeError): (the.A > 1).extra = 1
+    def testCachedValues(self):
+        x = the.A > 1
+        self.assertIs(x.not_, x.not_)
+        a = the.A
+        self.assertIs(a.is_null, a.is_null)
+        d = the.D
+        self.assertIs(d.year, d.year)
+        q = T['X'].where(the.A > 1).define(B=2)
+        self.assertIs(q.origin, q.origin)
+        self.assertEqual('X', q.origin.name)
+        self.assertIs(q.exists, q.exists)
+        self.assertEqual(2, q.defdict['B'].constant)
@@ -0,0 +1,87 @@
+#! -*- coding: utf-8 -*-
+
+import unittest
+from theTop.model import models
+from theTop.model import structure
+from theTop.model import the, T, op
+
+def build(n=5):
+    return op.And((the.A + n) * the.B > 3, the.C.in_([1, 2, None]), the.D.like('x%'),
+                  op.case([(the.E > 0, 'p')], 'n'), op.cast(the.F, 'VARCHAR(5)'))
+
+class TestFingerprint(unittest.TestCase):
+    def testStructuralEquality(self):
+        self.assertEqual(build().fingerprint(), build().fingerprint())
+        self.assertEqual(structure.shape(build()), structure.shape(build()))
+        self.assertNotEqual(build(5).fingerprint(), build(6).fingerprint())
+        self.assertNotEqual((the.A > 1).fingerprint(), (the.A >= 1).fingerprint())
+        self.assertNotEqual((the.A > 1).fingerprint(), (the.B > 1).fingerprint())
+    def testConstants(self):
+        self.assertEqual(build(5).fingerprint(constants=False), build(6).fingerprint(constants=False))
+        self.assertNotEqual(build(5).fingerprint(constants=False), build(5.0).fingerprint(constants=False))
+        self.assertNotEqual((the.A > 1).fingerprint(constants=False), (the.A > the.param.P).fingerprint(constants=False))
+        self.assertNotEqual(the.A.in_([1, 2]).fingerprint(constants=False), the.A.in_([1, 2, 3]).fingerprint(constants=False))
+    def testStable(self):
+        self.assertEqual(32, len((the.A > 1).fingerprint()))
+        self.assertEqual(structure.fingerprint(the.A > 1), models.fingerprint(the.A > 1))
+    def testTables(self):
+        q1 = T['ORDERS'].where(the.QTY > 1).include('ID', 'QTY')
+        q2 = T['ORDERS'].where(the.QTY > 1).include('ID', 'QTY')
+        self.assertEqual(q1.fingerprint(), q2.fingerprint())
+        self.assertNotEqual(q1.fingerprint(), T['ORDERS'].where(the.QTY > 2).include('ID', 'QTY').fingerprint())
+        self.assertNotEqual(q1.fingerprint(), T['ITEMS'].where(the.QTY > 1).include('ID', 'QTY').fingerprint())
+        self.assertEqual(the.ID.in_(q1).fingerprint(), the.ID.in_(q2).fingerprint())
+        self.assertEqual(T['X'].deletingall().fingerprint(), T['X'].deletingall().fingerprint())
+        self.assertEqual(T['X'].inserting(A=1).fingerprint(constants=False), T['X'].inserting(A=2).fingerprint(constants=False))
+    def testMemoized(self):
+        m = build()
+        walks = []
+        constant = structure.ShapeEmitter.Constant
+        def counting(emitter, c):
+            walks.append(c)
+            return constant(emitter, c)
+        structure.ShapeEmitter.Constant = counting
+        try:
+            s = structure.shape(m)
+            n = len(walks)
+            self.assertTrue(n > 0)
+            self.assertIs(s, structure.shape(m))
+            self.assertEqual(m.fingerprint(), m.fingerprint())
+            self.assertEqual(n, len(walks))
+            self.assertEqual(structure.shape(build(), constants=False), structure.shape(m, constants=False))
+            self.assertEqual(s, structure.shape(build()))
+        finally:
+            structure.ShapeEmitter.Constant = constant
+
+class TestHashConsing(unittest.TestCase):
+    def testShared(self):
+        h = structure.HashConsing()
+        (a, b) = (h.intern(build()), h.intern(build()))
+        self.assertIs(a, b)
+        self.assertIs(h.intern(the.A + 5), a.B[0].a.N[0])
+        self.assertEqual(build().fingerprint(), a.fingerprint())
+        n = len(h)
+        for i in range(10): h.intern(build())
+        self.assertEqual(n, len(h))
+    def testDistinct(self):
+        h = structure.HashConsing()
+        self.assertIsNot(h.make(the.A > 1), h.make(the.A > 1.0))
+        self.assertIsNot(h.make(the.A > 1), h.make(the.A > True))
+        self.assertIs(models.NULL, h.make(None))
+        unhashable = h.make(the.A == models.Constant({'k': 1}))
+        self.assertEqual({'k': 1}, unhashable.b.constant)
+        self.assertIs(unhashable.a, h.make(the.A))
+    def testFactory(self):
+        h = structure.HashConsing()
+        a = h(models.Item, 'A')
+        self.assertIs(a, h(models.Item, 'A'))
+        self.assertIs(h(models.Comparison, models.Comparison.GT, a, h.make(1)),
+                      h.intern(the.A > 1))
+        h.clear()
+        self.assertEqual(0, len(h))
+    def testTables(self):
+        h = structure.HashConsing()
+        q = h.intern(T['ORDERS'].where(the.QTY > 1).include('ID'))
+        self.assertIs(q, h.intern(T['ORDERS'].where(the.QTY > 1).include('ID')))
+        self.assertIs(q.parent.predicate, h.intern(the.QTY > 1))
+        self.assertEqual(T['ORDERS'].where(the.QTY > 1).include('ID').fingerprint(), q.fingerprint())
@@ -0,0 +1,183 @@
+#! -*- coding: utf-8 -*-
+
+from .. import util
+from . import nullop
+from . import sketch
+
+class Accumulator(object):
+    """state of a null-aware aggregate, add() is only called for values which are not null"""
+    __slots__ = ()
+    def add(self, v): raise NotImplementedError()
+    def merge(self, other): raise NotImplementedError()
+    def result(self): raise NotImplementedError()
+    def __repr__(self):
+        names = [n for c in reversed(type(self).__mro__) for n in c.__dict__.get('__slots__', ())]
+        return '%s(%s)' % (type(self).__name__, ', '.join(repr(getattr(self, n)) for n in names))
+
+class Summary(Accumulator):
+    """sum, ignoring null"""
+    __slots__ = ('value',)
+    def __init__(self): self.value = None
+    def add(self, v):
+        if self.value is None: self.value = v
+        else: self.value += v
+    def merge(self, other):
+        if other.value is not None: self.add(other.value)
+        return self
+    def result(self): return self.value
+
+class Minimum(Accumulator):
+    """min, ignoring null"""
+    __slots__ = ('value',)
+    def __init__(self): self.value = None
+    def add(self, v):
+        if (self.value is None) or (v < self.value): self.value = v
+    def merge(self, other):
+        if other.value is not None: self.add(other.value)
+        return self
+    def result(self): return self.value
+
+class Maximum(Accumulator):
+    """max, ignoring null"""
+    __slots__ = ('value',)
+    def __init__(self): self.value = None
+    def add(self, v):
+        if (self.value is None) or (v > self.value): self.value = v
+    def merge(self, other):
+        if other.value is not None: self.add(other.value)
+        return self
+    def result(self): return self.value
+
+class Count(Accumulator):
+    """count, ignoring null"""
+    __slots__ = ('value',)
+    def __init__(self): self.value = 0
+    def add(self, v): self.value += 1
+    def merge(self, other):
+        self.value += other.value
+        return self
+    def result(self): return self.value
+
+class Average(Accumulator):
+    """avg, ignoring null"""
+    __slots__ = ('count', 'total')
+    def __init__(self):
+        self.count = 0
+        self.total = 0
+    def add(self, v):
+        self.count += 1
+        self.total += v
+    def merge(self, other):
+        self.count += other.count
+        self.total += other.total
+        return self
+    def result(self):
+        if self.count == 0: return None
+        return self.total / self.count
+
+class Variance(Accumulator):
+    """sample variance (Welford), ignoring null"""
+    __slots__ = ('count', 'mean', 'm2')
+    ddof = 1
+    def __init__(self):
+        self.count = 0
+        self.mean = 0
+        self.m2 = 0
+    def add(self, v):
+        self.count += 1
+        delta = v - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (v - self.mean)
+    def merge(self, other):
+        if other.count == 0: return self
+        if self.count == 0:
+            (self.count, self.mean, self.m2) = (other.count, other.mean, other.m2)
+            return self
+        count = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / count
+        self.m2 += other.m2 + delta * delta * self.count * other.count / count
+        self.count = count
+        return self
+    def result(self):
+        if self.count <= self.ddof: return None
+        return self.m2 / (self.count - self.ddof)
+
+class PopulationVariance(Variance):
+    """population variance (Welford), ignoring null"""
+    __slots__ = ()
+    ddof = 0
+
+AGGREGATES = {
+    'sum': Summary,
+    'min': Minimum,
+    'max': Maximum,
+    'count': Count,
+    'avg': Average,
+    'var': Variance,
+    'var_pop': PopulationVariance,
+    'approx_count_distinct': sketch.HyperLogLog,
+    'approx_median': sketch.KllSketch,
+}
+
+def accumulator(name):
+    """create accumulator of aggregate name"""
+    try:
+        return AGGREGATES[name]()
+    except KeyError:
+        raise util.NotFound('Unknown aggregate: %s' % repr(name))
+
+class Aggregator(object):
+    """compute null-aware aggregates of many columns in a single pass"""
+    def __init__(self, specs):
+        self.specs = tuple(specs)           # [('name', index)], index None for whole row, e.g. COUNT(*)
+        self.accumulators = tuple(accumulator(name) for (name, index) in self.specs)
+        self.compile()
+    def compile(self):
+        columns = {}
+        for ((name, index), acc) in zip(self.specs, self.accumulators):
+            columns.setdefault(index, []).append(acc.add)
+        self.columns = tuple((index, tuple(adds)) for (index, adds) in columns.items())
+    def update(self, row):
+        isnull = nullop.isnull
+        for (index, adds) in self.columns:
+            v = row if index is None else row[index]
+            if isnull(v): continue
+            for add in adds: add(v)
+    def update_batch(self, rows):
+        isnull = nullop.isnull
+        columns = self.columns
+        for row in rows:
+            for (index, adds) in columns:
+                v = row if index is None else row[index]
+                if isnull(v): continue
+                for add in adds: add(v)
+    def merge(self, other):
+        if self.specs != other.specs:
+            raise ValueError('Cannot merge aggregators of different specs')
+        for (acc, o) in zip(self.accumulators, other.accumulators): acc.merge(o)
+        return self
+    def result(self): return tuple(acc.result() for acc in self.accumulators)
+    def __getstate__(self): return (self.specs, self.accumulators)
+    def __setstate__(self, state):
+        (self.specs, self.accumulators) = state
+        self.compile()
+
+def aggregate(specs, S):
+    """compute aggregates of specs over rows of sequence S in a single pass"""
+    return partial(specs, S).result()
+
+def partial(specs, S):
+    """return aggregator of specs updated with rows of sequence S, to be merged with other partials"""
+    a = Aggregator(specs)
+    a.update_batch(nullop.inarg(S))
+    return a
+
+def merge(partials):
+    """merge aggregators of the same specs into a new one"""
+    r = None
+    for a in partials:
+        if r is None: r = Aggregator(a.specs)
+        r.merge(a)
+    if r is None: raise util.NotFound('Cannot merge empty partials')
+    return r
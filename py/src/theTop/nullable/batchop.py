@@ -0,0 +1,358 @@
+#! -*- coding: utf-8 -*-
+
+import operator
+from functools import reduce
+from itertools import repeat
+
+from . import nullop
+from . import castop
+from . import column
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+class Masked(object):
+    """numpy column, values array with validity mask (True where value is not null)"""
+    __slots__ = 'values', 'valid'
+    def __init__(self, values, valid=None):
+        values = numpy.asarray(values)
+        if valid is None: valid = numpy.ones(len(values), dtype=bool)
+        self.values = values
+        self.valid = numpy.asarray(valid, dtype=bool)
+    def __repr__(self): return 'Masked(%s)' % repr(self.tolist())
+    def __len__(self): return len(self.values)
+    def __iter__(self): return iter(self.tolist())
+    def __getitem__(self, i):
+        if isinstance(i, slice): return Masked(self.values[i], self.valid[i])
+        return self.values[i:i+1].tolist()[0] if self.valid[i] else None
+    def tolist(self):
+        return [(v if ok else None) for (v, ok) in zip(self.values.tolist(), self.valid.tolist())]
+    @staticmethod
+    def fromcolumn(C):
+        """numpy column sharing values buffer of NullableColumn C"""
+        if isinstance(C.values, list): return Masked.fromlist(C)
+        values = numpy.asarray(C.memoryview())
+        if C.validity is None: return Masked(values)
+        bits = numpy.unpackbits(numpy.frombuffer(C.validity, dtype=numpy.uint8), bitorder='little')
+        return Masked(values, bits[C.offset:C.offset + C.length])
+    @staticmethod
+    def fromlist(S, dtype=None):
+        S = list(S)
+        valid = [nullop.notnull(v) for v in S]
+        if not any(valid):                  # typed placeholder, numpy kernels fail on object array of None
+            return Masked(numpy.zeros(len(S), dtype=dtype or float), numpy.zeros(len(S), dtype=bool))
+        fill = None
+        for (v, ok) in zip(S, valid):
+            if ok:
+                fill = type(v)() if isinstance(v, (str, int, float, complex)) else v
+                break
+        values = [(v if ok else fill) for (v, ok) in zip(S, valid)]
+        return Masked(numpy.array(values, dtype=dtype), valid)
+
+def masked(values, valid=None):
+    """return numpy column of values, valid mask is computed from nulls when not specified"""
+    if isinstance(values, Masked): return values
+    if isinstance(values, column.NullableColumn): return Masked.fromcolumn(values)
+    if (valid is None) and not isinstance(values, numpy.ndarray): return Masked.fromlist(values)
+    return Masked(values, valid)
+
+def iscolumn(x):
+    """return whether x is a column rather than a scalar"""
+    return isinstance(x, (list, tuple, Masked, column.NullableColumn)) or \
+        ((numpy is not None) and isinstance(x, numpy.ndarray))
+
+def _length(args):
+    for x in args:
+        if iscolumn(x): return len(x)
+    raise TypeError('At least one column argument is required')
+
+def _has_masked(args):
+    if numpy is None: return False
+    return any(isinstance(x, (Masked, numpy.ndarray)) or
+               (isinstance(x, column.NullableColumn) and not isinstance(x.values, list))
+               for x in args)
+
+def _nullmasked(n):
+    return Masked(numpy.zeros(n, dtype=bool), numpy.zeros(n, dtype=bool))
+
+def _operands(args):
+    """return (values, valid) for numpy kernel, or None if some scalar is null"""
+    values = []
+    valid = True
+    for x in args:
+        if iscolumn(x):
+            x = masked(x)
+            values.append(x.values)
+            valid = valid & x.valid
+        elif nullop.isnull(x):
+            return None
+        else:
+            values.append(nullop.inarg(x))
+    return (values, valid)
+
+def _list_operands(args, n):
+    """return list of iterables for pure python kernel, or None if some scalar is null"""
+    cols = []
+    for x in args:
+        if iscolumn(x): cols.append(x)
+        elif nullop.isnull(x): return None
+        else: cols.append(repeat(nullop.inarg(x), n))
+    return cols
+
+def _anynull(t):
+    isnull = nullop.isnull
+    for x in t:
+        if isnull(x): return True
+    return False
+
+def _masked_kernel(f, args):
+    n = _length(args)
+    ops = _operands(args)
+    if ops is None: return _nullmasked(n)
+    (values, valid) = ops
+    if (f in _DIVISIONS) and numpy.any(valid & (values[1] == 0)):
+        raise ZeroDivisionError('division by zero')
+    with numpy.errstate(all='ignore'):
+        r = f(*values)
+    return Masked(r, numpy.broadcast_to(valid, (n,)).copy())
+
+def _notnull_column(x):
+    """column known to have no null without scanning it"""
+    return isinstance(x, column.NullableColumn) and (x.validity is None)
+
+def _list_kernel(f, args, nullable=True):
+    n = _length(args)
+    cols = _list_operands(args, n)
+    if cols is None: return n * [None]
+    if (not nullable) or all(_notnull_column(x) for x in args if iscolumn(x)):
+        return list(map(f, *cols))
+    isnull = nullop.isnull
+    if len(cols) == 1:
+        return [(None if isnull(a) else f(a)) for a in cols[0]]
+    if len(cols) == 2:
+        return [(None if (isnull(a) or isnull(b)) else f(a, b)) for (a, b) in zip(*cols)]
+    return [(None if _anynull(t) else f(*t)) for t in zip(*cols)]
+
+def kernel(f, npf=None):
+    """for scalar function f (and numpy function npf) return null-propagating column function, nullable=False skips null checks"""
+    def k(*args, nullable=True):
+        if _has_masked(args):
+            if npf is not None: return _masked_kernel(npf, args)
+            return _masked_map(f, args)
+        return _list_kernel(f, args, nullable)
+    return k
+
+def _masked_map(f, args):
+    L = _list_kernel(f, [(masked(a).tolist() if iscolumn(a) else a) for a in args])
+    return Masked.fromlist(L)
+
+def _nary(f):
+    return lambda *N: reduce(f, N)
+
+def isnull(A):
+    """return column of whether each value of A is null"""
+    if _has_masked([A]):
+        A = masked(A)
+        return Masked(~A.valid)
+    return [nullop.isnull(a) for a in A]
+
+def notnull(A):
+    """return column of whether each value of A is not null"""
+    if _has_masked([A]):
+        A = masked(A)
+        return Masked(A.valid.copy())
+    return [nullop.notnull(a) for a in A]
+
+def accept(A):
+    """return column of whether each value of A is considered Truthy"""
+    if _has_masked([A]):
+        A = masked(A)
+        return Masked(A.valid & A.values.astype(bool))
+    return [nullop.accept(a) for a in A]
+
+def compress(S, B):
+    """return items of column S where column B is accepted"""
+    if _has_masked([S, B]):
+        S = masked(S)
+        B = masked(B)
+        selected = B.valid & B.values.astype(bool)
+        return Masked(S.values[selected], S.valid[selected])
+    return [s for (s, b) in zip(S, B) if nullop.accept(b)]
+
+neg = kernel(operator.neg, numpy.negative if numpy else None)
+pos = kernel(operator.pos, numpy.positive if numpy else None)
+summarize = kernel(_nary(operator.add), _nary(numpy.add) if numpy else None)
+sub = kernel(operator.sub, numpy.subtract if numpy else None)
+multiply = kernel(_nary(operator.mul), _nary(numpy.multiply) if numpy else None)
+floordiv = kernel(operator.floordiv, numpy.floor_divide if numpy else None)
+truediv = kernel(operator.truediv, numpy.true_divide if numpy else None)
+pow = kernel(operator.pow, numpy.power if numpy else None)
+mod = kernel(operator.mod, numpy.mod if numpy else None)
+_DIVISIONS = frozenset([numpy.floor_divide, numpy.true_divide, numpy.mod]) if numpy else frozenset()
+concat = kernel(lambda *S: ''.join(S))
+concat2 = kernel(operator.concat)
+lt = kernel(operator.lt, numpy.less if numpy else None)
+le = kernel(operator.le, numpy.less_equal if numpy else None)
+eq = kernel(operator.eq, numpy.equal if numpy else None)
+ne = kernel(operator.ne, numpy.not_equal if numpy else None)
+ge = kernel(operator.ge, numpy.greater_equal if numpy else None)
+gt = kernel(operator.gt, numpy.greater if numpy else None)
+ucase = kernel(str.upper)
+lcase = kernel(str.lower)
+replace = kernel(str.replace)
+ltrim = kernel(str.lstrip)
+rtrim = kernel(str.rstrip)
+trim = kernel(str.strip)
+
+def _split_members(S):
+    S = nullop.inarg(S)
+    if isinstance(S, nullop.NullableSet): return (list(S), S.contains_null)
+    S = list(S)
+    members = [x for x in S if nullop.notnull(x)]
+    return (members, len(members) != len(S))
+
+def isin(A, S):
+    """return column of whether sequence S contains each value of A, null-aware"""
+    (members, hasnull) = _split_members(S)
+    if _has_masked([A]):
+        A = masked(A)
+        found = numpy.isin(A.values, members) if members else numpy.zeros(len(A), dtype=bool)
+        valid = A.valid & (found | (not hasnull))
+        return Masked(found, valid)
+    if isinstance(nullop.inarg(S), nullop.NullableSet):
+        members = nullop.inarg(S)
+    else:
+        try:
+            members = frozenset(members)
+        except TypeError:
+            pass
+    isnull = nullop.isnull
+    return [(None if isnull(a) else
+             True if a in members else
+             None if hasnull else False)
+            for a in A]
+
+def notin(A, S):
+    """return column of whether sequence S does not contain each value of A, null-aware"""
+    return Not(isin(A, S))
+
+def like(A, pattern, escape=None):
+    """return column of whether each value of A matches pattern, null-aware"""
+    pattern = nullop.inarg(pattern)
+    escape = nullop.inarg(escape)
+    n = len(A)
+    if nullop.isnull(pattern):
+        return _nullmasked(n) if _has_masked([A]) else n * [None]
+    f = nullop.compile_like(pattern, escape).match
+    if _has_masked([A]):
+        A = masked(A)
+        r = [(f(s) if ok else False) for (s, ok) in zip(A.values.tolist(), A.valid.tolist())]
+        return Masked(numpy.array(r, dtype=bool), A.valid.copy())
+    return _list_kernel(f, [A])
+
+def between(A, lo, hi):
+    """return column of whether each value of A is between lo and hi, null-aware"""
+    return And(ge(A, lo), le(A, hi))
+
+def _and3(t):
+    isnull = nullop.isnull
+    r = True
+    for x in t:
+        if isnull(x): r = None
+        elif not x: return False
+    return r
+
+def _or3(t):
+    isnull = nullop.isnull
+    r = False
+    for x in t:
+        if isnull(x): r = None
+        elif x: return True
+    return r
+
+def _masked_logic(B):
+    n = _length(B)
+    cols = []
+    for b in B:
+        if iscolumn(b): cols.append(masked(b))
+        elif nullop.isnull(b): cols.append(_nullmasked(n))
+        else: cols.append(Masked(numpy.full(n, bool(nullop.inarg(b)))))
+    return cols
+
+def And(*B):
+    """null-aware and of columns"""
+    if _has_masked(B):
+        cols = _masked_logic(B)
+        known_false = numpy.zeros(len(cols[0]), dtype=bool)
+        all_valid = numpy.ones(len(cols[0]), dtype=bool)
+        for c in cols:
+            known_false |= c.valid & ~c.values.astype(bool)
+            all_valid &= c.valid
+        return Masked(~known_false, known_false | all_valid)
+    n = _length(B)
+    cols = [(b if iscolumn(b) else repeat(b, n)) for b in B]
+    return [_and3(t) for t in zip(*cols)]
+
+def Or(*B):
+    """null-aware or of columns"""
+    if _has_masked(B):
+        cols = _masked_logic(B)
+        known_true = numpy.zeros(len(cols[0]), dtype=bool)
+        all_valid = numpy.ones(len(cols[0]), dtype=bool)
+        for c in cols:
+            known_true |= c.valid & c.values.astype(bool)
+            all_valid &= c.valid
+        return Masked(known_true, known_true | all_valid)
+    n = _length(B)
+    cols = [(b if iscolumn(b) else repeat(b, n)) for b in B]
+    return [_or3(t) for t in zip(*cols)]
+
+def Not(B):
+    """null-aware not of column"""
+    if _has_masked([B]):
+        B = masked(B)
+        return Masked(~B.values.astype(bool), B.valid.copy())
+    return _list_kernel(operator.not_, [B])
+
+and_ = And
+or_ = Or
+not_ = Not
+
+_NUMPY_CASTS = {int: 'int64', float: 'float64'}
+
+def cast(A, t):
+    """null-aware type cast of column, the converter is resolved once for the whole column"""
+    f = castop.converter(nullop.inarg(t))
+    dtype = _NUMPY_CASTS.get(f)
+    if (dtype is not None) and _has_masked([A]):
+        A = masked(A)
+        if A.values.dtype.kind in 'biuf': return Masked(A.values.astype(dtype), A.valid.copy())
+    return kernel(f)(A)
+
+def _masked_aggregate(A, f):
+    A = masked(A)
+    values = A.values[A.valid]
+    if len(values) == 0: return None
+    return f(values).item()
+
+def aggregate_summary(A):
+    """sum of column A, ignoring null"""
+    if _has_masked([A]): return _masked_aggregate(A, numpy.sum)
+    return nullop.aggregate_summary(A)
+
+def aggregate_minimum(A):
+    """min of column A, ignoring null"""
+    if _has_masked([A]): return _masked_aggregate(A, numpy.min)
+    return nullop.aggregate_minimum(A)
+
+def aggregate_maximum(A):
+    """max of column A, ignoring null"""
+    if _has_masked([A]): return _masked_aggregate(A, numpy.max)
+    return nullop.aggregate_maximum(A)
+
+def aggregate_count(A):
+    """count of column A, ignoring null"""
+    if _has_masked([A]): return int(numpy.count_nonzero(masked(A).valid))
+    return nullop.aggregate_count(A)
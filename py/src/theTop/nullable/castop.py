@@ -0,0 +1,153 @@
+#! -*- coding: utf-8 -*-
+
+import re
+import datetime
+import decimal
+
+from .. import util
+
+def _integer():
+    return int
+
+def _float():
+    return float
+
+def _to_decimal(v):
+    """python Decimal keeping the scale of v, floats are converted by their shortest repr"""
+    if isinstance(v, float): v = repr(v)
+    elif isinstance(v, str): v = v.strip()
+    return decimal.Decimal(v)
+
+def _decimal(precision=None, scale=0):
+    """DECIMAL(p,s), rounded half up to scale s, ValueError when more than p digits"""
+    quantum = decimal.Decimal(1).scaleb(-scale)
+    def to_decimal(v):
+        r = _to_decimal(v).quantize(quantum, rounding=decimal.ROUND_HALF_UP)
+        if (precision is not None) and (len(r.as_tuple().digits) > precision) and (r != 0):
+            raise ValueError('Value %s is out of range of DECIMAL(%s,%s)' % (repr(v), precision, scale))
+        return r
+    return to_decimal
+
+def _varchar(length=None):
+    """VARCHAR(n), truncated to n characters"""
+    if length is None: return str
+    return lambda v: str(v)[:length]
+
+def _char(length=1):
+    """CHAR(n), truncated or padded with spaces to n characters"""
+    return lambda v: str(v)[:length].ljust(length)
+
+def _boolean():
+    """BOOLEAN, accepting 'true'/'false' style strings"""
+    words = {'true': True, 't': True, 'yes': True, 'y': True, '1': True, 'on': True,
+             'false': False, 'f': False, 'no': False, 'n': False, '0': False, 'off': False}
+    def to_boolean(v):
+        if isinstance(v, str):
+            try:
+                return words[v.strip().lower()]
+            except KeyError:
+                raise ValueError('Invalid boolean value: %s' % repr(v))
+        return bool(v)
+    return to_boolean
+
+def _date():
+    def to_date(v):
+        if isinstance(v, datetime.datetime): return v.date()
+        if isinstance(v, datetime.date): return v
+        if isinstance(v, str): return datetime.date.fromisoformat(v.strip()[:10])
+        raise TypeError('Cannot cast %s to DATE' % repr(v))
+    return to_date
+
+def _time():
+    def to_time(v):
+        if isinstance(v, datetime.datetime): return v.time()
+        if isinstance(v, datetime.time): return v
+        if isinstance(v, str): return datetime.time.fromisoformat(v.strip())
+        raise TypeError('Cannot cast %s to TIME' % repr(v))
+    return to_time
+
+def _timestamp():
+    def to_timestamp(v):
+        if isinstance(v, datetime.datetime): return v
+        if isinstance(v, datetime.date): return datetime.datetime.combine(v, datetime.time())
+        if isinstance(v, str): return datetime.datetime.fromisoformat(v.strip())
+        raise TypeError('Cannot cast %s to TIMESTAMP' % repr(v))
+    return to_timestamp
+
+def _python(t):
+    return lambda: t
+
+# {'NAME': factory}, factory is called with type arguments, e.g. DECIMAL(10,2) -> _decimal(10, 2)
+CASTS = {
+    'INTEGER': _integer,
+    'INT': _integer,
+    'SMALLINT': _integer,
+    'BIGINT': _integer,
+    'REAL': _float,
+    'FLOAT': _float,
+    'DOUBLE': _float,
+    'DOUBLE PRECISION': _float,
+    'DECIMAL': _decimal,
+    'NUMERIC': _decimal,
+    'VARCHAR': _varchar,
+    'CHARACTER VARYING': _varchar,
+    'TEXT': _varchar,
+    'CHAR': _char,
+    'CHARACTER': _char,
+    'BOOLEAN': _boolean,
+    'DATE': _date,
+    'TIME': _time,
+    'TIMESTAMP': _timestamp,
+    'DATETIME': _timestamp,
+}
+
+# {'name': factory}, python type names are case sensitive and keep python semantics
+PYTHON_CASTS = {
+    'int': _python(int),
+    'float': _python(float),
+    'str': _python(str),
+    'bool': _python(bool),
+    'complex': _python(complex),
+}
+
+# {type: converter}, python types which cannot be used as converters directly
+TYPE_CASTS = {
+    decimal.Decimal: _to_decimal,
+    datetime.date: _date(),
+    datetime.time: _time(),
+    datetime.datetime: _timestamp(),
+}
+
+def register_cast(name, factory):
+    """register converter factory for sql type name"""
+    CASTS[name.upper()] = factory
+    converters.clear()
+
+_TYPE_NAME = re.compile(r'^\s*([A-Za-z_][A-Za-z_0-9 ]*?)\s*(?:\(\s*([^()]*?)\s*\))?\s*$')
+
+def parse(t):
+    """parse type name into (name, args), e.g. 'DECIMAL(10, 2)' -> ('DECIMAL', (10, 2))"""
+    m = _TYPE_NAME.match(t)
+    if m is None: raise ValueError('Invalid type name: %s' % repr(t))
+    (name, args) = m.groups()
+    name = ' '.join(name.split())
+    if args is None: return (name, ())
+    try:
+        return (name, tuple(int(a) for a in args.split(',')))
+    except ValueError:
+        raise ValueError('Invalid type arguments: %s' % repr(t))
+
+def _compile_cast(t):
+    (name, args) = parse(t)
+    factory = PYTHON_CASTS.get(name) if not args else None
+    if factory is None: factory = CASTS.get(name.upper())
+    if factory is None: raise util.NotFound('Unknown cast type: %s' % repr(t))
+    return factory(*args)
+
+_MAXCONVERTERS = 256
+converters = util.LruCache(_MAXCONVERTERS)
+
+def converter(t):
+    """return converter callable of type t, given by python type or sql type name"""
+    if isinstance(t, type): return TYPE_CASTS.get(t, t)
+    return converters.get_or_create(t, _compile_cast)
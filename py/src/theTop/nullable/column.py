@@ -0,0 +1,86 @@
+#! -*- coding: utf-8 -*-
+
+from array import array
+from itertools import islice
+
+from . import nullop
+
+INT64_MIN = -(1 << 63)
+INT64_MAX = (1 << 63) - 1
+
+def _typecode(S):
+    """array typecode for non-null values of S, None when they need python objects,
+    'q' when all are ints in range of int64, 'd' when all are floats"""
+    typecode = None
+    for v in S:
+        t = type(v)
+        if t is int:
+            if (typecode == 'd') or not (INT64_MIN <= v <= INT64_MAX): return None
+            typecode = 'q'
+        elif t is float:
+            if typecode == 'q': return None
+            typecode = 'd'
+        else: return None
+    return typecode
+
+def bitmap(valid):
+    """pack sequence of booleans into validity bitmap, least significant bit first"""
+    valid = list(valid)
+    r = bytearray((len(valid) + 7) >> 3)
+    for (i, ok) in enumerate(valid):
+        if ok: r[i >> 3] |= 1 << (i & 7)
+    return r
+
+class NullableColumn(object):
+    """column of values in typed buffer (array, numpy or memoryview), nulls are kept in separate validity bitmap"""
+    __slots__ = 'values', 'validity', 'offset', 'length'
+    def __init__(self, values, validity=None, offset=0, length=None):
+        self.values = values                # buffer, value at null position is unspecified
+        self.validity = validity            # bytearray, bit set where value is not null, None when no null
+        self.offset = offset
+        self.length = (len(values) - offset) if length is None else length
+    @staticmethod
+    def fromlist(S, typecode=None):
+        S = [nullop.inarg(v) for v in S]
+        valid = [nullop.notnull(v) for v in S]
+        if typecode is None: typecode = _typecode(v for (v, ok) in zip(S, valid) if ok)
+        if typecode is None: values = [(v if ok else None) for (v, ok) in zip(S, valid)]
+        else: values = array(typecode, [(v if ok else 0) for (v, ok) in zip(S, valid)])
+        return NullableColumn(values, None if all(valid) else bitmap(valid))
+    @staticmethod
+    def frommemoryview(m, validity=None):
+        """column sharing buffer of memoryview m"""
+        return NullableColumn(memoryview(m), validity)
+    def __repr__(self): return 'NullableColumn(%s)' % repr(self.tolist())
+    def __len__(self): return self.length
+    def isvalid(self, i):
+        if self.validity is None: return True
+        i += self.offset
+        return bool((self.validity[i >> 3] >> (i & 7)) & 1)
+    @property
+    def null_count(self):
+        if self.validity is None: return 0
+        return self.length - sum(1 for ok in self.valid() if ok)
+    def valid(self):
+        """iterate whether each value is not null"""
+        validity = self.validity
+        if validity is None: return iter(self.length * [True])
+        return ((((validity[i >> 3] >> (i & 7)) & 1) == 1) for i in range(self.offset, self.offset + self.length))
+    def __iter__(self):
+        values = islice(self.values, self.offset, self.offset + self.length)
+        if self.validity is None: return values
+        return ((v if ok else None) for (v, ok) in zip(values, self.valid()))
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            (start, stop, step) = i.indices(self.length)
+            if step != 1:
+                return NullableColumn.fromlist([self[j] for j in range(start, stop, step)], getattr(self.values, 'typecode', None))
+            return NullableColumn(self.values, self.validity, self.offset + start, max(0, stop - start))
+        if i < 0: i += self.length
+        if not (0 <= i < self.length): raise IndexError('column index out of range')
+        if not self.isvalid(i): return None
+        return self.values[self.offset + i]
+    def tolist(self): return list(self)
+    def memoryview(self):
+        """memoryview of values buffer without copy, values at null positions are unspecified"""
+        return memoryview(self.values)[self.offset:self.offset + self.length]
@@ -5,7 +5,10 @@ import operator
 from . import nullop
 
 def fold(x):
-    """fold object x"""
+    """fold object x, null and booleans are folded into the shared NULL, TRUE and FALSE"""
+    if x is None: return NULL
+    if x is True: return TRUE
+    if x is False: return FALSE
     if isinstance(x, Fold): return x
     if isinstance(x, (tuple, list)): return type(x)(fold(i) for i in x)
     return Fold(x)
@@ -25,43 +28,53 @@ def foldfn(f):
     """for function f return a new function that return folded object"""
     return (lambda *args, **kwargs: fold(f(*args, **kwargs)))
 
-isnull = foldfn(nullop.isnull)
-accept = foldfn(nullop.accept)
-hasnull = foldfn(nullop.hasnull)
-Any = foldfn(nullop.Any)
-All = foldfn(nullop.All)
-neg = foldfn(nullop.neg)
-pos = foldfn(nullop.pos)
+def foldfn1(f):
+    """foldfn for function f of single argument"""
+    return (lambda a: fold(f(a)))
+
+def foldfn2(f):
+    """foldfn for function f of two arguments"""
+    return (lambda a, b: fold(f(a, b)))
+
+def isnull(v): return TRUE if nullop.isnull(v) else FALSE
+def accept(v): return TRUE if nullop.accept(v) else FALSE
+hasnull = foldfn1(nullop.hasnull)
+Any = foldfn1(nullop.Any)
+All = foldfn1(nullop.All)
+neg = foldfn1(nullop.neg)
+pos = foldfn1(nullop.pos)
 summarize = foldfn(nullop.summarize)
-sub = foldfn(nullop.sub)
+sub = foldfn2(nullop.sub)
 multiply = foldfn(nullop.multiply)
-floordiv = foldfn(nullop.floordiv)
-truediv = foldfn(nullop.truediv)
-divmod = foldfn(nullop.divmod)
-pow = foldfn(nullop.pow)
-mod = foldfn(nullop.mod)
+floordiv = foldfn2(nullop.floordiv)
+truediv = foldfn2(nullop.truediv)
+divmod = foldfn2(nullop.divmod)
+pow = foldfn2(nullop.pow)
+mod = foldfn2(nullop.mod)
 concat = foldfn(nullop.concat)
-concat2 = foldfn(nullop.concat2)
-isin = foldfn(nullop.isin)
-notin = foldfn(nullop.notin)
-lt = foldfn(nullop.lt)
-le = foldfn(nullop.le)
-eq = foldfn(nullop.eq)
-ne = foldfn(nullop.ne)
-ge = foldfn(nullop.ge)
-gt = foldfn(nullop.gt)
+concat2 = foldfn2(nullop.concat2)
+isin = foldfn2(nullop.isin)
+notin = foldfn2(nullop.notin)
+lt = foldfn2(nullop.lt)
+le = foldfn2(nullop.le)
+eq = foldfn2(nullop.eq)
+ne = foldfn2(nullop.ne)
+ge = foldfn2(nullop.ge)
+gt = foldfn2(nullop.gt)
 like = foldfn(nullop.like)
 between = foldfn(nullop.between)
 And = foldfn(nullop.And)
 Or = foldfn(nullop.Or)
-Not = foldfn(nullop.Not)
-ucase = foldfn(nullop.ucase)
-lcase = foldfn(nullop.lcase)
+LazyAnd = foldfn(nullop.LazyAnd)
+LazyOr = foldfn(nullop.LazyOr)
+Not = foldfn1(nullop.Not)
+ucase = foldfn1(nullop.ucase)
+lcase = foldfn1(nullop.lcase)
 replace = foldfn(nullop.replace)
-ltrim = foldfn(nullop.ltrim)
-rtrim = foldfn(nullop.rtrim)
-trim = foldfn(nullop.trim)
-cast = foldfn(nullop.cast)
+ltrim = foldfn1(nullop.ltrim)
+rtrim = foldfn1(nullop.rtrim)
+trim = foldfn1(nullop.trim)
+cast = foldfn2(nullop.cast)
 aggregate_summary = foldfn(nullop.aggregate_summary)
 aggregate_minimum = foldfn(nullop.aggregate_minimum)
 aggregate_maximum = foldfn(nullop.aggregate_maximum)
@@ -82,7 +95,7 @@ class Fold:
     def __init__(self, inner): self.inner = unfold(inner)
     def __repr__(self): return 'Fold(%s)' % repr(self.inner)
     def __hash__(self):
-        if isnull(self.inner): return hash(None)
+        if nullop.isnull(self.inner): return hash(None)
         return hash(self.inner)
     def __index__(self): return operator.index(self.inner)
     def __bool__(self): return bool(nullop.accept(self.inner))
@@ -95,7 +108,7 @@ class Fold:
     or_ = Or
     not_ = property(Not)
     def isnull(self): return isnull(self.inner)
-    def notnull(self): return fold(not self.isnull())
+    def notnull(self): return FALSE if nullop.isnull(self.inner) else TRUE
     is_null = property(isnull)
     is_not_null = property(notnull)
     __isnull__ = property(isnull)
@@ -108,7 +121,7 @@ class Fold:
     def __gt__(self, other): return gt(self.inner, other)
     def between(self, lo, hi): return between(self.inner, lo, hi)
     def inrange(self, first, afterlast):
-        return And(le(first, self.inner), lt(self.inner, afterlast))
+        return fold(nullop.And(nullop.le(first, self.inner), nullop.lt(self.inner, afterlast)))
     def isin(self, S):
         if unfold_instance(S, Containable): return S.contains(self)
         return isin(self.inner, S)
@@ -116,12 +129,12 @@ class Fold:
         if unfold_instance(S, Containable): return S.notcontains(self)
         return notin(self.inner, S)
     def in_(self, *S):
-        if len(S) == 0: return fold(False)
-        if (len(S) == 1) and unfold_instance(S[0], Containable): S = S[0]
+        if len(S) == 0: return FALSE
+        if (len(S) == 1) and unfold_instance(S[0], (Containable, nullop.NullableSet)): S = S[0]
         return self.isin(S)
     def not_in_(self, *S):
-        if len(S) == 0: return fold(True)
-        if (len(S) == 1) and unfold_instance(S[0], Containable): S = S[0]
+        if len(S) == 0: return TRUE
+        if (len(S) == 1) and unfold_instance(S[0], (Containable, nullop.NullableSet)): S = S[0]
         return self.notin(S)
     def __neg__(self): return neg(self.inner)
     def __pos__(self): return pos(self.inner)
@@ -164,3 +177,7 @@ class Fold:
     def strip(self): return trim(self.inner)
     def like(self, pattern, escape=None): return like(self.inner, pattern, escape)
     def cast(self, t): return cast(self.inner, t)
+
+NULL = Fold(None)
+TRUE = Fold(True)
+FALSE = Fold(False)
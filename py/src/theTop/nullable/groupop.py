@@ -0,0 +1,94 @@
+#! -*- coding: utf-8 -*-
+
+import pickle
+import tempfile
+
+from . import nullop
+from . import aggop
+
+class GroupBy(object):
+    """null-aware hash aggregation, all null keys fall into one group, spilling to temporary files above max_groups"""
+    def __init__(self, keys, specs, max_groups=None, partitions=16):
+        self.keys = tuple(keys)             # [index]
+        self.specs = tuple(specs)           # [('name', index)], index None for whole row, e.g. COUNT(*)
+        self.max_groups = max_groups
+        self.partitions = partitions
+        self.groups = {}                    # {(key, ...): (accumulator, ...)}
+        self.files = None                   # [file], one per partition once spilled
+        self.spills = 0
+        columns = {}
+        for (position, (name, index)) in enumerate(self.specs):
+            columns.setdefault(index, []).append(position)
+        self.columns = tuple((index, tuple(positions)) for (index, positions) in columns.items())
+        self.new_group()                    # fail early on unknown aggregate
+    def new_group(self):
+        return tuple(aggop.accumulator(name) for (name, index) in self.specs)
+    def update(self, row): self.update_batch([row])
+    def update_batch(self, rows):
+        isnull = nullop.isnull
+        keys = self.keys
+        columns = self.columns
+        groups = self.groups
+        for row in rows:
+            key = tuple((None if isnull(row[i]) else row[i]) for i in keys)
+            accs = groups.get(key)
+            if accs is None:
+                if (self.max_groups is not None) and (len(groups) >= self.max_groups): self.spill()
+                accs = groups[key] = self.new_group()
+            for (index, positions) in columns:
+                v = row if index is None else row[index]
+                if isnull(v): continue
+                for p in positions: accs[p].add(v)
+    def spill(self):
+        """move groups in memory into partitioned temporary files"""
+        if self.files is None:
+            self.files = [tempfile.TemporaryFile() for i in range(self.partitions)]
+        n = self.partitions
+        for item in self.groups.items():
+            pickle.dump(item, self.files[hash(item[0]) % n], pickle.HIGHEST_PROTOCOL)
+        self.groups.clear()
+        self.spills += 1
+    def _load(self, f):
+        groups = {}
+        f.seek(0)
+        while True:
+            try:
+                (key, accs) = pickle.load(f)
+            except EOFError:
+                break
+            current = groups.get(key)
+            if current is None: groups[key] = accs
+            else:
+                for (acc, other) in zip(current, accs): acc.merge(other)
+        f.close()
+        return groups
+    def _groups(self):
+        if self.files is None:
+            yield self.groups
+            return
+        if self.groups: self.spill()
+        (files, self.files) = (self.files, None)
+        for f in files: yield self._load(f)
+    def result(self):
+        """iterate rows of key values followed by aggregate results, one row per group,
+        a single row of empty aggregates when there are neither keys nor groups"""
+        empty = True
+        for groups in self._groups():
+            for (key, accs) in groups.items():
+                empty = False
+                yield key + tuple(acc.result() for acc in accs)
+        if empty and not self.keys: yield tuple(acc.result() for acc in self.new_group())
+    def close(self):
+        if self.files is not None:
+            for f in self.files: f.close()
+            self.files = None
+        self.groups.clear()
+
+def group_by(keys, specs, S, max_groups=None):
+    """return rows of key values followed by aggregates of specs, for each group of rows of sequence S"""
+    g = GroupBy(keys, specs, max_groups)
+    try:
+        g.update_batch(nullop.inarg(S))
+        return list(g.result())
+    finally:
+        g.close()
@@ -0,0 +1,126 @@
+#! -*- coding: utf-8 -*-
+
+import pickle
+import tempfile
+from itertools import chain, islice
+
+from . import nullop
+
+KINDS = ('inner', 'left', 'semi', 'anti')
+
+def _keyfn(keys):
+    """return function of row key, None when some key value is null (null never matches)"""
+    keys = tuple(keys)
+    isnull = nullop.isnull
+    def key(row):
+        k = tuple(row[i] for i in keys)
+        for v in k:
+            if isnull(v): return None
+        return k
+    return key
+
+def _table(rows, key):
+    table = {}
+    for row in rows:
+        k = key(row)
+        if k is None: continue
+        table.setdefault(k, []).append(tuple(row))
+    return table
+
+def _probe(kind, table, rows, key, pad, swap):
+    for row in rows:
+        k = key(row)
+        matches = None if k is None else table.get(k)
+        if kind == 'inner':
+            if matches:
+                row = tuple(row)
+                if swap:
+                    for m in matches: yield m + row
+                else:
+                    for m in matches: yield row + m
+        elif kind == 'left':
+            row = tuple(row)
+            if matches:
+                for m in matches: yield row + m
+            else:
+                yield row + pad
+        elif kind == 'semi':
+            if matches: yield row
+        elif not matches:
+            yield row
+
+def _partition(rows, key, n, files):
+    for row in rows:
+        k = key(row)
+        if k is None: continue
+        pickle.dump(row, files[hash(k) % n], pickle.HIGHEST_PROTOCOL)
+
+def _read(f):
+    f.seek(0)
+    try:
+        while True:
+            try:
+                yield pickle.load(f)
+            except EOFError:
+                return
+    finally:
+        f.close()
+
+def _smaller(a, b):
+    try:
+        return len(a) < len(b)
+    except TypeError:
+        return False
+
+def join(kind, left, right, left_keys, right_keys, right_width=None, max_rows=None, partitions=16):
+    """iterate rows of left joined with right on equal keys, null keys never match, kind is one of KINDS"""
+    if kind not in KINDS: raise ValueError('Unknown join kind: %s' % repr(kind))
+    return _join(kind, left, right, left_keys, right_keys, right_width, max_rows, partitions)
+
+def _join(kind, left, right, left_keys, right_keys, right_width, max_rows, partitions):
+    # hash table is built on right (or the smaller side of inner join),
+    # both sides are partitioned into temporary files when it has more than max_rows rows
+    (left, right) = (nullop.inarg(left), nullop.inarg(right))
+    swap = (kind == 'inner') and _smaller(left, right)
+    (lkey, rkey) = (_keyfn(left_keys), _keyfn(right_keys))
+    (build, bkey, probe, pkey) = (left, lkey, right, rkey) if swap else (right, rkey, left, lkey)
+    build = iter(build)
+    rows = list(build) if max_rows is None else list(islice(build, max_rows + 1))
+    if right_width is None:
+        if rows: right_width = len(rows[0])
+        elif kind == 'left': raise ValueError('right_width is required for left join of empty right rows')
+        else: right_width = 0
+    pad = right_width * (None,)
+    if (max_rows is None) or (len(rows) <= max_rows):
+        for row in _probe(kind, _table(rows, bkey), probe, pkey, pad, swap): yield row
+        return
+    bfiles = [tempfile.TemporaryFile() for i in range(partitions)]
+    pfiles = [tempfile.TemporaryFile() for i in range(partitions)]
+    try:
+        _partition(chain(rows, build), bkey, partitions, bfiles)
+        del rows
+        for row in probe:
+            k = pkey(row)
+            if k is not None: pickle.dump(row, pfiles[hash(k) % partitions], pickle.HIGHEST_PROTOCOL)
+            elif kind == 'left': yield tuple(row) + pad
+            elif kind == 'anti': yield row
+        for (bf, pf) in zip(bfiles, pfiles):
+            for row in _probe(kind, _table(_read(bf), bkey), _read(pf), pkey, pad, swap): yield row
+    finally:
+        for f in chain(bfiles, pfiles): f.close()
+
+def inner_join(left, right, left_keys, right_keys, **kwargs):
+    """null-aware inner join"""
+    return join('inner', left, right, left_keys, right_keys, **kwargs)
+
+def left_join(left, right, left_keys, right_keys, **kwargs):
+    """null-aware left outer join, unmatched left rows are padded with nulls"""
+    return join('left', left, right, left_keys, right_keys, **kwargs)
+
+def semi_join(left, right, left_keys, right_keys, **kwargs):
+    """left rows having some matching right row, i.e. EXISTS"""
+    return join('semi', left, right, left_keys, right_keys, **kwargs)
+
+def anti_join(left, right, left_keys, right_keys, **kwargs):
+    """left rows having no matching right row, i.e. NOT EXISTS"""
+    return join('anti', left, right, left_keys, right_keys, **kwargs)
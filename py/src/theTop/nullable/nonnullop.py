@@ -0,0 +1,70 @@
+#! -*- coding: utf-8 -*-
+
+# specialized kernels of nullop functions for arguments declared not null, without null checks
+
+from functools import reduce
+import operator
+
+from . import nullop
+from . import castop
+
+def isnull(v): return False
+def notnull(v): return True
+accept = bool
+neg = operator.neg
+pos = operator.pos
+def summarize(*N): return sum(N)
+sub = operator.sub
+def multiply(*N): return reduce(operator.mul, N)
+floordiv = operator.floordiv
+truediv = operator.truediv
+divmod = divmod
+pow = operator.pow
+mod = operator.mod
+def concat(*S): return ''.join(S)
+concat2 = operator.concat
+lt = operator.lt
+le = operator.le
+eq = operator.eq
+ne = operator.ne
+ge = operator.ge
+gt = operator.gt
+
+def isin(a, S):
+    """sequence S may still contain null"""
+    if a in S: return True
+    if nullop.hasnull(S): return None
+    return False
+
+def notin(a, S):
+    """sequence S may still contain null"""
+    if a in S: return False
+    if nullop.hasnull(S): return None
+    return True
+
+def like(s, pattern, escape=None): return nullop.compile_like(pattern, escape).match(s)
+def between(a, lo, hi): return lo <= a <= hi
+def And(*B): return all(B)
+def Or(*B): return any(B)
+Not = operator.not_
+and_ = And
+or_ = Or
+not_ = Not
+ucase = str.upper
+lcase = str.lower
+replace = str.replace
+ltrim = str.lstrip
+rtrim = str.rstrip
+trim = str.strip
+def cast(a, t): return castop.converter(t)(a)
+
+KERNELS = frozenset([
+    'isnull', 'notnull', 'accept', 'neg', 'pos', 'summarize', 'sub', 'multiply', 'floordiv', 'truediv',
+    'divmod', 'pow', 'mod', 'concat', 'concat2', 'lt', 'le', 'eq', 'ne', 'ge', 'gt', 'isin', 'notin',
+    'like', 'between', 'And', 'Or', 'Not', 'and_', 'or_', 'not_', 'ucase', 'lcase', 'replace',
+    'ltrim', 'rtrim', 'trim', 'cast'])
+
+def kernel(name, nullable=True):
+    """return nullop function of name, or its specialized kernel when all arguments are declared not null"""
+    if (not nullable) and (name in KERNELS): return globals()[name]
+    return getattr(nullop, name)
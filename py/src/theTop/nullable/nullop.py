@@ -3,30 +3,77 @@
 from functools import reduce
 import re
 import operator
-
-def _is_None(x): return x is None
-def _custom_isnull(x): return hasattr(x, '__isnull__') and x.__isnull__
-null_detectors = [_is_None, _custom_isnull]
-
-try:
-    clr = __import__('clr')
-    System = __import__('System')
-    DBNull = System.DBNull
-    null_detectors.append(lambda v: v == DBNull.Value)
-except ImportError:
-    pass
+import builtins
+from .. import util
+from . import castop
+from . import sketch
 
 def inarg(x):
     """call this function for every input argument of nullop functions to support folded object"""
     if hasattr(x, '__unfolded__'): return x.__unfolded__
     else: return x
 
-def isnull(v):
-    """return whetner value v considered null"""
-    v = inarg(v)
-    for f in null_detectors:
-        if f(v): return True
-    return False
+null_detectors = []
+
+def isnull_protocol(x):
+    """null detector for objects providing __isnull__"""
+    return hasattr(x, '__isnull__') and bool(x.__isnull__)
+
+def _is_dbnull(x): return x == DBNull.Value
+
+def use_dbnull():
+    """register null detector for CLR System.DBNull, raise ImportError when CLR is not available"""
+    global DBNull
+    __import__('clr')
+    DBNull = __import__('System').DBNull
+    register_null_detector(_is_dbnull)
+
+def register_null_detector(f):
+    """register f(x) that return whether non-None value x considered null"""
+    if f not in null_detectors:
+        null_detectors.append(f)
+        compile_null_detectors()
+    return f
+
+def unregister_null_detector(f):
+    """unregister null detector f"""
+    null_detectors.remove(f)
+    compile_null_detectors()
+
+def _compile_isnull(detectors):
+    if not detectors:
+        def isnull(v):
+            """return whetner value v considered null"""
+            if v is None: return True
+            if hasattr(v, '__unfolded__'): return v.__unfolded__ is None
+            return False
+    elif len(detectors) == 1:
+        (detect,) = detectors
+        def isnull(v):
+            """return whetner value v considered null"""
+            if v is None: return True
+            if hasattr(v, '__unfolded__'):
+                v = v.__unfolded__
+                if v is None: return True
+            return bool(detect(v))
+    else:
+        def isnull(v):
+            """return whetner value v considered null"""
+            if v is None: return True
+            if hasattr(v, '__unfolded__'):
+                v = v.__unfolded__
+                if v is None: return True
+            for detect in detectors:
+                if detect(v): return True
+            return False
+    return isnull
+
+def compile_null_detectors():
+    """rebuild isnull predicate from registered null detectors"""
+    global isnull
+    isnull = _compile_isnull(tuple(null_detectors))
+
+compile_null_detectors()
 
 def notnull(v):
     """return whetner value v considered not null"""
@@ -40,6 +87,7 @@ def accept(v):
 def hasnull(S):
     """return whether the sequence S has some value considered as null"""
     S = inarg(S)
+    if isinstance(S, NullableSet): return S.contains_null
     for x in S:
         if isnull(x): return True
     return False
@@ -108,7 +156,7 @@ def divmod(n1, n2):
     n1 = inarg(n1)
     n2 = inarg(n2)
     if isnull(n1) or isnull(n2): return None
-    return __builtins__.divmod(n1, n2)
+    return builtins.divmod(n1, n2)
 
 def pow(n1, n2):
     """return n1 power n2. if any item is null, return None"""
@@ -137,6 +185,33 @@ def concat2(s1, s2):
     if isnull(s1) or isnull(s2): return None
     return operator.concat(s1, s2)
 
+class NullableSet(object):
+    """members of sequence S prepared for isin/notin, non-null members are hashed once"""
+    __slots__ = 'members', 'others', 'contains_null'
+    def __init__(self, S):
+        self.members = set()
+        self.others = []                    # unhashable members
+        self.contains_null = False
+        for x in inarg(S):
+            if isnull(x):
+                self.contains_null = True
+                continue
+            try:
+                self.members.add(x)
+            except TypeError:
+                self.others.append(x)
+    def __repr__(self): return 'NullableSet(%s)' % repr(list(self) + ([None] if self.contains_null else []))
+    def __len__(self): return len(self.members) + len(self.others)
+    def __iter__(self):
+        yield from self.members
+        yield from self.others
+    def __contains__(self, a):
+        try:
+            if a in self.members: return True
+        except TypeError:
+            pass
+        return bool(self.others) and (a in self.others)
+
 def isin(a, S):
     """return whether Sequence S contains item a. if a or S is null, return None"""
     a = inarg(a)
@@ -198,31 +273,75 @@ def gt(a, b):
     return a > b
 
 REGEX_SPECIALS = '\\.^$*+?{}[]()<>|'   # always put backslash first
-_like_cache = {}
-_MAXLIKECACHE = 50
-
-def _add_to_dict_with_limit(dic, limit, k, v):
-    dic[k] = v
-    if len(dic) > limit:
-        deletings = list(dic.keys())[:-limit]
-        for k in deletings:
-            if len(dic) <= limit: break
-            dic.pop(k)
-
-def _add_to_like_cache(k, v):
-    _add_to_dict_with_limit(_like_cache, _MAXLIKECACHE, k, v)
-
-def _get_like_regex_pattern(pattern, escape=None):
-    if escape:
-        pattern = pattern.replace(escape + '%', '\\%')
-        pattern = pattern.replace(escape + '_', '\\_')
-    for c in REGEX_SPECIALS: pattern = pattern.replace(c, '\\' + c)
-    pattern = pattern.replace('%', '.*')
-    pattern = pattern.replace('_', '.')
-    if escape:
-        pattern = pattern.replace('\\.*', '%')
-        pattern = pattern.replace('\\.', '_')
-    return pattern
+_MAXLIKECACHE = 1000
+like_cache = util.LruCache(_MAXLIKECACHE)
+
+def _like_tokens(pattern, escape=None):
+    """split LIKE pattern into literal strings, None for '%' and 1 for '_'"""
+    tokens = []
+    literal = []
+    i = 0
+    while i < len(pattern):
+        c = pattern[i]
+        if escape and (c == escape) and (pattern[i+1:i+2] in ('%', '_', escape)):
+            literal.append(pattern[i+1])
+            i += 2
+            continue
+        if c in '%_':
+            if literal: tokens.append(''.join(literal))
+            literal = []
+            if c == '_': tokens.append(1)
+            elif (not tokens) or (tokens[-1] is not None): tokens.append(None)
+        else:
+            literal.append(c)
+        i += 1
+    if literal: tokens.append(''.join(literal))
+    return tokens
+
+def _regex_literal(s): return ''.join(('\\' + c) if c in REGEX_SPECIALS else c for c in s)
+
+class LikePattern(object):
+    """LIKE pattern compiled into the cheapest matcher, operand which is not string is matched by its str()"""
+    __slots__ = 'kind', 'literal', 'match'
+    def __init__(self, pattern, escape=None):
+        tokens = _like_tokens(pattern, escape)
+        shape = tuple((t if not isinstance(t, str) else str) for t in tokens)
+        self.literal = None
+        if shape in ((), (str,)):
+            self.kind = 'exact'
+            self.literal = tokens[0] if tokens else ''
+            test = lambda s: s == self.literal
+        elif shape == (None,):
+            self.kind = 'any'
+            test = lambda s: True
+        elif shape == (str, None):
+            self.kind = 'prefix'
+            self.literal = tokens[0]
+            test = lambda s: s.startswith(self.literal)
+        elif shape == (None, str):
+            self.kind = 'suffix'
+            self.literal = tokens[1]
+            test = lambda s: s.endswith(self.literal)
+        elif shape == (None, str, None):
+            self.kind = 'contains'
+            self.literal = tokens[1]
+            test = lambda s: self.literal in s
+        else:
+            self.kind = 'regex'
+            regex = re.compile(''.join(
+                '.*' if t is None else
+                '.' if t == 1 else
+                _regex_literal(t)
+                for t in tokens), re.DOTALL)
+            test = lambda s: regex.fullmatch(s) is not None
+        self.match = lambda s: test(s if isinstance(s, str) else str(s))
+    def __repr__(self): return 'LikePattern(%s, %s)' % (self.kind, repr(self.literal))
+
+def _compile_like(key): return LikePattern(*key)
+
+def compile_like(pattern, escape=None):
+    """return compiled LIKE pattern, cached"""
+    return like_cache.get_or_create((pattern, escape), _compile_like)
 
 def like(s, pattern, escape=None):
     """return whether s match pattern, if s or match is null, return None. escape char can be specified"""
@@ -230,13 +349,7 @@ def like(s, pattern, escape=None):
     pattern = inarg(pattern)
     escape = inarg(escape)
     if isnull(s) or isnull(pattern): return None
-    regex = _like_cache.get((pattern, escape), None)
-    if regex is None:
-        regex = re.compile(_get_like_regex_pattern(pattern, escape))
-        _add_to_like_cache((pattern, escape), regex)
-    m = regex.match(s)
-    if m is None: return False
-    return (m.start() == 0) and (m.end() == len(s))
+    return compile_like(pattern, escape).match(s)
 
 def between(a, lo, hi):
     """return whether s is between lo and hi, null-aware"""
@@ -271,9 +384,33 @@ def Not(b):
     if isnull(b): return None
     return not b
 
+def _lazy_operands(B):
+    if (len(B) == 1) and hasattr(B[0], '__iter__') and not isinstance(B[0], (str, bytes)): B = B[0]
+    for x in B:
+        if callable(x): x = x()
+        yield inarg(x)
+
+def LazyAnd(*B):
+    """null-aware and, callable operands (or single iterable of them) are evaluated only until result is decided"""
+    r = True
+    for x in _lazy_operands(B):
+        if isnull(x): r = None
+        elif not x: return False
+    return r
+
+def LazyOr(*B):
+    """null-aware or, callable operands (or single iterable of them) are evaluated only until result is decided"""
+    r = False
+    for x in _lazy_operands(B):
+        if isnull(x): r = None
+        elif x: return True
+    return r
+
 and_ = And
 or_ = Or
 not_ = Not
+lazy_and = LazyAnd
+lazy_or = LazyOr
 
 def ucase(s):
     """null-aware string uppercase"""
@@ -318,8 +455,7 @@ def cast(a, t):
     a = inarg(a)
     t = inarg(t)
     if isnull(a): return None
-    if isinstance(t, type): return t(a)
-    return eval(t + '(' + repr(a) + ')')
+    return castop.converter(t)(a)
 
 def aggregate_summary(S):
     """sum of sequence S, ignoring null"""
@@ -359,6 +495,22 @@ def aggregate_count(S):
         if notnull(v): r += 1
     return r
 
+def aggregate_approx_count_distinct(S, precision=14):
+    """approximate count of distinct values of sequence S (HyperLogLog), ignoring null"""
+    S = inarg(S)
+    h = sketch.HyperLogLog(precision)
+    for v in S:
+        if notnull(v): h.add(v)
+    return h.result()
+
+def aggregate_approx_quantile(S, q=0.5, k=200):
+    """approximate q quantile of sequence S (KLL), ignoring null"""
+    S = inarg(S)
+    h = sketch.KllSketch(k, q)
+    for v in S:
+        if notnull(v): h.add(v)
+    return h.result()
+
 def aggregate_summaries(size, S):
     """sum of sequence S, ignoring null, with defined size"""
     size = inarg(size)
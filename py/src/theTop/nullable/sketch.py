@@ -0,0 +1,108 @@
+#! -*- coding: utf-8 -*-
+
+import math
+import random
+import hashlib
+
+def hash64(v):
+    """64 bits hash of value v, stable across processes so that sketches can be merged and stored"""
+    if isinstance(v, float) and v.is_integer(): v = int(v)
+    if isinstance(v, bytes): b = b'b' + v
+    elif isinstance(v, str): b = b's' + v.encode('utf-8')
+    else: b = repr(v).encode('utf-8')
+    return int.from_bytes(hashlib.blake2b(b, digest_size=8).digest(), 'little')
+
+class HyperLogLog(object):
+    """approximate count distinct, standard error is about 1.04 / sqrt(2 ** precision)"""
+    __slots__ = 'precision', 'registers'
+    def __init__(self, precision=14):
+        if not (4 <= precision <= 18): raise ValueError('precision must be in range 4..18 (precision=%s)' % repr(precision))
+        self.precision = precision
+        self.registers = bytearray(1 << precision)
+    def __repr__(self): return 'HyperLogLog(%s) ~ %s' % (self.precision, self.result())
+    def add(self, v):
+        x = hash64(v)
+        bits = 64 - self.precision
+        i = x >> bits
+        rank = bits - (x & ((1 << bits) - 1)).bit_length() + 1
+        if rank > self.registers[i]: self.registers[i] = rank
+    def merge(self, other):
+        if self.precision != other.precision:
+            raise ValueError('Cannot merge HyperLogLog of different precisions')
+        self.registers = bytearray(map(max, self.registers, other.registers))
+        return self
+    def result(self):
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        e = alpha * m * m / sum(math.ldexp(1.0, -r) for r in self.registers)
+        zeros = self.registers.count(0)
+        if (e <= 2.5 * m) and zeros: e = m * math.log(m / zeros)
+        return int(round(e))
+    def to_bytes(self): return bytes([self.precision]) + bytes(self.registers)
+    @staticmethod
+    def from_bytes(b):
+        r = HyperLogLog(b[0])
+        if len(b) != len(r.registers) + 1: raise ValueError('Invalid HyperLogLog bytes')
+        r.registers[:] = b[1:]
+        return r
+
+class KllSketch(object):
+    """approximate quantiles (KLL), rank error is about 1.7 / k"""
+    __slots__ = 'k', 'q', 'compactors', 'size'
+    c = 2.0 / 3.0
+    def __init__(self, k=200, q=0.5):
+        self.k = k
+        self.q = q                          # quantile of result()
+        self.compactors = [[]]              # [[value]], value at level h weights 2 ** h
+        self.size = 0
+    def __repr__(self): return 'KllSketch(%s, %s) ~ %s' % (self.k, self.q, repr(self.result()))
+    def capacity(self, h):
+        return int(math.ceil(self.k * self.c ** (len(self.compactors) - h - 1))) + 1
+    def max_size(self): return sum(self.capacity(h) for h in range(len(self.compactors)))
+    def add(self, v):
+        self.compactors[0].append(v)
+        self.size += 1
+        if self.size >= self.max_size(): self.compress()
+    def compress(self):
+        while self.size >= self.max_size():
+            for (h, items) in enumerate(self.compactors):
+                if len(items) >= self.capacity(h):
+                    if h + 1 == len(self.compactors): self.compactors.append([])
+                    last = items.pop() if len(items) % 2 else None
+                    items.sort()
+                    self.compactors[h + 1].extend(items[random.getrandbits(1)::2])
+                    del items[:]
+                    if last is not None: items.append(last)
+                    self.size = sum(len(c) for c in self.compactors)
+                    break
+    def merge(self, other):
+        while len(self.compactors) < len(other.compactors): self.compactors.append([])
+        for (items, others) in zip(self.compactors, other.compactors): items.extend(others)
+        self.size = sum(len(c) for c in self.compactors)
+        self.compress()
+        return self
+    @property
+    def count(self): return sum(len(c) << h for (h, c) in enumerate(self.compactors))
+    def weighted(self):
+        """return sorted [(value, weight)]"""
+        return sorted((v, 1 << h) for (h, c) in enumerate(self.compactors) for v in c)
+    def rank(self, v):
+        """approximate fraction of values less than or equal to v"""
+        total = self.count
+        if total == 0: return None
+        return sum(w for (x, w) in self.weighted() if x <= v) / total
+    def quantiles(self, Q):
+        items = self.weighted()
+        if not items: return [None for q in Q]
+        total = self.count
+        r = []
+        for q in Q:
+            target = q * total
+            acc = 0
+            for (x, w) in items:
+                acc += w
+                if acc >= target: break
+            r.append(x)
+        return r
+    def quantile(self, q): return self.quantiles([q])[0]
+    def result(self): return self.quantile(self.q)
@@ -0,0 +1,77 @@
+#! -*- coding: utf-8 -*-
+
+import heapq
+import pickle
+import tempfile
+from itertools import islice
+
+from . import nullop
+
+class _Reversed(object):
+    """wrapper reversing the ordering of value v, for descending keys"""
+    __slots__ = 'v'
+    def __init__(self, v): self.v = v
+    def __eq__(self, other): return self.v == other.v
+    def __lt__(self, other): return other.v < self.v
+    def __repr__(self): return '_Reversed(%s)' % repr(self.v)
+
+def asc(index, nulls_first=False):
+    """ascending order spec of column index, nulls last by default"""
+    return (index, False, nulls_first)
+
+def desc(index, nulls_first=True):
+    """descending order spec of column index, nulls first by default"""
+    return (index, True, nulls_first)
+
+def _spec(x):
+    if isinstance(x, int): return asc(x)
+    (index, descending, nulls_first) = x
+    return (index, bool(descending), bool(nulls_first))
+
+def sort_key(order):
+    """return key function of rows for order specs [(index, descending, nulls_first)], int index for ascending"""
+    order = tuple(_spec(x) for x in order)
+    isnull = nullop.isnull
+    def part(index, descending, nulls_first):
+        (null, known) = ((0,), 1) if nulls_first else ((1,), 0)
+        if descending: return lambda row: null if isnull(row[index]) else (known, _Reversed(row[index]))
+        return lambda row: null if isnull(row[index]) else (known, row[index])
+    parts = tuple(part(*x) for x in order)
+    if len(parts) == 1:
+        (p,) = parts
+        return p
+    return lambda row: tuple(p(row) for p in parts)
+
+def _write_run(rows):
+    f = tempfile.TemporaryFile()
+    for row in rows: pickle.dump(row, f, pickle.HIGHEST_PROTOCOL)
+    f.seek(0)
+    return f
+
+def _read_run(f):
+    try:
+        while True:
+            try:
+                yield pickle.load(f)
+            except EOFError:
+                return
+    finally:
+        f.close()
+
+def sort(S, order, max_rows=None):
+    """iterate rows of sequence S in order, runs of max_rows are sorted in memory and merged from temporary files"""
+    key = sort_key(order)
+    S = iter(nullop.inarg(S))
+    if max_rows is None: return iter(sorted(S, key=key))
+    runs = []
+    while True:
+        chunk = sorted(islice(S, max_rows), key=key)
+        if not runs and (len(chunk) < max_rows): return iter(chunk)
+        if not chunk: break
+        runs.append(_write_run(chunk))
+        if len(chunk) < max_rows: break
+    return heapq.merge(*[_read_run(f) for f in runs], key=key)
+
+def top(S, order, n):
+    """return the first n rows of sequence S in order, i.e. ORDER BY with LIMIT n"""
+    return heapq.nsmallest(n, nullop.inarg(S), key=sort_key(order))
@@ -0,0 +1,94 @@
+#! -*- coding: utf-8 -*-
+
+import unittest
+from ... import util
+from .. import nullop
+from .. import aggop
+
+ROWS = [
+    (   0,    3, None, 'b'),
+    (   5,    8, None, None),
+    (None,    2, None, 'a'),
+    (   3, None, None, 'c')]
+
+class TestAggregator(unittest.TestCase):
+    def testSingleColumn(self):
+        for (name, f) in [
+                ('sum', nullop.aggregate_summary),
+                ('min', nullop.aggregate_minimum),
+                ('max', nullop.aggregate_maximum),
+                ('count', nullop.aggregate_count)]:
+            for S in [[], [None, None], [0, 1, 2, None, 4]]:
+                self.assertEqual((f(S),), aggop.aggregate([(name, 0)], [(v,) for v in S]))
+    def testManyColumns(self):
+        specs = [('sum', i) for i in range(3)] + \
+                [('min', i) for i in range(4)] + \
+                [('max', i) for i in range(4)] + \
+                [('count', i) for i in range(4)] + \
+                [('count', None)]
+        expected = \
+            nullop.aggregate_summaries(3, ROWS) + \
+            nullop.aggregate_minimums(4, ROWS) + \
+            nullop.aggregate_maximums(4, ROWS) + \
+            nullop.aggregate_counts(4, ROWS) + \
+            (4,)
+        self.assertEqual(expected, aggop.aggregate(specs, ROWS))
+    def testUpdate(self):
+        a = aggop.Aggregator([('sum', 0), ('count', 1), ('max', 3)])
+        self.assertEqual((None, 0, None), a.result())
+        a.update(ROWS[0])
+        self.assertEqual((0, 1, 'b'), a.result())
+        a.update_batch(iter(ROWS[1:]))
+        self.assertEqual((8, 3, 'c'), a.result())
+    def testUnknownAggregate(self):
+        with self.assertRaises(util.NotFound): aggop.Aggregator([('median', 0)])
+
+class TestPartialAggregation(unittest.TestCase):
+    specs = [('sum', 0), ('count', 0), ('min', 1), ('max', 1), ('avg', 0), ('var', 0), ('var_pop', 0)]
+    def rows(self): return [((i * 7) % 13 if i % 5 else None, i % 11) for i in range(100)]
+    def assertResults(self, expected, result):
+        self.assertEqual(len(expected), len(result))
+        for (e, r) in zip(expected, result):
+            if e is None: self.assertIsNone(r)
+            else: self.assertAlmostEqual(e, r)
+    def testAverageVariance(self):
+        import statistics
+        S = [2, None, 4, 4, 4, 5, None, 5, 7, 9]
+        values = [v for v in S if v is not None]
+        rows = [(v,) for v in S]
+        self.assertResults(
+            (statistics.mean(values), statistics.variance(values), statistics.pvariance(values)),
+            aggop.aggregate([('avg', 0), ('var', 0), ('var_pop', 0)], rows))
+        self.assertResults((None, None, None), aggop.aggregate([('avg', 0), ('var', 0), ('var_pop', 0)], [(None,)]))
+        self.assertResults((1, None, 0), aggop.aggregate([('avg', 0), ('var', 0), ('var_pop', 0)], [(1,)]))
+    def testMerge(self):
+        rows = self.rows()
+        expected = aggop.aggregate(self.specs, rows)
+        chunks = [rows[:10], [(None, None)] * 5, [], rows[10:55], rows[55:]]
+        partials = [aggop.partial(self.specs, chunk) for chunk in chunks]
+        self.assertResults(expected, aggop.merge(partials).result())
+        self.assertResults(expected, aggop.merge(reversed(partials)).result())
+        self.assertResults(aggop.aggregate(self.specs, rows[:10]), partials[0].result())
+    def testMergeNullOnly(self):
+        partials = [aggop.partial(self.specs, [(None, None)] * n) for n in range(3)]
+        self.assertResults((None, 0, None, None, None, None, None), aggop.merge(partials).result())
+    def testMergeMismatched(self):
+        with self.assertRaises(ValueError):
+            aggop.Aggregator([('sum', 0)]).merge(aggop.Aggregator([('sum', 1)]))
+        with self.assertRaises(util.NotFound): aggop.merge([])
+    def testPickle(self):
+        import pickle
+        rows = self.rows()
+        a = pickle.loads(pickle.dumps(aggop.partial(self.specs, rows[:50])))
+        a.update_batch(rows[50:])
+        self.assertResults(aggop.aggregate(self.specs, rows), a.result())
+    def testRepr(self):
+        expected = {
+            'sum': 'Summary(8)', 'min': 'Minimum(3)', 'max': 'Maximum(5)', 'count': 'Count(2)',
+            'avg': 'Average(2, 8)', 'var': 'Variance(2, 4.0, 2.0)', 'var_pop': 'PopulationVariance(2, 4.0, 2.0)'}
+        for (name, text) in expected.items():
+            a = aggop.accumulator(name)
+            for v in (3, 5): a.add(v)
+            self.assertEqual(text, repr(a))
+        self.assertEqual('Summary(None)', repr(aggop.Summary()))
+        self.assertEqual('Count(0)', repr(aggop.Count()))
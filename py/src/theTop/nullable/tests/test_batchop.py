@@ -0,0 +1,124 @@
+#! -*- coding: utf-8 -*-
+
+import unittest
+from .. import nullop
+from .. import batchop
+
+NumpyOnly = unittest.skipIf(batchop.numpy is None, 'For numpy only')
+
+NUMBERS = [None, -2, 0, 1, 3, 25]
+DIVISORS = [None, -3, 0, 1, 2, 8]
+STRINGS = [None, '', 'a', 'hello', 'h%llo_', '  A  ']
+BOOLEANS = [None, True, False]
+
+def pairs(X, Y):
+    A = [x for x in X for y in Y]
+    B = [y for x in X for y in Y]
+    return (A, B)
+
+class ListColumnTestCase(unittest.TestCase):
+    def column(self, S): return list(S)
+    def tolist(self, C): return list(C)
+    def assertColumn(self, expected, C):
+        C = self.tolist(C)
+        self.assertEqual(len(expected), len(C))
+        for (e, c) in zip(expected, C):
+            if nullop.isnull(e): self.assertIsNone(c)
+            else: self.assertEqual(e, c)
+    def assertUnary(self, name, S):
+        expected = [getattr(nullop, name)(a) for a in S]
+        self.assertColumn(expected, getattr(batchop, name)(self.column(S)))
+    def assertKernel(self, name, rows, *args):
+        try:
+            expected = [getattr(nullop, name)(*t) for t in rows]
+        except ZeroDivisionError:
+            with self.assertRaises(ZeroDivisionError): getattr(batchop, name)(*args)
+            return
+        self.assertColumn(expected, getattr(batchop, name)(*args))
+    def assertBinary(self, name, X, Y):
+        (A, B) = pairs(X, Y)
+        self.assertKernel(name, zip(A, B), self.column(A), self.column(B))
+        for y in Y:
+            self.assertKernel(name, [(a, y) for a in X], self.column(X), y)
+
+class TestListKernels(ListColumnTestCase):
+    def testIsNull(self):
+        self.assertColumn([True, False, False], batchop.isnull(self.column([None, 0, 1])))
+        self.assertColumn([False, True, True], batchop.notnull(self.column([None, 0, 1])))
+        self.assertColumn([False, False, True], batchop.accept(self.column([None, 0, 1])))
+    def testUnary(self):
+        for name in ['neg', 'pos']: self.assertUnary(name, NUMBERS)
+        for name in ['ucase', 'lcase', 'ltrim', 'rtrim', 'trim']: self.assertUnary(name, STRINGS)
+        self.assertUnary('Not', BOOLEANS)
+    def testArithmetic(self):
+        for name in ['summarize', 'sub', 'multiply']: self.assertBinary(name, NUMBERS, NUMBERS)
+        for name in ['floordiv', 'truediv', 'mod']:
+            self.assertBinary(name, NUMBERS, DIVISORS)
+            self.assertBinary(name, NUMBERS, [d for d in DIVISORS if d != 0])
+            self.assertBinary(name, [None, None], DIVISORS)
+        self.assertBinary('pow', NUMBERS, [None, 0, 1, 2])
+    def testComparison(self):
+        for name in ['lt', 'le', 'eq', 'ne', 'ge', 'gt']: self.assertBinary(name, NUMBERS, NUMBERS)
+    def testAllNull(self):
+        for name in ['summarize', 'sub', 'multiply', 'lt', 'eq', 'gt']:
+            self.assertBinary(name, [None, None], NUMBERS)
+            self.assertBinary(name, NUMBERS, [None, None])
+        self.assertBinary('concat2', [None, None], STRINGS)
+        self.assertUnary('neg', [None, None])
+    def testConcat(self):
+        self.assertBinary('concat', STRINGS, STRINGS)
+        self.assertBinary('concat2', STRINGS, STRINGS)
+    def testLogic(self):
+        self.assertBinary('And', BOOLEANS, BOOLEANS)
+        self.assertBinary('Or', BOOLEANS, BOOLEANS)
+    def testIn(self):
+        for S in [[1, None, 3, 4, None, 6, 7], [1, 3, 25], []]:
+            expected = [nullop.isin(a, S) for a in NUMBERS]
+            self.assertColumn(expected, batchop.isin(self.column(NUMBERS), S))
+            expected = [nullop.notin(a, S) for a in NUMBERS]
+            self.assertColumn(expected, batchop.notin(self.column(NUMBERS), S))
+            self.assertColumn(expected, batchop.notin(self.column(NUMBERS), nullop.NullableSet(S)))
+    def testLike(self):
+        for (pattern, escape) in [
+                (None, None), ('hell%', None), ('ha%', None), ('%', None),
+                ('h_llo', None), ('he%', 'e'), ('he%lloe_', 'e'), ('%llo', 'e')]:
+            expected = [nullop.like(s, pattern, escape) for s in STRINGS]
+            self.assertColumn(expected, batchop.like(self.column(STRINGS), pattern, escape))
+    def testBetween(self):
+        for (lo, hi) in [(None, 9), (0, 3), (1, None), (3, 1)]:
+            expected = [nullop.between(a, lo, hi) for a in NUMBERS]
+            self.assertColumn(expected, batchop.between(self.column(NUMBERS), lo, hi))
+    def testReplace(self):
+        expected = [nullop.replace(s, 'l', 'L') for s in STRINGS]
+        self.assertColumn(expected, batchop.replace(self.column(STRINGS), 'l', 'L'))
+        self.assertColumn(len(STRINGS) * [None], batchop.replace(self.column(STRINGS), 'l', None))
+    def testCast(self):
+        self.assertColumn([None, 3, 4], batchop.cast(self.column([None, '3', '4']), int))
+        self.assertColumn([None, 3, 4], batchop.cast(self.column([None, '3', '4']), 'int'))
+        self.assertColumn([None, 2, 4], batchop.cast(self.column([None, 2.5, 4.0]), int))
+        self.assertColumn([None, 'ab'], batchop.cast(self.column([None, 'abc']), 'VARCHAR(2)'))
+    def testCompress(self):
+        self.assertColumn(
+            [3, 25],
+            batchop.compress(self.column(NUMBERS), batchop.gt(self.column(NUMBERS), 1)))
+    def testAggregate(self):
+        for S in [[], [None, None], NUMBERS, [0, 1, 2, None, 4]]:
+            for name in ['aggregate_summary', 'aggregate_minimum', 'aggregate_maximum', 'aggregate_count']:
+                expected = getattr(nullop, name)(S)
+                result = getattr(batchop, name)(self.column(S))
+                if expected is None: self.assertIsNone(result)
+                else: self.assertEqual(expected, result)
+
+@NumpyOnly
+class TestMaskedKernels(TestListKernels):
+    def column(self, S): return batchop.masked(S)
+    def tolist(self, C):
+        self.assertIsInstance(C, batchop.Masked)
+        return C.tolist()
+    def testMasked(self):
+        C = batchop.Masked([1, 2, 3], [True, False, True])
+        self.assertEqual([1, None, 3], C.tolist())
+        self.assertEqual([None, 3], C[1:].tolist())
+        self.assertIsNone(C[1])
+        self.assertEqual(3, C[2])
+        self.assertEqual([1, None, 3], batchop.masked([1, None, 3]).tolist())
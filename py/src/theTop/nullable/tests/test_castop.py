@@ -0,0 +1,72 @@
+#! -*- coding: utf-8 -*-
+
+import unittest
+import datetime
+from decimal import Decimal
+from ... import util
+from .. import nullop
+from .. import castop
+
+class TestParse(unittest.TestCase):
+    def testParse(self):
+        self.assertEqual(('INTEGER', ()), castop.parse('INTEGER'))
+        self.assertEqual(('DECIMAL', (10, 2)), castop.parse(' DECIMAL ( 10 , 2 ) '))
+        self.assertEqual(('double precision', ()), castop.parse('double  precision'))
+        self.assertRaises(ValueError, castop.parse, 'VARCHAR(x)')
+        self.assertRaises(ValueError, castop.parse, 'int(')
+
+class TestConverter(unittest.TestCase):
+    def testPythonNames(self):
+        self.assertIs(int, castop.converter('int'))
+        self.assertIs(str, castop.converter('str'))
+        self.assertIs(float, castop.converter(float))
+    def testCached(self):
+        self.assertIs(castop.converter('DECIMAL(8,3)'), castop.converter('DECIMAL(8,3)'))
+    def testUnknown(self):
+        self.assertRaises(util.NotFound, castop.converter, 'GEOMETRY')
+    def testNumeric(self):
+        self.assertEqual(3, castop.converter('INTEGER')('3'))
+        self.assertEqual(3, castop.converter('bigint')(3.7))
+        self.assertEqual(2.5, castop.converter('DOUBLE PRECISION')('2.5'))
+    def testDecimal(self):
+        f = castop.converter('DECIMAL(5,2)')
+        self.assertEqual(Decimal('1.24'), f('1.235'))
+        self.assertEqual(Decimal('0.10'), f(0.1))
+        self.assertEqual(Decimal('-999.99'), f(Decimal('-999.99')))
+        self.assertRaises(ValueError, f, 1000)
+        self.assertEqual(Decimal('3'), castop.converter('NUMERIC')(2.5))
+    def testPythonDecimal(self):
+        self.assertEqual(Decimal('1.25'), nullop.cast(1.25, Decimal))
+        self.assertEqual(Decimal('3.75'), nullop.cast(' 3.75 ', Decimal))
+        self.assertEqual(Decimal('0.1'), nullop.cast(0.1, Decimal))
+        self.assertEqual(Decimal('7'), nullop.cast(7, Decimal))
+    def testString(self):
+        self.assertEqual('hel', castop.converter('VARCHAR(3)')('hello'))
+        self.assertEqual('12', castop.converter('VARCHAR')(12))
+        self.assertEqual('ab  ', castop.converter('CHAR(4)')('ab'))
+    def testBoolean(self):
+        f = castop.converter('BOOLEAN')
+        self.assertFalse(f('false'))
+        self.assertTrue(f(' TRUE '))
+        self.assertTrue(f(1))
+        self.assertRaises(ValueError, f, 'maybe')
+    def testDateTime(self):
+        t = datetime.datetime(2020, 1, 2, 3, 4, 5)
+        self.assertEqual(t.date(), castop.converter('DATE')('2020-01-02'))
+        self.assertEqual(t.date(), castop.converter('DATE')(t))
+        self.assertEqual(t.time(), castop.converter('TIME')('03:04:05'))
+        self.assertEqual(t, castop.converter('TIMESTAMP')('2020-01-02 03:04:05'))
+        self.assertEqual(datetime.datetime(2020, 1, 2), castop.converter(datetime.datetime)(t.date()))
+        self.assertRaises(TypeError, castop.converter('DATE'), 20200102)
+    def testRegister(self):
+        castop.register_cast('money', lambda: (lambda v: Decimal(v).quantize(Decimal('0.01'))))
+        try:
+            self.assertEqual(Decimal('1.50'), nullop.cast('1.5', 'MONEY'))
+        finally:
+            del castop.CASTS['MONEY']
+            castop.converters.clear()
+
+class TestNullCast(unittest.TestCase):
+    def testNull(self):
+        self.assertIsNone(nullop.cast(None, 'DECIMAL(5,2)'))
+        self.assertEqual(Decimal('2.50'), nullop.cast('2.5', 'DECIMAL(5,2)'))
@@ -0,0 +1,65 @@
+#! -*- coding: utf-8 -*-
+
+import sys
+import unittest
+from array import array
+from .. import nullop
+from .. import batchop
+from ..column import NullableColumn
+
+NUMBERS = [3, None, -2, 0, None, 7, 1, 10, None, 4]
+
+class TestNullableColumn(unittest.TestCase):
+    def testRoundTrip(self):
+        for S in [NUMBERS, [1.5, None, 2.0], [1, 2.5], ['a', None, 'b'], [True, None], [], [None], [1, 2]]:
+            self.assertEqual(S, NullableColumn.fromlist(S).tolist())
+    def testTypedBuffer(self):
+        self.assertEqual('q', NullableColumn.fromlist(NUMBERS).values.typecode)
+        self.assertEqual('d', NullableColumn.fromlist([1.5, None, 2.5]).values.typecode)
+        self.assertIsInstance(NullableColumn.fromlist([2**53 + 1, None, 2.5]).values, list)
+        self.assertEqual([2**53 + 1, None, 2.5], NullableColumn.fromlist([2**53 + 1, None, 2.5]).tolist())
+        self.assertIsInstance(NullableColumn.fromlist([2**64, 1]).values, list)
+        self.assertEqual([2**64, 1], NullableColumn.fromlist([2**64, 1]).tolist())
+        self.assertEqual('q', NullableColumn.fromlist([2**63 - 1, -2**63]).values.typecode)
+        self.assertIsNone(NullableColumn.fromlist([1, 2]).validity)
+        self.assertIsInstance(NullableColumn.fromlist(['a']).values, list)
+    def testIndexing(self):
+        C = NullableColumn.fromlist(NUMBERS)
+        self.assertEqual(NUMBERS, [C[i] for i in range(len(C))])
+        self.assertEqual(4, C[-1])
+        self.assertRaises(IndexError, lambda: C[10])
+        self.assertEqual(3, C.null_count)
+    def testSlicing(self):
+        C = NullableColumn.fromlist(NUMBERS)
+        for (start, stop, step) in [(2, 9, 1), (1, None, 1), (None, None, 2), (8, 2, -1), (5, 5, 1)]:
+            s = C[start:stop:step]
+            self.assertEqual(NUMBERS[start:stop:step], s.tolist())
+        s = C[3:9]
+        self.assertIs(C.values, s.values)
+        self.assertIs(C.validity, s.validity)
+        self.assertEqual(NUMBERS[4:7], s[1:4].tolist())
+    def testMemoryView(self):
+        C = NullableColumn.fromlist(NUMBERS)[5:8]
+        self.assertEqual([7, 1, 10], C.memoryview().tolist())
+        m = memoryview(array('d', [1.0, 2.0, 3.0]))
+        D = NullableColumn.frommemoryview(m, bytearray([0b101]))
+        self.assertEqual([1.0, None, 3.0], D.tolist())
+        self.assertRaises(TypeError, NullableColumn.fromlist(['a']).memoryview)
+    def testNullop(self):
+        C = NullableColumn.fromlist(NUMBERS)
+        self.assertEqual(nullop.aggregate_summary(NUMBERS), nullop.aggregate_summary(C))
+        self.assertEqual(nullop.aggregate_count(NUMBERS), nullop.aggregate_count(C))
+        self.assertEqual(nullop.aggregate_minimum(NUMBERS[3:]), nullop.aggregate_minimum(C[3:]))
+        self.assertTrue(nullop.isin(7, C))
+    def testBatchop(self):
+        C = NullableColumn.fromlist(NUMBERS)
+        self.assertEqual([nullop.lt(a, 3) for a in NUMBERS], list(batchop.lt(C, 3)))
+        self.assertEqual(nullop.aggregate_summary(NUMBERS), batchop.aggregate_summary(C))
+        S = ['ab', None, 'Cd']
+        self.assertEqual([nullop.ucase(s) for s in S], list(batchop.ucase(NullableColumn.fromlist(S))))
+    def testMemory(self):
+        n = 10000
+        S = [(None if i % 10 == 0 else i * 1000003) for i in range(n)]
+        C = NullableColumn.fromlist(S)
+        boxed = sys.getsizeof(S) + sum(sys.getsizeof(v) for v in S if v is not None)
+        self.assertLess(3 * (sys.getsizeof(C.values) + sys.getsizeof(C.validity)), boxed)
@@ -5,6 +5,11 @@ from ... import util
 from .. import nullop
 from .. import foldop
 
+try:
+    nullop.use_dbnull()
+except ImportError:
+    pass
+
 IronPythonOnly = unittest.skipIf(not hasattr(nullop, 'DBNull'), 'For IronPython only')
 if hasattr(nullop, 'DBNull'): dbnull = getattr(nullop, 'DBNull').Value
 
@@ -948,3 +953,40 @@ class TestFoldOperators(unittest.TestCase):
         self.assertEqual(3, r1)
         self.assertEqual(2, r2)
         self.assertEqual(0, r3)
+
+class TestFoldOpInterned(FoldOpTestCase):
+    def testFold(self):
+        self.assertIs(foldop.NULL, fold(None))
+        self.assertIs(foldop.TRUE, fold(True))
+        self.assertIs(foldop.FALSE, fold(False))
+        self.assertIs(foldop.NULL, fold(fold(None)))
+    def testComparison(self):
+        self.assertIs(foldop.TRUE, fold(1) < 2)
+        self.assertIs(foldop.FALSE, fold(1) > 2)
+        self.assertIs(foldop.NULL, fold(None) == 2)
+        self.assertIs(foldop.NULL, fold(1) <= None)
+    def testNullTest(self):
+        self.assertIs(foldop.TRUE, fold(None).isnull())
+        self.assertIs(foldop.FALSE, fold(None).notnull())
+        self.assertIs(foldop.FALSE, foldop.isnull(0))
+        self.assertIs(foldop.TRUE, fold(0).is_not_null)
+    def testLogic(self):
+        self.assertIs(foldop.TRUE, fold(True).and_(True))
+        self.assertIs(foldop.NULL, fold(None).or_(False))
+        self.assertIs(foldop.FALSE, fold(True).not_)
+        self.assertIs(foldop.TRUE, fold(2).inrange(1, 3))
+        self.assertIs(foldop.NULL, fold(None).inrange(1, 3))
+        self.assertIs(foldop.FALSE, fold(1).in_())
+    def testHash(self):
+        self.assertEqual(hash(None), hash(foldop.NULL))
+        self.assertEqual(hash(1), hash(fold(1)))
+    def testLazy(self):
+        self.assertIs(foldop.FALSE, foldop.LazyAnd(lambda: fold(None), lambda: False, lambda: 1 // 0))
+        self.assertIs(foldop.TRUE, foldop.LazyOr(fold(None), lambda: fold(1) < 2, lambda: 1 // 0))
+        self.assertIs(foldop.NULL, foldop.LazyAnd(x for x in [True, fold(None)]))
+    def testNullableSet(self):
+        N = nullop.NullableSet([1, 2, None])
+        self.assertIs(foldop.TRUE, fold(1).isin(N))
+        self.assertIs(foldop.NULL, fold(3).in_(N))
+        self.assertIs(foldop.NULL, fold(3).not_in_(fold(N)))
+        self.assertIs(foldop.FALSE, fold(2).notin(N))
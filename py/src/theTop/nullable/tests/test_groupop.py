@@ -0,0 +1,51 @@
+#! -*- coding: utf-8 -*-
+
+import unittest
+from ... import util
+from .. import nullop
+from .. import aggop
+from .. import groupop
+
+ROWS = [
+    ('a',    1,    3),
+    (None,   2, None),
+    ('b',    5,    8),
+    ('a', None,    2),
+    (None,   4,    1),
+    ('b',    3, None)]
+
+def naive(keys, specs, rows):
+    """group by scanning rows per group and aggregate, for reference"""
+    found = []
+    for row in rows:
+        key = tuple((None if nullop.isnull(row[i]) else row[i]) for i in keys)
+        if key not in found: found.append(key)
+    result = []
+    for key in found:
+        members = [r for r in rows if tuple((None if nullop.isnull(r[i]) else r[i]) for i in keys) == key]
+        result.append(key + aggop.aggregate(specs, members))
+    return result
+
+class TestGroupBy(unittest.TestCase):
+    specs = [('sum', 1), ('min', 2), ('max', 1), ('count', 2), ('count', None), ('avg', 1)]
+    def testNullKeysInOneGroup(self):
+        r = groupop.group_by([0], [('count', None), ('sum', 1)], ROWS)
+        self.assertEqual([('a', 2, 1), (None, 2, 6), ('b', 2, 8)], r)
+    def testAgainstNaive(self):
+        for keys in [[0], [0, 2], [], [1]]:
+            self.assertEqual(naive(keys, self.specs, ROWS), groupop.group_by(keys, self.specs, ROWS))
+    def testEmpty(self):
+        self.assertEqual([], groupop.group_by([0], self.specs, []))
+        self.assertEqual([(0, None)], groupop.group_by([], [('count', None), ('sum', 1)], []))
+        self.assertEqual([(len(ROWS),)], groupop.group_by([], [('count', None)], ROWS))
+    def testUnknownAggregate(self):
+        self.assertRaises(util.NotFound, groupop.GroupBy, [0], [('median', 1)])
+    def testSpill(self):
+        rows = [((i * 7) % 50, (None if i % 5 == 0 else i), i % 3) for i in range(1000)]
+        expected = sorted(groupop.group_by([0, 2], self.specs, rows), key=repr)
+        g = groupop.GroupBy([0, 2], self.specs, max_groups=10, partitions=4)
+        g.update_batch(rows)
+        self.assertTrue(g.spills > 0)
+        self.assertTrue(len(g.groups) <= 10)
+        self.assertEqual(expected, sorted(g.result(), key=repr))
+        g.close()
@@ -0,0 +1,67 @@
+#! -*- coding: utf-8 -*-
+
+import random
+import unittest
+from .. import nullop
+from .. import joinop
+
+LEFT = [
+    (1, 'a'),
+    (2, 'b'),
+    (None, 'c'),
+    (3, 'd'),
+    (2, 'e')]
+
+RIGHT = [
+    (2, 'x'),
+    (None, 'y'),
+    (3, 'z'),
+    (2, 'w'),
+    (4, 'v')]
+
+def nested(kind, left, right, lk, rk, width):
+    """join by nested loops with nullop.eq, for reference"""
+    def match(l, r): return nullop.And(*[nullop.eq(l[i], r[j]) for (i, j) in zip(lk, rk)])
+    for l in left:
+        matches = [tuple(l) + tuple(r) for r in right if match(l, r)]
+        if kind == 'inner': yield from matches
+        elif kind == 'left': yield from (matches or [tuple(l) + width * (None,)])
+        elif kind == 'semi':
+            if matches: yield l
+        elif not matches: yield l
+
+class TestJoin(unittest.TestCase):
+    def testInner(self):
+        self.assertEqual(
+            [(2, 'b', 2, 'x'), (2, 'b', 2, 'w'), (3, 'd', 3, 'z'), (2, 'e', 2, 'x'), (2, 'e', 2, 'w')],
+            list(joinop.inner_join(LEFT, RIGHT, [0], [0])))
+    def testLeft(self):
+        r = list(joinop.left_join(LEFT, RIGHT, [0], [0]))
+        self.assertEqual((1, 'a', None, None), r[0])
+        self.assertEqual((None, 'c', None, None), r[3])
+        self.assertEqual(7, len(r))
+    def testSemiAnti(self):
+        self.assertEqual([(2, 'b'), (3, 'd'), (2, 'e')], list(joinop.semi_join(LEFT, RIGHT, [0], [0])))
+        self.assertEqual([(1, 'a'), (None, 'c')], list(joinop.anti_join(LEFT, RIGHT, [0], [0])))
+    def testEmptyRight(self):
+        self.assertEqual([(1, 'a', None)], list(joinop.left_join(LEFT[:1], [], [0], [0], right_width=1)))
+        self.assertRaises(ValueError, list, joinop.left_join(LEFT[:1], [], [0], [0]))
+        self.assertEqual([], list(joinop.inner_join(LEFT[:1], [], [0], [0])))
+    def testUnknownKind(self):
+        self.assertRaises(ValueError, joinop.join, 'cross', LEFT, RIGHT, [0], [0])
+    def testAgainstNestedLoops(self):
+        r = random.Random(11)
+        def rows(n): return [((None if r.random() < 0.2 else r.randrange(20)), r.randrange(3), i) for i in range(n)]
+        (left, right) = (rows(200), rows(150))
+        for kind in joinop.KINDS:
+            for keys in [[0], [0, 1]]:
+                expected = sorted(nested(kind, left, right, keys, keys, 3), key=repr)
+                for max_rows in [None, 10, 1000]:
+                    actual = sorted(joinop.join(kind, left, right, keys, keys, max_rows=max_rows), key=repr)
+                    self.assertEqual(expected, actual)
+                    actual = sorted(joinop.join(kind, iter(left), iter(right), keys, keys, max_rows=max_rows), key=repr)
+                    self.assertEqual(expected, actual)
+    def testSmallerSideInner(self):
+        for (left, right) in [(LEFT * 20, RIGHT[:2]), (LEFT[:2], RIGHT * 20)]:
+            expected = list(nested('inner', left, right, [0], [0], 2))
+            self.assertEqual(sorted(expected, key=repr), sorted(joinop.inner_join(left, right, [0], [0]), key=repr))
@@ -0,0 +1,50 @@
+#! -*- coding: utf-8 -*-
+
+import unittest
+from .. import nullop
+from .. import nonnullop
+from .. import batchop
+from ..column import NullableColumn
+
+NUMBERS = [-3, 0, 1, 2, 7]
+STRINGS = ['', 'hello', ' Hi ', 'a_b']
+
+class TestNonNullKernels(unittest.TestCase):
+    def assertSame(self, name, *args):
+        self.assertEqual(getattr(nullop, name)(*args), getattr(nonnullop, name)(*args), (name, args))
+    def testSameAsNullop(self):
+        for a in NUMBERS:
+            for name in ['neg', 'pos', 'accept', 'isnull', 'notnull', 'Not']:
+                self.assertSame(name, a)
+            for b in NUMBERS:
+                for name in ['sub', 'lt', 'le', 'eq', 'ne', 'ge', 'gt', 'summarize', 'multiply']:
+                    self.assertSame(name, a, b)
+                if b:
+                    for name in ['floordiv', 'truediv', 'divmod', 'mod']: self.assertSame(name, a, b)
+                for c in NUMBERS:
+                    for name in ['between', 'And', 'Or']: self.assertSame(name, a, b, c)
+            for S in [[1, 2], [1, None], []]:
+                self.assertSame('isin', a, S)
+                self.assertSame('notin', a, S)
+        for s in STRINGS:
+            for name in ['ucase', 'lcase', 'ltrim', 'rtrim', 'trim']: self.assertSame(name, s)
+            for p in ['%', 'h%', '%_b', 'a\\_b']:
+                self.assertSame('like', s, p)
+                self.assertSame('like', s, p, '\\')
+            self.assertSame('concat', s, 'x', s)
+            self.assertSame('concat2', s, 'x')
+        self.assertSame('cast', '3', 'INTEGER')
+    def testKernel(self):
+        self.assertIs(nullop.lt, nonnullop.kernel('lt'))
+        self.assertIs(nonnullop.lt, nonnullop.kernel('lt', nullable=False))
+        self.assertIs(nullop.aggregate_summary, nonnullop.kernel('aggregate_summary', nullable=False))
+        self.assertRaises(AttributeError, nonnullop.kernel, 'kernel', False)
+
+class TestNonNullColumns(unittest.TestCase):
+    def testDeclared(self):
+        self.assertEqual([True, False, False], batchop.lt([1, 5, 3], 3, nullable=False))
+        self.assertEqual([None, False], batchop.lt([None, 5], 3))
+    def testNullableColumnWithoutNull(self):
+        C = NullableColumn.fromlist(['ab', 'c'])
+        self.assertIsNone(C.validity)
+        self.assertEqual(['AB', 'C'], batchop.ucase(C))
@@ -1,8 +1,14 @@
 #! -*- coding: utf-8 -*-
 
+import decimal
 import unittest
 from .. import nullop
 
+try:
+    nullop.use_dbnull()
+except ImportError:
+    pass
+
 IronPythonOnly = unittest.skipIf(not hasattr(nullop, 'DBNull'), 'For IronPython only')
 
 if hasattr(nullop, 'DBNull'): dbnull = getattr(nullop, 'DBNull').Value
@@ -28,6 +34,37 @@ class TestIsNull(unittest.TestCase):
     def testEmptyDictIsNotNull(self):
         self.assertFalse(nullop.isnull({}))
 
+class TestNullDetector(unittest.TestCase):
+    class Nullish(object):
+        def __init__(self, isnull): self.__isnull__ = isnull
+    def tearDown(self):
+        for f in [nullop.isnull_protocol, self.empty_string]:
+            if f in nullop.null_detectors: nullop.unregister_null_detector(f)
+    def empty_string(self, x): return x == ''
+    def testRegister(self):
+        self.assertFalse(nullop.isnull(''))
+        nullop.register_null_detector(self.empty_string)
+        self.assertTrue(nullop.isnull(''))
+        self.assertTrue(nullop.isnull(None))
+        self.assertFalse(nullop.isnull('x'))
+        self.assertIsNone(nullop.eq('', 'x'))
+        nullop.unregister_null_detector(self.empty_string)
+        self.assertFalse(nullop.isnull(''))
+    def testIsNullProtocol(self):
+        self.assertFalse(nullop.isnull(self.Nullish(True)))
+        nullop.register_null_detector(nullop.isnull_protocol)
+        nullop.register_null_detector(self.empty_string)
+        self.assertTrue(nullop.isnull(self.Nullish(True)))
+        self.assertFalse(nullop.isnull(self.Nullish(False)))
+        self.assertTrue(nullop.isnull(''))
+        self.assertFalse(nullop.isnull(0))
+    def testFolded(self):
+        from ..foldop import fold
+        self.assertTrue(nullop.isnull(fold(None)))
+        self.assertFalse(nullop.isnull(fold(0)))
+        nullop.register_null_detector(self.empty_string)
+        self.assertTrue(nullop.isnull(fold('')))
+
 class TestAccept(unittest.TestCase):
     def testNoneIsNotAccepted(self):
         self.assertFalse(nullop.accept(None))
@@ -155,6 +192,16 @@ class TestOperators(unittest.TestCase):
     def testNotIn_IronPython(self):
         S = [1, None, 3, 4, dbnull, 6, 7]
         self.assertNull(nullop.notin(2, S))
+    def testNullableSet(self):
+        for S in [[1, None, 3, 4, None, 6, 7], [1, 3], [], [None], [[1], 2, None], [[1], 2]]:
+            N = nullop.NullableSet(S)
+            for a in [None, 1, 2, 3, [1], [2]]:
+                self.assertEqual(nullop.isin(a, S), nullop.isin(a, N))
+                self.assertEqual(nullop.notin(a, S), nullop.notin(a, N))
+        N = nullop.NullableSet([2, None, 2, [1]])
+        self.assertTrue(N.contains_null)
+        self.assertEqual(2, len(N))
+        self.assertEqual([2, [1]], list(N))
     def testLessThan(self):
         self.assertNull(nullop.lt(None, None))
         self.assertNull(nullop.lt(1, None))
@@ -269,6 +316,37 @@ class TestOperators(unittest.TestCase):
         self.assertNull(nullop.Or(False, dbnull, False, False))
         self.assertNull(nullop.Or(dbnull, dbnull))
         self.assertTrue(nullop.Or(dbnull, True, False))
+    def testLazyAnd(self):
+        self.assertNull(nullop.LazyAnd(True, lambda: None, True))
+        self.assertTrue(nullop.LazyAnd(lambda: True, lambda: 1))
+        self.assertTrue(nullop.LazyAnd())
+        self.assertFalse(nullop.LazyAnd(None, lambda: False))
+        calls = []
+        def p(v): return lambda: calls.append(v) or v
+        self.assertFalse(nullop.LazyAnd(p(None), p(False), p(True)))
+        self.assertEqual([None, False], calls)
+        del calls[:]
+        self.assertFalse(nullop.LazyAnd(x() for x in [p(True), p(False), p(True)]))
+        self.assertEqual([True, False], calls)
+        self.assertFalse(nullop.LazyAnd([False]))
+        self.assertNull(nullop.LazyAnd((True, None)))
+        self.assertTrue(nullop.LazyAnd([]))
+        self.assertTrue(nullop.LazyAnd('x'))
+    def testLazyOr(self):
+        self.assertNull(nullop.LazyOr(False, lambda: None, False))
+        self.assertFalse(nullop.LazyOr(lambda: False, lambda: 0))
+        self.assertFalse(nullop.LazyOr())
+        self.assertTrue(nullop.LazyOr(None, lambda: True))
+        calls = []
+        def p(v): return lambda: calls.append(v) or v
+        self.assertTrue(nullop.LazyOr(p(None), p(True), p(False)))
+        self.assertEqual([None, True], calls)
+        del calls[:]
+        self.assertTrue(nullop.LazyOr(iter([p(False), p(True), p(False)])))
+        self.assertEqual([False, True], calls)
+        self.assertTrue(nullop.LazyOr([True]))
+        self.assertFalse(nullop.LazyOr((False, lambda: 0)))
+        self.assertFalse(nullop.LazyOr([]))
     def testNot(self):
         self.assertNull(nullop.Not(None))
         self.assertFalse(nullop.Not(True))
@@ -492,16 +570,62 @@ class TestOperators(unittest.TestCase):
         self.assertEqual(8, r2)
         self.assertEqual(0, r3)
 
-class TestDictWithLimit(unittest.TestCase):
-    def test_dict_with_limit(self):
-        dic = {}
-        limit = 5
-        def assert_joined_keys(s): self.assertEqual(s, ''.join(dic.keys()))
-        nullop._add_to_dict_with_limit(dic, limit, 'q', 0); assert_joined_keys('q')
-        nullop._add_to_dict_with_limit(dic, limit, 'w', 1); assert_joined_keys('qw')
-        nullop._add_to_dict_with_limit(dic, limit, 'e', 2); assert_joined_keys('qwe')
-        nullop._add_to_dict_with_limit(dic, limit, 'r', 3); assert_joined_keys('qwer')
-        nullop._add_to_dict_with_limit(dic, limit, 't', 4); assert_joined_keys('qwert')
-        nullop._add_to_dict_with_limit(dic, limit, 'y', 5); assert_joined_keys('werty')
-        nullop._add_to_dict_with_limit(dic, limit, 'u', 6); assert_joined_keys('ertyu')
-        nullop._add_to_dict_with_limit(dic, limit, 'i', 7); assert_joined_keys('rtyui')
+class TestLikePattern(unittest.TestCase):
+    def assertKind(self, kind, pattern, escape=None):
+        self.assertEqual(kind, nullop.LikePattern(pattern, escape).kind)
+    def testKinds(self):
+        self.assertKind('exact', '')
+        self.assertKind('exact', 'hello')
+        self.assertKind('exact', 'he%llo', 'e')
+        self.assertKind('any', '%')
+        self.assertKind('any', '%%')
+        self.assertKind('prefix', 'hell%')
+        self.assertKind('prefix', 'hello__%', '_')
+        self.assertKind('suffix', '%llo')
+        self.assertKind('contains', '%ll%')
+        self.assertKind('contains', '%!%%', '!')
+        self.assertKind('regex', 'h_llo')
+        self.assertKind('regex', 'h%l%o')
+    def testMatch(self):
+        cases = [
+            ('hello', 'hello', True), ('hello', 'hell', False),
+            ('', '', True), ('a', '', False), ('', '%', True),
+            ('hello', 'hell%', True), ('hell', 'hell%', True), ('hel', 'hell%', False),
+            ('hello', '%llo', True), ('hello', '%ll', False),
+            ('hello', '%ll%', True), ('hello', '%lo%', True), ('hello', '%x%', False),
+            ('hello', 'h_llo', True), ('hllo', 'h_llo', False),
+            ('hello', 'h%l%o', True), ('ho', 'h%l%o', False),
+            ('a\nb', 'a%b', True), ('a\nb', 'a_b', True),
+            ('a.b', 'a.b', True), ('axb', 'a.b', False), ('a.b.c', 'a._.c', True), ('a.b.c', 'a._', False),
+            ('(x)', '(%)', True), ('[ab]', '[%]', True), ('a*b', 'a*_', True)]
+        for (s, pattern, expected) in cases:
+            self.assertEqual(expected, nullop.like(s, pattern), (s, pattern))
+    def testEscape(self):
+        self.assertTrue(nullop.like('50%', '50!%', '!'))
+        self.assertFalse(nullop.like('500', '50!%', '!'))
+        self.assertTrue(nullop.like('a_b', '%!_%', '!'))
+        self.assertFalse(nullop.like('ab', '%!_%', '!'))
+        self.assertTrue(nullop.like('a!b', 'a!b', '!'))
+        self.assertTrue(nullop.like('a!b', 'a!!b', '!'))
+        self.assertFalse(nullop.like('a!!b', 'a!!b', '!'))
+        self.assertTrue(nullop.like('a!x', 'a!!_', '!'))
+        self.assertTrue(nullop.like('50%!', '50!%!!', '!'))
+    def testNotString(self):
+        self.assertIs(False, nullop.like(5, '6'))
+        self.assertIs(True, nullop.compile_like('6').match(6))
+        cases = [('exact', '125', '12'), ('prefix', '12%', '2%'), ('suffix', '%25', '%12'),
+                 ('contains', '%2%', '%9%'), ('regex', '1_5', '1_6'), ('any', '%', None)]
+        for (kind, hit, miss) in cases:
+            self.assertEqual(kind, nullop.compile_like(hit).kind)
+            self.assertIs(True, nullop.like(125, hit))
+            self.assertIs(True, nullop.like(decimal.Decimal('125'), hit))
+            if miss is not None: self.assertIs(False, nullop.like(125, miss))
+        self.assertIs(True, nullop.like(1.5, '1._'))
+    def testCache(self):
+        nullop.like_cache.clear()
+        for i in range(3):
+            self.assertTrue(nullop.like('abc', 'a%'))
+        stats = nullop.like_cache.stats()
+        self.assertEqual(1, stats['misses'])
+        self.assertEqual(2, stats['hits'])
+        self.assertIs(nullop.compile_like('a%'), nullop.compile_like('a%'))
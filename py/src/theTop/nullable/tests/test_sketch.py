@@ -0,0 +1,72 @@
+#! -*- coding: utf-8 -*-
+
+import pickle
+import random
+import unittest
+from .. import nullop
+from .. import aggop
+from .. import sketch
+
+class TestHyperLogLog(unittest.TestCase):
+    def estimate(self, n, precision=14):
+        h = sketch.HyperLogLog(precision)
+        for i in range(n): h.add('event-%d' % (i % (n // 2 or 1)))
+        return h
+    def testAccuracy(self):
+        for n in [0, 10, 1000, 40000]:
+            distinct = n // 2
+            e = self.estimate(n).result()
+            self.assertLessEqual(abs(e - distinct), max(2, 0.03 * distinct), (n, e))
+    def testMerge(self):
+        (a, b) = (sketch.HyperLogLog(12), sketch.HyperLogLog(12))
+        for i in range(20000): (a if i % 2 else b).add(i % 15000)
+        e = a.merge(b).result()
+        self.assertLess(abs(e - 15000), 0.05 * 15000)
+        self.assertRaises(ValueError, a.merge, sketch.HyperLogLog(13))
+    def testEqualValues(self):
+        h = sketch.HyperLogLog()
+        for v in [1, 1.0, 2, '1', b'1']: h.add(v)
+        self.assertEqual(4, h.result())
+    def testSerialize(self):
+        h = self.estimate(5000, 10)
+        self.assertEqual(1025, len(h.to_bytes()))
+        self.assertEqual(h.result(), sketch.HyperLogLog.from_bytes(h.to_bytes()).result())
+        self.assertEqual(h.result(), pickle.loads(pickle.dumps(h)).result())
+        self.assertRaises(ValueError, sketch.HyperLogLog.from_bytes, b'\x0a\x00')
+    def testNullop(self):
+        self.assertEqual(3, nullop.aggregate_approx_count_distinct([None, 'a', 'b', None, 'a', 'c']))
+        self.assertEqual(0, nullop.aggregate_approx_count_distinct([None]))
+
+class TestKllSketch(unittest.TestCase):
+    def testAccuracy(self):
+        g = random.Random(5)
+        values = [g.random() for i in range(50000)]
+        s = sketch.KllSketch(200)
+        for v in values: s.add(v)
+        self.assertEqual(50000, s.count)
+        self.assertLess(s.size, 1000)
+        ordered = sorted(values)
+        for q in [0.01, 0.25, 0.5, 0.9, 0.99]:
+            self.assertLess(abs(s.rank(s.quantile(q)) - q), 0.02)
+            self.assertLess(abs(ordered.index(s.quantile(q)) / 50000 - q), 0.03)
+    def testMerge(self):
+        parts = [sketch.KllSketch(100) for i in range(4)]
+        for i in range(20000): parts[i % 4].add(i)
+        s = parts[0]
+        for p in parts[1:]: s.merge(p)
+        self.assertEqual(20000, s.count)
+        self.assertLess(abs(s.quantile(0.5) - 10000), 20000 * 0.05)
+        s = pickle.loads(pickle.dumps(s))
+        self.assertLess(abs(s.result() - 10000), 20000 * 0.05)
+    def testSmall(self):
+        self.assertIsNone(sketch.KllSketch().result())
+        self.assertEqual(3, nullop.aggregate_approx_quantile([5, None, 1, 3, None, 4, 2]))
+        self.assertEqual(5, nullop.aggregate_approx_quantile([5, None, 1, 3], 1.0))
+        self.assertIsNone(nullop.aggregate_approx_quantile([None]))
+
+class TestAggregator(unittest.TestCase):
+    def testSpecs(self):
+        rows = [(i % 7, (None if i % 5 == 0 else i)) for i in range(1000)]
+        (distinct, median) = aggop.aggregate([('approx_count_distinct', 0), ('approx_median', 1)], rows)
+        self.assertEqual(7, distinct)
+        self.assertLess(abs(median - 500), 20)
@@ -0,0 +1,50 @@
+#! -*- coding: utf-8 -*-
+
+import random
+import unittest
+from .. import sortop
+
+ROWS = [
+    (   2,  'b'),
+    (None,  'a'),
+    (   1, None),
+    (   2,  'a'),
+    (None, None),
+    (   3,  'c')]
+
+class TestSortKey(unittest.TestCase):
+    def order(self, order):
+        return sorted(ROWS, key=sortop.sort_key(order))
+    def testAscNullsLast(self):
+        self.assertEqual([1, 2, 2, 3, None, None], [r[0] for r in self.order([0])])
+    def testAscNullsFirst(self):
+        self.assertEqual([None, None, 1, 2, 2, 3], [r[0] for r in self.order([sortop.asc(0, nulls_first=True)])])
+    def testDescNullsFirst(self):
+        self.assertEqual([None, None, 3, 2, 2, 1], [r[0] for r in self.order([sortop.desc(0)])])
+    def testDescNullsLast(self):
+        self.assertEqual([3, 2, 2, 1, None, None], [r[0] for r in self.order([sortop.desc(0, nulls_first=False)])])
+    def testComposite(self):
+        self.assertEqual(
+            [(3, 'c'), (2, 'a'), (2, 'b'), (1, None), (None, None), (None, 'a')],
+            self.order([sortop.desc(0, nulls_first=False), sortop.asc(1, nulls_first=True)]))
+    def testStable(self):
+        self.assertEqual([(1, None), (2, 'b'), (2, 'a')], self.order([0])[:3])
+
+class TestSort(unittest.TestCase):
+    def rows(self, n):
+        r = random.Random(7)
+        return [((None if r.random() < 0.1 else r.randrange(50)), r.randrange(1000)) for i in range(n)]
+    def testExternal(self):
+        rows = self.rows(1000)
+        order = [sortop.desc(0), 1]
+        expected = sorted(rows, key=sortop.sort_key(order))
+        for max_rows in [None, 1, 7, 100, 999, 1000, 1001, 5000]:
+            self.assertEqual(expected, list(sortop.sort(rows, order, max_rows)))
+    def testEmpty(self):
+        self.assertEqual([], list(sortop.sort([], [0], 10)))
+    def testTop(self):
+        rows = self.rows(500)
+        order = [0, sortop.desc(1)]
+        expected = sorted(rows, key=sortop.sort_key(order))
+        for n in [0, 1, 10, 500, 600]:
+            self.assertEqual(expected[:n], sortop.top(iter(rows), order, n))
@@ -0,0 +1,77 @@
+#! -*- coding: utf-8 -*-
+
+import random
+from itertools import islice
+import unittest
+from ... import util
+from .. import nullop
+from .. import windowop
+
+ROWS = [
+    ('a', 1,   10),
+    ('a', 2, None),
+    ('a', 2,    5),
+    ('a', 4,    1),
+    ('b', 1,    3),
+    (None, 1,   7),
+    (None, 3,   2)]
+
+def column(rows, n=1): return [r[-n] for r in rows]
+
+class TestWindow(unittest.TestCase):
+    def run_window(self, specs):
+        return list(windowop.window(ROWS, specs, partition=[0], order=[1]))
+    def testRowNumber(self):
+        self.assertEqual([1, 2, 3, 4, 1, 1, 2], column(self.run_window([('row_number',)])))
+    def testRank(self):
+        r = self.run_window([('rank',), ('dense_rank',)])
+        self.assertEqual([1, 2, 2, 4, 1, 1, 2], column(r, 2))
+        self.assertEqual([1, 2, 2, 3, 1, 1, 2], column(r, 1))
+    def testRunning(self):
+        r = self.run_window([('sum', 2), ('count', 2), ('min', 2), ('count', None)])
+        self.assertEqual([10, 10, 15, 16, 3, 7, 9], column(r, 4))
+        self.assertEqual([1, 1, 2, 3, 1, 1, 2], column(r, 3))
+        self.assertEqual([10, 10, 5, 1, 3, 7, 2], column(r, 2))
+        self.assertEqual([1, 2, 3, 4, 1, 1, 2], column(r, 1))
+    def testLagLead(self):
+        r = self.run_window([('lag', 2), ('lead', 2, 2, 0)])
+        self.assertEqual([None, 10, None, 5, None, None, 7], column(r, 2))
+        self.assertEqual([5, 1, 0, 0, 0, 0, 0], column(r, 1))
+    def testMoving(self):
+        r = self.run_window([('sum', 2, 1, 1), ('max', 2, 0, 2)])
+        self.assertEqual([10, 15, 6, 6, 3, 9, 9], column(r, 2))
+        self.assertEqual([10, 5, 5, 1, 3, 7, 2], column(r, 1))
+    def testRowsAreKept(self):
+        self.assertEqual(ROWS, [r[:3] for r in self.run_window([('row_number',)])])
+    def testStreaming(self):
+        def ledger():
+            i = 0
+            while True:
+                yield ('acc', i, 1)
+                i += 1
+        r = windowop.window(ledger(), [('sum', 2), ('lead', 1)], partition=[0], order=[1])
+        self.assertEqual([('acc', i, 1, i + 1, i + 1) for i in range(1000)], list(islice(r, 1000)))
+    def testUnknown(self):
+        self.assertRaises(util.NotFound, windowop.function, ('ntile', 1, 2))
+        self.assertRaises(util.NotFound, windowop.function, ('median', 1))
+    def testAgainstNaive(self):
+        g = random.Random(3)
+        rows = sorted(((g.randrange(4), g.randrange(10), (None if g.random() < 0.2 else g.randrange(100)))
+                       for i in range(300)), key=lambda r: (r[0], r[1]))
+        specs = [('sum', 2), ('lag', 2, 3, -1), ('lead', 2, 2, -1), ('avg', 2, 3, 2)]
+        result = list(windowop.window(iter(rows), specs, partition=[0], order=[1]))
+        for p in range(4):
+            part = [r for r in rows if r[0] == p]
+            values = [r[2] for r in part]
+            expected = []
+            for (i, row) in enumerate(part):
+                expected.append(row + (
+                    nullop.aggregate_summary(values[:i + 1]),
+                    values[i - 3] if i >= 3 else -1,
+                    values[i + 2] if i + 2 < len(part) else -1,
+                    _average(values[max(0, i - 3):i + 3])))
+            self.assertEqual(expected, [r for r in result if r[0] == p])
+
+def _average(S):
+    S = [v for v in S if v is not None]
+    return (sum(S) / len(S)) if S else None
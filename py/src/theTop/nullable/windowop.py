@@ -0,0 +1,131 @@
+#! -*- coding: utf-8 -*-
+
+from collections import deque
+from itertools import groupby
+
+from .. import util
+from . import nullop
+from . import aggop
+
+class Function(object):
+    """window function state of a partition, value() is called for rows in order"""
+    __slots__ = ()
+    behind = 0                              # rows before current row to be kept
+    ahead = 0                               # rows after current row to be read first
+    def reset(self): pass
+    def value(self, buf, pos, peers): raise NotImplementedError()
+
+class RowNumber(Function):
+    __slots__ = 'n'
+    def reset(self): self.n = 0
+    def value(self, buf, pos, peers):
+        self.n += 1
+        return self.n
+
+class Rank(Function):
+    __slots__ = 'n', 'rank'
+    dense = False
+    def reset(self): (self.n, self.rank) = (0, 0)
+    def value(self, buf, pos, peers):
+        self.n += 1
+        if not peers: self.rank = (self.rank + 1) if self.dense else self.n
+        return self.rank
+
+class DenseRank(Rank):
+    __slots__ = ()
+    dense = True
+
+class Running(Function):
+    """aggregate from the first row of partition to current row"""
+    __slots__ = 'name', 'index', 'acc'
+    def __init__(self, name, index):
+        (self.name, self.index) = (name, index)
+        aggop.accumulator(name)
+    def reset(self): self.acc = aggop.accumulator(self.name)
+    def value(self, buf, pos, peers):
+        v = buf[pos] if self.index is None else buf[pos][self.index]
+        if not nullop.isnull(v): self.acc.add(v)
+        return self.acc.result()
+
+class Moving(Function):
+    """aggregate of rows from preceding rows before to following rows after current row"""
+    __slots__ = 'name', 'index', 'behind', 'ahead'
+    def __init__(self, name, index, preceding, following):
+        (self.name, self.index, self.behind, self.ahead) = (name, index, preceding, following)
+        aggop.accumulator(name)
+    def value(self, buf, pos, peers):
+        acc = aggop.accumulator(self.name)
+        isnull = nullop.isnull
+        for j in range(max(0, pos - self.behind), min(len(buf), pos + self.ahead + 1)):
+            v = buf[j] if self.index is None else buf[j][self.index]
+            if not isnull(v): acc.add(v)
+        return acc.result()
+
+class Lag(Function):
+    __slots__ = 'index', 'behind', 'default'
+    def __init__(self, index, offset=1, default=None):
+        (self.index, self.behind, self.default) = (index, offset, default)
+    def value(self, buf, pos, peers):
+        j = pos - self.behind
+        return buf[j][self.index] if j >= 0 else self.default
+
+class Lead(Function):
+    __slots__ = 'index', 'ahead', 'default'
+    def __init__(self, index, offset=1, default=None):
+        (self.index, self.ahead, self.default) = (index, offset, default)
+    def value(self, buf, pos, peers):
+        j = pos + self.ahead
+        return buf[j][self.index] if j < len(buf) else self.default
+
+FUNCTIONS = {
+    'row_number': RowNumber,
+    'rank': Rank,
+    'dense_rank': DenseRank,
+    'lag': Lag,
+    'lead': Lead,
+}
+
+def function(spec):
+    """create window function of spec, e.g. ('rank',), ('lag', index, 1, None), ('sum', index) or ('sum', index, 2, 0)"""
+    (name, args) = (spec[0], tuple(spec[1:]))
+    f = FUNCTIONS.get(name)
+    if f is not None: return f(*args)
+    if len(args) == 1: return Running(name, *args)
+    if len(args) == 3: return Moving(name, *args)
+    raise util.NotFound('Unknown window function: %s' % repr(spec))
+
+def _keyfn(indexes):
+    indexes = tuple((x if isinstance(x, int) else x[0]) for x in indexes)
+    isnull = nullop.isnull
+    return lambda row: tuple((None if isnull(row[i]) else row[i]) for i in indexes)
+
+def window(S, specs, partition=(), order=()):
+    """iterate rows of S sorted by partition and order, followed by values of window functions of specs"""
+    # only rows within the frames of functions are kept, running aggregates are ROWS UNBOUNDED PRECEDING
+    functions = tuple(function(spec) for spec in specs)
+    behind = max([f.behind for f in functions] + [0])
+    ahead = max([f.ahead for f in functions] + [0])
+    okey = _keyfn(order)
+    for (k, rows) in groupby(nullop.inarg(S), key=_keyfn(partition)):
+        for f in functions: f.reset()
+        buf = deque()
+        pos = 0
+        last = None
+        def emit():
+            nonlocal last
+            row = buf[pos]
+            current = okey(row)
+            peers = (last is not None) and (current == last)
+            last = current
+            return tuple(row) + tuple(f.value(buf, pos, peers) for f in functions)
+        for row in rows:
+            buf.append(row)
+            if len(buf) - 1 - pos >= ahead:
+                yield emit()
+                pos += 1
+                if pos > behind:
+                    buf.popleft()
+                    pos -= 1
+        while pos < len(buf):
+            yield emit()
+            pos += 1
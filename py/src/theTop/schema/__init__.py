@@ -0,0 +1,5 @@
+#! -*- coding: utf-8 -*-
+
+from ._types import Column, NotNull, Schema
+
+__all__ = ['Column', 'NotNull', 'Schema']
@@ -0,0 +1,45 @@
+#! -*- coding: utf-8 -*-
+
+from .. import util
+
+class Column(object):
+    """declared column of name, type and nullability"""
+    __slots__ = 'name', 'type', 'nullable'
+    def __init__(self, name, type=None, nullable=True):
+        self.name = name
+        self.type = type                    # python type or sql type name, None when unknown
+        self.nullable = nullable
+    def __repr__(self):
+        return 'Column(%s, %s%s)' % (repr(self.name), repr(self.type), '' if self.nullable else ', nullable=False')
+
+def NotNull(name, type=None):
+    """declare column which never contains null"""
+    return Column(name, type, nullable=False)
+
+class Schema(object):
+    """declared columns, names which are not declared are nullable"""
+    def __init__(self, columns=()):
+        self.columns = {}                   # {'name': Column}
+        for c in columns: self.add(c)
+    def __repr__(self): return 'Schema(%s)' % repr(list(self.columns.values()))
+    def __len__(self): return len(self.columns)
+    def __iter__(self): return iter(self.columns.values())
+    def __contains__(self, name): return name in self.columns
+    def add(self, column):
+        if isinstance(column, str): column = Column(column)
+        if column.name in self.columns:
+            raise util.CannotModify('Column already declared: %s' % repr(column.name))
+        self.columns[column.name] = column
+        return column
+    def get(self, name):
+        try:
+            return self.columns[name]
+        except KeyError:
+            raise util.NotFound('Undeclared column: %s' % repr(name))
+    def nullable(self, name):
+        c = self.columns.get(name)
+        return True if c is None else c.nullable
+    def names(self): return [c.name for c in self]
+    def nullables(self):
+        """return nullability of each column, in declared order"""
+        return [c.nullable for c in self]
@@ -0,0 +1,20 @@
+#! -*- coding: utf-8 -*-
+
+import unittest
+from ... import util
+from .. import Column, NotNull, Schema
+
+class TestSchema(unittest.TestCase):
+    def testNullable(self):
+        s = Schema([NotNull('ID', int), Column('NAME', 'VARCHAR(20)'), 'NOTE'])
+        self.assertFalse(s.nullable('ID'))
+        self.assertTrue(s.nullable('NAME'))
+        self.assertTrue(s.nullable('NOTE'))
+        self.assertTrue(s.nullable('UNKNOWN'))
+        self.assertEqual(['ID', 'NAME', 'NOTE'], s.names())
+        self.assertEqual([False, True, True], s.nullables())
+    def testLookup(self):
+        s = Schema([NotNull('ID')])
+        self.assertEqual('ID', s.get('ID').name)
+        self.assertRaises(util.NotFound, s.get, 'NAME')
+        self.assertRaises(util.CannotModify, s.add, Column('ID'))
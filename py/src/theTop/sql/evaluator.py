@@ -1,18 +1,440 @@
 #! -*- coding: utf-8 -*-
 
-import decimal
-from .. import nullable
-# from ..text import verse
-from . import common
-from . import expr
-from . import table
-
-class BaseEvaluator(common.Builder):
-    items = None
-    params = None
-
-class TableEvaluator(BaseEvaluator):
-    pass
-
-class StoreEvaluator(BaseEvaluator):
-    pass
+import datetime
+import functools
+from itertools import islice, repeat
+from .. import util
+from ..model import models
+from ..nullable import nullop
+from ..nullable import nonnullop
+from ..nullable import castop
+from ..nullable import batchop
+from ..nullable import column
+
+class Term(object):
+    """compiled expression, f(row, params) return the value"""
+    __slots__ = 'f', 'nullable', 'constant', 'index'
+    def __init__(self, f, nullable=True, constant=NotImplemented, index=None):
+        self.f = f
+        self.nullable = nullable
+        self.constant = constant            # value of constant term, NotImplemented otherwise
+        self.index = index                  # row index of item term, None otherwise
+    @staticmethod
+    def of(value):
+        return Term((lambda row, params: value), nullop.isnull(value), value)
+    def isconstant(self): return self.constant is not NotImplemented
+
+# {'NAME': 'nullop function name'}
+FUNCTIONS = {
+    'ABS': 'abs',
+    'POWER': 'pow',
+    'MOD': 'mod',
+    'UCASE': 'ucase',
+    'UPPER': 'ucase',
+    'LCASE': 'lcase',
+    'LOWER': 'lcase',
+    'REPLACE': 'replace',
+    'LTRIM': 'ltrim',
+    'RTRIM': 'rtrim',
+    'TRIM': 'trim',
+}
+
+COMPARISONS = {
+    models.Comparison.LT: 'lt',
+    models.Comparison.LE: 'le',
+    models.Comparison.EQ: 'eq',
+    models.Comparison.NE: 'ne',
+    models.Comparison.GE: 'ge',
+    models.Comparison.GT: 'gt',
+}
+
+DATETIME_PARTS = ('year', 'month', 'day', 'hour', 'minute', 'second', 'microsecond')
+
+def _abs(n):
+    n = nullop.inarg(n)
+    if nullop.isnull(n): return None
+    return abs(n)
+
+def _kernel(name, nullable):
+    if name == 'abs': return abs if not nullable else _abs
+    return nonnullop.kernel(name, nullable)
+
+def _period_start(d, part, offset):
+    if part == models.DateTimePart.YEAR:
+        return _truncate(d, 1).replace(year=d.year + offset)
+    if part == models.DateTimePart.MONTH:
+        (y, m) = divmod(d.year * 12 + d.month - 1 + offset, 12)
+        return _truncate(d, 2).replace(year=y, month=m + 1)
+    delta = {
+        models.DateTimePart.DAY: datetime.timedelta(days=1),
+        models.DateTimePart.HOUR: datetime.timedelta(hours=1),
+        models.DateTimePart.MINUTE: datetime.timedelta(minutes=1),
+        models.DateTimePart.SECOND: datetime.timedelta(seconds=1),
+        models.DateTimePart.MICROSECOND: datetime.timedelta(microseconds=1),
+    }[part]
+    return _truncate(d, part + 1) + offset * delta
+
+def _truncate(d, size):
+    """keep the first size parts of d, i.e. year, month, day, ..."""
+    fields = {'month': 1, 'day': 1}
+    if isinstance(d, datetime.datetime): fields.update(hour=0, minute=0, second=0, microsecond=0)
+    for name in DATETIME_PARTS[:size]: fields.pop(name, None)
+    return d.replace(**fields)
+
+class Evaluator(models.Emitter):
+    """emitter compiling expression into Term, labels are resolved into row indexes ahead of evaluation"""
+    def __init__(self, labels=None, schema=None):
+        self.indexes = None if labels is None else dict((k, i) for (i, k) in enumerate(labels))
+        self.schema = schema
+    def compile(self, expr):
+        """return function(row, params) evaluating expr"""
+        return self.inner(self, expr, None).f
+    def composer(self): raise NotImplementedError('Cannot evaluate composite model in memory')
+    def apply(self, name, args):
+        nullable = any(a.nullable for a in args)
+        k = _kernel(name, nullable)
+        if all(a.isconstant() for a in args): return Term.of(k(*[a.constant for a in args]))
+        fs = [a.f for a in args]
+        if len(fs) == 1:
+            (f1,) = fs
+            return Term((lambda row, params: k(f1(row, params))), nullable)
+        if len(fs) == 2:
+            (a, b) = args
+            if (a.index is not None) and b.isconstant():
+                (i, c) = (a.index, b.constant)
+                return Term((lambda row, params: k(row[i], c)), nullable)
+            if a.isconstant() and (b.index is not None):
+                (c, i) = (a.constant, b.index)
+                return Term((lambda row, params: k(c, row[i])), nullable)
+            if (a.index is not None) and (b.index is not None):
+                (i, j) = (a.index, b.index)
+                return Term((lambda row, params: k(row[i], row[j])), nullable)
+            (f1, f2) = fs
+            return Term((lambda row, params: k(f1(row, params), f2(row, params))), nullable)
+        if len(fs) == 3:
+            (f1, f2, f3) = fs
+            return Term((lambda row, params: k(f1(row, params), f2(row, params), f3(row, params))), nullable)
+        return Term((lambda row, params: k(*[f(row, params) for f in fs])), nullable)
+    def ExpressionList(self, S):
+        if all(x.isconstant() for x in S):
+            values = nullop.NullableSet(x.constant for x in S)
+            return Term((lambda row, params: values), values.contains_null, values)
+        fs = [x.f for x in S]
+        return Term((lambda row, params: [f(row, params) for f in fs]), any(x.nullable for x in S))
+    def DateTimePart(self, date, part):
+        name = DATETIME_PARTS[part]
+        f = date.f
+        def part_of(row, params):
+            d = f(row, params)
+            if nullop.isnull(d): return None
+            return getattr(d, name)
+        return Term(part_of, date.nullable)
+    def PeriodStart(self, date, part, offset):
+        (f, g) = (date.f, offset.f)
+        def period_start(row, params):
+            (d, n) = (f(row, params), g(row, params))
+            if nullop.isnull(d) or nullop.isnull(n): return None
+            return _period_start(d, part, n)
+        return Term(period_start, date.nullable or offset.nullable)
+    def _strftime(self, date, fmt):
+        f = date.f
+        def strftime(row, params):
+            d = f(row, params)
+            if nullop.isnull(d): return None
+            return nullop.inarg(d).strftime(fmt)
+        return Term(strftime, date.nullable)
+    def YYYY_MM_DD(self, date, sep): return self._strftime(date, sep.constant.join(['%Y', '%m', '%d']))
+    def HH_MM_SS(self, date, sep): return self._strftime(date, sep.constant.join(['%H', '%M', '%S']))
+    def Parentheses(self, x): return x
+    def Constant(self, c): return Term.of(c)
+    def Value(self, v): return Term.of(v)
+    def Item(self, name):
+        nullable = True if self.schema is None else self.schema.nullable(name)
+        if self.indexes is None: return Term((lambda row, params: row[name]), nullable)
+        try:
+            i = self.indexes[name]
+        except KeyError:
+            raise util.NotFound('Unknown item: %s' % repr(name))
+        return Term((lambda row, params: row[i]), nullable, index=i)
+    def HostItem(self, name): return Term(lambda row, params: params[name])
+    def Parameter(self, name): return Term(lambda row, params: params[name])
+    def Call(self, name, args):
+        try:
+            f = FUNCTIONS[name.upper()]
+        except KeyError:
+            raise util.NotFound('Cannot evaluate function: %s' % repr(name))
+        return self.apply(f, args)
+    def Cast(self, value, type):
+        convert = castop.converter(type)
+        if value.isconstant(): return Term.of(None if value.nullable else convert(value.constant))
+        f = value.f
+        if not value.nullable: return Term((lambda row, params: convert(f(row, params))), False)
+        def cast(row, params):
+            v = f(row, params)
+            if nullop.isnull(v): return None
+            return convert(nullop.inarg(v))
+        return Term(cast)
+    def _case(self, tests, whenelse):
+        whenelse = Term.of(None) if whenelse is NotImplemented else whenelse
+        branches = [(w.f, t.f) for (w, t) in tests]
+        otherwise = whenelse.f
+        def case(row, params):
+            for (w, t) in branches:
+                if nullop.accept(w(row, params)): return t(row, params)
+            return otherwise(row, params)
+        return Term(case, whenelse.nullable or any(t.nullable for (w, t) in tests))
+    def Case(self, cases, whenelse): return self._case(cases, whenelse)
+    def Switch(self, switch, cases, whenelse):
+        return self._case([(self.apply('eq', [switch, w]), t) for (w, t) in cases], whenelse)
+    def Neg(self, n): return self.apply('neg', [n])
+    def Pos(self, n): return self.apply('pos', [n])
+    def Summarize(self, N): return self.apply('summarize', N)
+    def Sub(self, n1, n2): return self.apply('sub', [n1, n2])
+    def Multiply(self, N): return self.apply('multiply', N)
+    def Div(self, n1, n2): return self.apply('truediv', [n1, n2])
+    def Concat(self, S): return self.apply('concat', S)
+    def Comparison(self, op, a, b): return self.apply(COMPARISONS[op], [a, b])
+    def Between(self, a, lo, hi): return self.apply('between', [a, lo, hi])
+    def IsNull(self, a):
+        f = a.f
+        if not a.nullable: return Term.of(False)
+        return Term((lambda row, params: nullop.isnull(f(row, params))), False)
+    def NotNull(self, a):
+        f = a.f
+        if not a.nullable: return Term.of(True)
+        return Term((lambda row, params: not nullop.isnull(f(row, params))), False)
+    def IsIn(self, a, S): return self.apply('isin', [a, S])
+    def NotIn(self, a, S): return self.apply('notin', [a, S])
+    def Like(self, s, pattern, escape):
+        if escape is NotImplemented: escape = Term.of(None)
+        if not (pattern.isconstant() and escape.isconstant()): return self.apply('like', [s, pattern, escape])
+        if pattern.nullable: return Term.of(None)
+        match = nullop.compile_like(pattern.constant, escape.constant).match
+        f = s.f
+        if not s.nullable: return Term((lambda row, params: match(f(row, params))), False)
+        def like(row, params):
+            v = f(row, params)
+            if nullop.isnull(v): return None
+            return match(nullop.inarg(v))
+        return Term(like)
+    def And(self, B):
+        fs = [b.f for b in B]
+        if not any(b.nullable for b in B):
+            def all_(row, params):
+                for f in fs:
+                    if not f(row, params): return False
+                return True
+            return Term(all_, False)
+        def and_(row, params):
+            r = True
+            for f in fs:
+                x = f(row, params)
+                if x is True: continue
+                if (x is None) or nullop.isnull(x): r = None
+                elif not x: return False
+            return r
+        return Term(and_)
+    def Or(self, B):
+        fs = [b.f for b in B]
+        if not any(b.nullable for b in B):
+            def any_(row, params):
+                for f in fs:
+                    if f(row, params): return True
+                return False
+            return Term(any_, False)
+        def or_(row, params):
+            r = False
+            for f in fs:
+                x = f(row, params)
+                if x is False: continue
+                if (x is None) or nullop.isnull(x): r = None
+                elif x: return True
+            return r
+        return Term(or_)
+    def Not(self, b): return self.apply('Not', [b])
+    def Now(self): return Term((lambda row, params: datetime.datetime.now()), False)
+    def NextVal(self, sequence): raise NotImplementedError('Cannot evaluate NEXTVAL in memory')
+
+def compile_expr(expr, labels=None, schema=None):
+    """compile expr into function(row, params) with nullop semantics, rows are mappings when labels is None"""
+    return Evaluator(labels, schema).compile(models.make(expr))
+
+def compile_predicate(expr, labels=None, schema=None, params=None):
+    """compile expr into function(row) returning whether the row is accepted"""
+    f = compile_expr(expr, labels, schema)
+    params = {} if params is None else params
+    def predicate(row):
+        x = f(row, params)
+        if (x is True) or (x is False): return x
+        return nullop.accept(x)
+    return predicate
+
+# batchop functions taking nullable keyword
+BATCH_KERNELS = frozenset([
+    'neg', 'pos', 'summarize', 'sub', 'multiply', 'floordiv', 'truediv', 'pow', 'mod', 'concat', 'concat2',
+    'lt', 'le', 'eq', 'ne', 'ge', 'gt', 'ucase', 'lcase', 'replace', 'ltrim', 'rtrim', 'trim', 'abs'])
+
+_batch_abs = batchop.kernel(abs, batchop.numpy.absolute if batchop.numpy else None)
+
+def _batch_function(name):
+    if name == 'abs': return _batch_abs
+    return getattr(batchop, name)
+
+def _anycolumn(values):
+    for v in values:
+        if batchop.iscolumn(v): return True
+    return False
+
+def _nullsafe(g):
+    def f(*values):
+        if any(nullop.isnull(v) for v in values): return None
+        return g(*[nullop.inarg(v) for v in values])
+    return f
+
+def _masked_of(x, n):
+    if batchop.iscolumn(x): return batchop.masked(x)
+    if nullop.isnull(x): return batchop.Masked(batchop.numpy.zeros(n), batchop.numpy.zeros(n, dtype=bool))
+    return batchop.Masked(batchop.numpy.full(n, nullop.inarg(x)))
+
+def _masked_case(conds, values, n):
+    """numpy.select over accepted conditions, None when values are not all numeric of one dtype"""
+    numpy = batchop.numpy
+    V = [_masked_of(v, n) for v in values]
+    if any(v.values.dtype.kind not in 'biuf' for v in V): return None
+    dtypes = set(v.values.dtype for v in V if v.valid.any())
+    if len(dtypes) > 1: return None             # rows keep type of their own branch
+    dtype = dtypes.pop() if dtypes else numpy.dtype(float)
+    C = [(batchop.masked(batchop.accept(c)).values if batchop.iscolumn(c) else numpy.full(n, bool(nullop.accept(c))))
+         for c in conds]
+    (data, valid) = ([v.values.astype(dtype, copy=False) for v in V], [v.valid for v in V])
+    return batchop.Masked(numpy.select(C, data[:-1], data[-1]), numpy.select(C, valid[:-1], valid[-1]))
+
+def _masked_rows(rows):
+    """Masked of case results, object dtype when types are mixed so each value keeps its type"""
+    types = set(type(v) for v in rows if nullop.notnull(v))
+    return batchop.Masked.fromlist(rows, object if len(types) > 1 else None)
+
+def _case_rows(conds, values, n):
+    conds = [(batchop.accept(c) if batchop.iscolumn(c) else repeat(nullop.accept(c), n)) for c in conds]
+    values = [(list(v) if batchop.iscolumn(v) else repeat(v, n)) for v in values]
+    k = len(conds)
+    r = []
+    for t in zip(*(conds + values)):
+        for j in range(k):
+            if t[j]: break
+        else:
+            j = k
+        r.append(t[k + j])
+    return r
+
+class BatchEvaluator(Evaluator):
+    """emitter compiling expression into Term over a batch of columns, each node is applied once per batch"""
+    def compile(self, expr):
+        """return function(batch, params) evaluating expr into column of batch length"""
+        f = self.inner(self, expr, None).f
+        def evaluate(batch, params):
+            r = f(batch, params)
+            if batchop.iscolumn(r): return r
+            first = batch[0] if self.indexes is not None else next(iter(batch.values()))
+            return len(first) * [r]
+        return evaluate
+    def apply(self, name, args):
+        nullable = any(a.nullable for a in args)
+        k = _kernel(name, nullable)
+        if all(a.isconstant() for a in args): return Term.of(k(*[a.constant for a in args]))
+        col = _batch_function(name)
+        if (name in BATCH_KERNELS) and not nullable: col = functools.partial(col, nullable=False)
+        return self.apply_function(col, k, args, nullable)
+    def apply_function(self, col, scalar, args, nullable=True):
+        """term of col(*values) when some value is column, scalar(*values) otherwise"""
+        fs = [a.f for a in args]
+        def f(batch, params):
+            values = [g(batch, params) for g in fs]
+            return col(*values) if _anycolumn(values) else scalar(*values)
+        return Term(f, nullable)
+    def elementwise(self, g, args):
+        """term of scalar function g applied to each row of not null values"""
+        return self.apply_function(batchop.kernel(g), _nullsafe(g), args, any(a.nullable for a in args))
+    def DateTimePart(self, date, part):
+        name = DATETIME_PARTS[part]
+        return self.elementwise(lambda d: getattr(d, name), [date])
+    def PeriodStart(self, date, part, offset):
+        return self.elementwise(lambda d, n: _period_start(d, part, n), [date, offset])
+    def _strftime(self, date, fmt): return self.elementwise(lambda d: d.strftime(fmt), [date])
+    def Item(self, name):
+        nullable = True if self.schema is None else self.schema.nullable(name)
+        if self.indexes is None: return Term((lambda batch, params: batch[name]), nullable)
+        try:
+            i = self.indexes[name]
+        except KeyError:
+            raise util.NotFound('Unknown item: %s' % repr(name))
+        return Term((lambda batch, params: batch[i]), nullable, index=i)
+    def Cast(self, value, type):
+        if value.isconstant(): return Evaluator.Cast(self, value, type)
+        return self.apply_function((lambda A: batchop.cast(A, type)), (lambda a: nullop.cast(a, type)), [value], value.nullable)
+    def _case(self, tests, whenelse):
+        whenelse = Term.of(None) if whenelse is NotImplemented else whenelse
+        conds = [w.f for (w, t) in tests]
+        values = [t.f for (w, t) in tests] + [whenelse.f]
+        def case(batch, params):
+            C = [c(batch, params) for c in conds]
+            V = [v(batch, params) for v in values]
+            if not _anycolumn(C + V):
+                for (c, v) in zip(C, V):
+                    if nullop.accept(c): return v
+                return V[-1]
+            n = batchop._length(C + V)
+            if batchop._has_masked(C + V):
+                r = _masked_case(C, V, n)
+                if r is not None: return r
+                return _masked_rows(_case_rows(C, V, n))
+            return _case_rows(C, V, n)
+        return Term(case, whenelse.nullable or any(t.nullable for (w, t) in tests))
+    def IsNull(self, a):
+        if not a.nullable: return Term.of(False)
+        return self.apply_function(batchop.isnull, nullop.isnull, [a], False)
+    def NotNull(self, a):
+        if not a.nullable: return Term.of(True)
+        return self.apply_function(batchop.notnull, nullop.notnull, [a], False)
+    def _membership(self, name, a, S):
+        nullable = a.nullable or S.nullable
+        k = _kernel(name, nullable)
+        if a.isconstant() and S.isconstant(): return Term.of(k(a.constant, S.constant))
+        (f, g) = (a.f, S.f)
+        def membership(batch, params):
+            (A, members) = (f(batch, params), g(batch, params))
+            if isinstance(members, list) and _anycolumn(members):
+                # list of columns, a IN (x, y) is a = x OR a = y
+                r = batchop.Or(*[batchop.eq(A, x) for x in members])
+                return r if name == 'isin' else batchop.Not(r)
+            if not batchop.iscolumn(A): return k(A, members)
+            return getattr(batchop, name)(A, members)
+        return Term(membership, nullable)
+    def IsIn(self, a, S): return self._membership('isin', a, S)
+    def NotIn(self, a, S): return self._membership('notin', a, S)
+    def Like(self, s, pattern, escape):
+        if escape is NotImplemented: escape = Term.of(None)
+        (f, g, h) = (s.f, pattern.f, escape.f)
+        def like(batch, params):
+            (S, P, e) = (f(batch, params), g(batch, params), h(batch, params))
+            if batchop.iscolumn(P): return batchop.kernel(lambda s, p: nullop.like(s, p, e))(S, P)
+            if batchop.iscolumn(S): return batchop.like(S, P, e)
+            return nullop.like(S, P, e)
+        return Term(like, s.nullable or pattern.nullable)
+    def And(self, B): return self.apply_function(batchop.And, nullop.And, B, any(b.nullable for b in B))
+    def Or(self, B): return self.apply_function(batchop.Or, nullop.Or, B, any(b.nullable for b in B))
+
+def compile_batch(expr, labels=None, schema=None):
+    """compile expr into function(batch, params) evaluating columns of batch with nullop semantics"""
+    return BatchEvaluator(labels, schema).compile(models.make(expr))
+
+def evaluate_batches(expr, rows, labels, schema=None, params=None, size=65536):
+    """iterate value of expr for each row, rows are transposed into columns and evaluated size rows at a time"""
+    f = compile_batch(expr, labels, schema)
+    params = {} if params is None else params
+    rows = iter(rows)
+    while True:
+        chunk = list(islice(rows, size))
+        if not chunk: return
+        batch = [column.NullableColumn.fromlist(c) for c in zip(*chunk)]
+        for v in f(batch, params): yield v
@@ -1,10 +1,13 @@
 #! -*- coding: utf-8 -*-
 
+import copy
 import decimal
+import itertools
 from functools import cached_property
 from .. import util
 from ..nullable import nullop
 from ..model import models
+from ..model.structure import fingerprint
 from ..gen import structure, commandment
 
 CONST_REPRS = {}
@@ -58,6 +61,9 @@ class Dialect(object):
     USE_ANALYTIC_ROW_NUMBER = False
     BIND_BY_NAME = True
     PARAM_PREFIX = ':'
+    PARAM_SUFFIX = ''                       # e.g. ')s' of pyformat %(name)s
+    PLACEHOLDER = '?'                       # placeholder when not BIND_BY_NAME
+    PLACEHOLDER_NUMBERED = False            # placeholder is followed by 1-based position, e.g. $1
     CONCAT_BY_FUNCTION = True
     CONCAT_FUNCTION_MULTIARGS = True
     CONCAT_OPERATOR = '||'
@@ -67,6 +73,13 @@ class Dialect(object):
     CONST_REPRS = None
     NEXTVAL_TEMPLATE = '%s.NEXTVAL'
     UNIQUE_QUALIFIERS = False
+    MULTI_ROW_INSERT = True                 # INSERT INTO ... VALUES (...), (...)
+    MAX_INSERT_ROWS = 1000                  # rows of each multi-row INSERT
+    MAX_PARAMS = 999                        # bind parameters of each statement
+    USE_MERGE = True                        # MERGE INTO ... USING ... ON ...
+    USE_ON_CONFLICT = False                 # INSERT ... ON CONFLICT (keys) DO UPDATE, preferred to MERGE
+    USE_ON_DUPLICATE_KEY = False            # INSERT ... ON DUPLICATE KEY UPDATE, preferred to MERGE
+    MERGE_ENDING = None
 
 class SqlEmitterBase(models.Emitter):
     dialect = None
@@ -144,6 +157,15 @@ class ParamSubstDecorator(SqlEmitterDecorator):
                if d is None \
                else d.emit(self.decorated)
 
+class RowParamDecorator(SqlEmitterDecorator):
+    def __init__(self, decorated, index):
+        SqlEmitterDecorator.__init__(self, decorated)
+        self.index = index
+    def Parameter(self, name):
+        key = (self.index, name)
+        d = self.dialect
+        return self.line(structure.tag(d.PARAM_PREFIX + row_param_name(key) + d.PARAM_SUFFIX, (PARAM_TAG, key)))
+
 class CheckCompositeEmitter(models.NoneEmitter):
     sofar = 0
     grouped = False
@@ -358,6 +380,8 @@ class SqlSelect(SqlQuery):
         lst = structure.List(',')
         self.fill_orderbys(lst)
         if lst: r.titled(self.rootemt.keyword('order') + ' ' + self.rootemt.keyword('by')).add(lst)
+        # limit
+        self.fill_slice(r)
         return r
     def fill_selection(self, lst):
         labels = self.get_labels()
@@ -402,7 +426,15 @@ class SqlSelect(SqlQuery):
     def fill_havings(self, lst):
         pass
     def fill_orderbys(self, lst):
-        pass
+        for (emt, x) in self.orderbys:
+            lst.line(x.emit_part(emt))
+    def fill_slice(self, r):
+        if (self.first is None) and (self.afterlast is None): return
+        if not self.rootemt.dialect.USE_LIMIT_OFFSET: raise NotImplementedError()
+        first = self.first or 0
+        if self.afterlast is not None:
+            r.line(self.rootemt.keyword('limit'), ' ', str(max(self.afterlast - first, 0)))
+        if first: r.line(self.rootemt.keyword('offset'), ' ', str(first))
     def allvalue(self): raise NotImplementedError()
     def anyvalue(self): raise NotImplementedError()
     def existence(self): raise NotImplementedError()
@@ -415,9 +447,9 @@ class SqlSelect(SqlQuery):
         # self.distinct = True
         raise NotImplementedError()
     def orderby(self, orderbys):
-        # self.assert_select()
-        # raise NotImplementedError()
-        raise NotImplementedError()
+        if (self.first is not None) or (self.afterlast is not None): return self.nest().orderby(orderbys)
+        self.orderbys.extend((self.currentemt, x) for x in orderbys)
+        return self
     def slice(self, first, afterlast):
         assert not self.select_distinct, 'Cannot slice distinct query'
         if self.first is not None:
@@ -427,7 +459,7 @@ class SqlSelect(SqlQuery):
         if afterlast is not None:
             if self.afterlast is None: self.afterlast = afterlast
             else: self.afterlast = min(self.afterlast, afterlast)
-        raise NotImplementedError()
+        return self
     def primary(self, name):
         assert (self.principal_table is None) and (self.principal_query is None)
         if not name: raise Exception('Empty table name is not allowed')
@@ -501,11 +533,18 @@ class SqlSelect(SqlQuery):
     def innerjoin(self, right): raise NotImplementedError()
     def outerjoin(self, right): raise NotImplementedError()
     def crossjoin(self, right): raise NotImplementedError()
-    def inserting(self, setlist): raise NotImplementedError()
-    def updatingall(self, setlist): raise NotImplementedError()
-    def deletingall(self): raise NotImplementedError()
-    def extending(self, extension): raise NotImplementedError()
-    def merging(self, source, inserting): raise NotImplementedError()
+    def inserting(self, setlist): return SqlInsert(self, setlist, self.rootemt.insert_rows)
+    def updatingall(self, setlist): return SqlUpdate(self, setlist)
+    def deletingall(self): return SqlDelete(self)
+    def extending(self, extension):
+        composer = self.rootemt.composer()
+        extension.compose(composer)
+        return SqlExtend(self, composer.content)
+    def merging(self, source, inserting):
+        if not isinstance(source, models.UpdatingAll):
+            raise TypeError('Merging source must be UpdatingAll: %s' % repr(source))
+        insertlist = inserting.setlist if isinstance(inserting, models.Inserting) else None
+        return SqlMerge(self, source.setlist, insertlist)
 
 class SqlJoin(SqlContent):
     rootemt = property(lambda self: self.select.rootemt)
@@ -547,46 +586,137 @@ class SqlCrossJoin(SqlJoin):
         return None
 
 class SqlCommand(SqlContent):
-    rootemt = property(lambda self: self.selects[0].rootemt)
+    rootemt = property(lambda self: self.select.rootemt)
     def __init__(self, select): self.select = select
+    def emit(self): return self.emit_command()
     def emit_command(self): raise NotImplementedError()
+    def tablename(self):
+        s = self.select
+        if (s.principal_table is None) or s.joins or s.groupbys or s.select_distinct:
+            raise ValueError('Cannot manipulate composite query')
+        return s.principal_table
+    def emit_target(self):
+        self.tablename()
+        self.select.finalize_principal_qualifier()
+        return self.select.emit_principal_source()
+    def emit_wheres(self, r):
+        lst = structure.List(self.rootemt.keyword('and'))
+        self.select.fill_wheres(lst)
+        if lst: r.titled(self.rootemt.keyword('where')).add(lst)
+    def emit_into(self, r, labels):
+        emt = self.rootemt
+        ln = r.line(emt.keyword('insert'), ' ', emt.keyword('into'), ' ', self.tablename())
+        if labels: ln.word(' (', emt.join(', ', labels), ')')
 
-class SqlInsert(SqlContent):
+class SqlInsert(SqlCommand):
+    def __init__(self, select, setlist, rows=None):
+        SqlCommand.__init__(self, select)
+        self.setlist = setlist              # [('name', expr)]
+        self.rows = rows                    # None, or count of rows with parameters keyed by (index, 'name')
     def emit_command(self):
-        # sub = w.text('insert', 'into', self.tablename()).scope('(', ')').list(',')
-        # for k in settings.keys(): sub.text(k)
-        # sub = w.text('values').scope('(', ')').list(',')
-        # for v in settings.values(): sub.text(totext(v))
-        ...
+        if self.select.wheres: raise ValueError('Cannot insert into restricted query')
+        r = structure.Roster()
+        self.emit_into(r, [k for (k, v) in self.setlist])
+        emts = [self.rootemt] \
+               if self.rows is None else \
+               [RowParamDecorator(self.rootemt, i) for i in range(self.rows)]
+        lst = r.titled(self.rootemt.keyword('values')).list(',')
+        values = models.ExpressionList([v for (k, v) in self.setlist])
+        for emt in emts: lst.line(values.emit(emt))
+        return r
 
-class SqlUpdate(SqlContent):
+class SqlUpdate(SqlCommand):
+    def __init__(self, select, setlist):
+        SqlCommand.__init__(self, select)
+        self.setlist = setlist              # [('name', expr)]
     def emit_command(self):
-        # w.text('update', self.tablename())
-        # sub = w.titled('set').list(',')
-        # for (k,v) in settings.items(): sub.text(k, '=', f(v))
-        # if self.wheres:
-        #     sub = w.titled('where').list('and')
-        #     #for x in self.wheres: sub.text(f(x))
-        #     pass
-        ...
-
-class SqlDelete(SqlContent):
+        emt = self.rootemt
+        r = structure.Roster()
+        r.line(emt.keyword('update'), ' ', self.emit_target())
+        lst = r.titled(emt.keyword('set')).list(',')
+        for (k, v) in self.setlist: lst.line(k, ' = ', v.emit_part(self.select.currentemt))
+        self.emit_wheres(r)
+        return r
+
+class SqlDelete(SqlCommand):
     def emit_command(self):
-        # w.text('delete', 'from', self.tablename())
-        # sub = w.titled('where').list('and')
-        # for x in self.wheres: sub.text(f(x))
-        ...
+        emt = self.rootemt
+        r = structure.Roster()
+        r.line(emt.keyword('delete'), ' ', emt.keyword('from'), ' ', self.emit_target())
+        self.emit_wheres(r)
+        return r
 
-class SqlExtend(SqlContent):
+class SqlExtend(SqlCommand):
+    def __init__(self, select, source):
+        SqlCommand.__init__(self, select)
+        self.source = source                # SqlQuery
     def emit_command(self):
-        # w.text('insert', 'into', self.tablename())
-        # sub = w.scope('(', ')').list(',')
-        # for x in table..labels: sub.text(x)
-        # sub.block().text(subquery(table))
-        ...
+        if self.select.wheres: raise ValueError('Cannot insert into restricted query')
+        r = structure.Roster()
+        self.emit_into(r, self.source.get_labels())
+        r.add(self.source.emit())
+        return r
 
-class SqlMerge(SqlContent):
-    pass
+class SqlMerge(SqlCommand):
+    def __init__(self, select, setlist, insertlist):
+        SqlCommand.__init__(self, select)
+        self.setlist = setlist              # [('name', expr)] of matched row
+        self.insertlist = insertlist        # [('name', expr)] of unmatched row, None when not inserting
+    def keys(self):
+        r = []                              # ['name']
+        for (emt, pred) in self.select.wheres:
+            if not (isinstance(pred, models.Comparison) and
+                    (pred.op == models.Comparison.EQ) and
+                    isinstance(pred.a, models.Item)):
+                raise ValueError('Merging table must be restricted by equality of keys only')
+            r.append(pred.a.name)
+        if not r: raise ValueError('Merging table must be restricted by keys')
+        return r
+    def emit_command(self):
+        d = self.rootemt.dialect
+        keys = self.keys()
+        if d.USE_ON_CONFLICT or d.USE_ON_DUPLICATE_KEY:
+            if self.insertlist is None: return SqlUpdate(self.select, self.setlist).emit_command()
+            return self.emit_upsert(keys)
+        if d.USE_MERGE: return self.emit_merge()
+        raise NotImplementedError()
+    def emit_settings(self, r, title):
+        lst = r.titled(title).list(',')
+        for (k, v) in self.setlist: lst.line(k, ' = ', v.emit_part(self.select.currentemt))
+    def emit_values(self, r):
+        values = models.ExpressionList([v for (k, v) in self.insertlist])
+        r.titled(self.rootemt.keyword('values')).list(',').line(values.emit(self.rootemt))
+    def emit_merge(self):
+        emt = self.rootemt
+        d = emt.dialect
+        r = structure.Roster()
+        r.line(emt.keyword('merge'), ' ', emt.keyword('into'), ' ', self.emit_target())
+        using = d.DUAL_TABLE or emt.line('(', emt.keyword('select'), ' 1 ', emt.keyword('as'), ' ONE) ONE')
+        r.line(emt.keyword('using'), ' ', using)
+        preds = [pred.emit_part(e) for (e, pred) in self.select.wheres]
+        r.line(emt.keyword('on'), ' (', emt.join(' ' + emt.keyword('and') + ' ', preds), ')')
+        self.emit_settings(r, ' '.join(emt.keyword(w) for w in ('when', 'matched', 'then', 'update', 'set')))
+        if self.insertlist is not None:
+            r.line(' '.join(emt.keyword(w) for w in ('when', 'not', 'matched', 'then', 'insert')),
+                   ' (', emt.join(', ', [k for (k, v) in self.insertlist]), ')')
+            self.emit_values(r)
+        if d.MERGE_ENDING: r.line(d.MERGE_ENDING)
+        return r
+    def emit_upsert(self, keys):
+        emt = self.rootemt
+        r = structure.Roster()
+        if self.select.principal_alias: raise ValueError('Cannot alias table of upsert')
+        self.select.qualify()               # target row is ambiguous with the excluded row when not qualified
+        self.emit_into(r, [k for (k, v) in self.insertlist])
+        self.emit_values(r)
+        if emt.dialect.USE_ON_CONFLICT:
+            title = '%s %s (%s) %s %s %s' % (
+                emt.keyword('on'), emt.keyword('conflict'), ', '.join(keys),
+                emt.keyword('do'), emt.keyword('update'), emt.keyword('set'))
+        else:
+            title = ' '.join(emt.keyword(w) for w in ('on', 'duplicate', 'key', 'update'))
+        self.emit_settings(r, title)
+        return r
 
 class SqlEmitter(SqlEmitterBase):
     dialect = None
@@ -594,6 +724,7 @@ class SqlEmitter(SqlEmitterBase):
     line = structure.Line
     join = staticmethod(structure.Line.join)
     qualify_whatever = False
+    insert_rows = None                      # rows of VALUES of inserting, None for single row of plain parameters
     def QualifiedItem(self, qualifier, name): return self.line(qualifier, '.', name)
     def __init__(self, dialect=None):
         self.dialect = (dialect if dialect else Dialect())
@@ -601,6 +732,15 @@ class SqlEmitter(SqlEmitterBase):
     def emit_model(self, model):
         self.qualify_whatever = not has_many_composites(model)
         return SqlEmitterBase.emit_model(self, model)
+    def cache_key(self):
+        """key of everything but the model that generated sql depends on"""
+        return (type(self), dialect_signature(self.dialect))
+    def template(self, model, rows=None):
+        """generate SqlTemplate of model, qualifiers of models emitted before are not shared"""
+        emt = copy.copy(self)
+        emt.qualifiers = set()
+        emt.insert_rows = rows
+        return render(emt.emit_model(model), self.dialect.TAB, self.dialect)
     def finalize_principal_qualifier(self, select):
         if self.qualify_whatever: return
         select.qualify()
@@ -666,7 +806,9 @@ class SqlEmitter(SqlEmitterBase):
     def Value(self, v): return self.Constant(v)
     def Item(self, name): return self.line(name)
     def HostItem(self, name): raise NotImplementedError()
-    def Parameter(self, name): return self.line(self.dialect.PARAM_PREFIX + name)
+    def Parameter(self, name):
+        d = self.dialect
+        return self.line(structure.tag(d.PARAM_PREFIX + name + d.PARAM_SUFFIX, (PARAM_TAG, name)))
     def Call(self, name, args): return self.line(name, '(', self.join(', ', args), ')')
     def Cast(self, value, t):
         if isinstance(t, type): t = self.type_repr(t)
@@ -763,10 +905,8 @@ class SqlComposer(models.Composer):
     def Inserting(self, setlist): self.content = self.content.inserting(setlist)
     def UpdatingAll(self, setlist): self.content = self.content.updatingall(setlist)
     def DeletingAll(self): self.content = self.content.deletingall()
-    def Extending(self, extension): self.content = self.content.extending(extension.content)
-    def Merging(self, source, inserting):
-        ins = None if inserting is None else inserting.content
-        self.content = self.content.merging(source.content, ins)
+    def Extending(self, extension): self.content = self.content.extending(extension)
+    def Merging(self, source, inserting): self.content = self.content.merging(source, inserting)
 
 class SqlCompositeEmitter(models.EmitterDecorator):
     def __init__(self, dialect, composer):
@@ -784,6 +924,210 @@ def check_illegal_labels(labels, checkings):
     illegals = [n for n in checkings if n not in labels]
     if illegals: raise KeyError('Illegal labels: "%s"' % repr(illegals))
 
+PARAM_TAG = 'param'
+
+def row_param_name(key):
+    """bound name of parameter keyed by (index, 'name') of multi-row statement"""
+    return '%s_%d' % (key[1], key[0])
+
+# {'paramstyle': (BIND_BY_NAME, (PARAM_PREFIX, PARAM_SUFFIX), PLACEHOLDER, PLACEHOLDER_NUMBERED)}
+PARAMSTYLES = {
+    'named': (True, (':', ''), None, False),
+    'qmark': (False, None, '?', False),
+    'format': (False, None, '%s', False),
+    'pyformat': (True, ('%(', ')s'), None, False),
+    'numeric': (False, None, ':', True),
+    'dollar': (False, None, '$', True),
+}
+
+def paramstyle_dialect(paramstyle, dialect=None):
+    """dialect binding parameters in DBAPI paramstyle (or 'dollar' for $n)"""
+    try:
+        (by_name, prefix, placeholder, numbered) = PARAMSTYLES[paramstyle]
+    except KeyError:
+        raise util.NotFound('Unknown paramstyle: %s' % repr(paramstyle))
+    d = copy.copy(dialect) if dialect is not None else Dialect()
+    d.BIND_BY_NAME = by_name
+    if prefix is not None: (d.PARAM_PREFIX, d.PARAM_SUFFIX) = prefix
+    if placeholder is not None: d.PLACEHOLDER = placeholder
+    d.PLACEHOLDER_NUMBERED = numbered
+    return d
+
+def dialect_signature(dialect):
+    return (type(dialect),) + tuple(sorted((k, repr(v)) for (k, v) in vars(dialect).items()))
+
+class SqlTemplate(object):
+    """generated sql text with regions of parameter placeholders"""
+    __slots__ = 'text', 'regions', 'params', 'binds'
+    def __init__(self, text, regions, binds=None):
+        self.text = text
+        self.regions = regions              # (('name', start, stop),) in text order
+        self.params = tuple(dict.fromkeys(n for (n, start, stop) in regions))
+        self.binds = binds                  # ('name',) in placeholder order, None when bound by name
+    def __repr__(self): return 'SqlTemplate(%s, %s)' % (repr(self.text), repr(self.params))
+    @property
+    def positional(self): return self.binds is not None
+    @property
+    def tags(self):
+        r = {}                              # {('param', 'name'): [(start, stop)]}
+        for (n, start, stop) in self.regions: r.setdefault((PARAM_TAG, n), []).append((start, stop))
+        return r
+    def commandment(self): return commandment.Commandment(self.text, self.tags)
+    def bind(self, values):
+        """parameters for DBAPI execute from mapping of values"""
+        if self.binds is None: return dict((n, values[n]) for n in self.params)
+        return tuple([values[n] for n in self.binds])
+    def bind_many(self, S):
+        """parameters for DBAPI executemany from sequence of mappings"""
+        return [self.bind(values) for values in S]
+    def bind_rows(self, rows):
+        """parameters for DBAPI execute of multi-row statement from sequence of mappings, one for each row"""
+        if self.binds is None: return dict((row_param_name(k), rows[k[0]][k[1]]) for k in self.params)
+        return tuple([rows[i][n] for (i, n) in self.binds])
+
+def render(s, tab='  ', dialect=None):
+    """pretty print structure s into SqlTemplate, placeholders become positional unless dialect binds by name"""
+    v = structure.PrettyVisitor(tab)
+    s.visit(v)
+    regions = tuple((taggings[-1].tag[1], start, stop)
+                    for (taggings, start, stop) in v.tags
+                    if taggings[-1].tag[0] == PARAM_TAG)
+    text = v.generate()
+    if (dialect is None) or (dialect.BIND_BY_NAME and '%' not in dialect.PARAM_PREFIX):
+        return SqlTemplate(text, regions)
+    if dialect.BIND_BY_NAME:                # pyformat, literal % must be doubled
+        return SqlTemplate(*_placeholders(text, regions, True, lambda n, p: p))
+    return positional(text, regions, dialect)
+
+def _placeholders(text, regions, escape, placeholder):
+    """(text, regions) with each placeholder p of name n replaced by placeholder(n, p), % doubled elsewhere if escape"""
+    (chunks, nregions) = ([], [])
+    (last, length) = (0, 0)
+    for (n, start, stop) in regions:
+        chunk = text[last:start]
+        if escape: chunk = chunk.replace('%', '%%')
+        p = placeholder(n, text[start:stop])
+        length += len(chunk)
+        chunks.extend([chunk, p])
+        nregions.append((n, length, length + len(p)))
+        length += len(p)
+        last = stop
+    chunk = text[last:]
+    chunks.append(chunk.replace('%', '%%') if escape else chunk)
+    return (''.join(chunks), tuple(nregions))
+
+def positional(text, regions, dialect):
+    """SqlTemplate with named placeholders replaced by positional ones of dialect"""
+    escape = '%' in dialect.PLACEHOLDER     # format paramstyle, literal % must be doubled
+    numbers = {}                            # {'name': position}
+    binds = []
+    def placeholder(n, p):
+        if not dialect.PLACEHOLDER_NUMBERED:
+            binds.append(n)
+            return dialect.PLACEHOLDER
+        if n not in numbers:
+            numbers[n] = len(numbers) + 1
+            binds.append(n)
+        return dialect.PLACEHOLDER + str(numbers[n])
+    (text, regions) = _placeholders(text, regions, escape, placeholder)
+    return SqlTemplate(text, regions, tuple(binds))
+
+class TemplateCache(object):
+    """bounded thread-safe cache of SqlTemplate by model fingerprint and emitter, constants are part of the fingerprint"""
+    def __init__(self, maxsize=1024): self.templates = util.LruCache(maxsize)
+    def __len__(self): return len(self.templates)
+    def template(self, model, emitter=None, rows=None):
+        if emitter is None: emitter = SqlEmitter()
+        key = (emitter.cache_key(), rows, fingerprint(model))
+        return self.templates.get_or_create(key, lambda key: emitter.template(model, rows))
+    def clear(self): self.templates.clear()
+    def stats(self): return self.templates.stats()
+
+templates = TemplateCache()
+
+def sql_template(model, emitter=None):
+    """SqlTemplate of model from the shared cache"""
+    return templates.template(model, emitter)
+
+def rows_per_insert(template, dialect):
+    """rows of each multi-row insert of template, limited by dialect"""
+    if not dialect.MULTI_ROW_INSERT: return 1
+    per_row = len(template.binds if template.positional else template.params)
+    n = dialect.MAX_INSERT_ROWS
+    if per_row and dialect.MAX_PARAMS: n = min(n, dialect.MAX_PARAMS // per_row)
+    return max(n, 1)
+
+def insert_statements(model, rows, emitter=None, cache=None):
+    """iterate (sql, parameters) for DBAPI execute inserting mappings of rows by Inserting model,
+    many rows for each statement when dialect supports multi-row insert"""
+    if emitter is None: emitter = SqlEmitter()
+    if cache is None: cache = templates
+    t = cache.template(model, emitter)
+    if not emitter.dialect.MULTI_ROW_INSERT:
+        for values in rows: yield (t.text, t.bind(values))
+        return
+    n = rows_per_insert(t, emitter.dialect)
+    i = iter(rows)
+    while True:
+        chunk = list(itertools.islice(i, n))
+        if not chunk: return
+        t = cache.template(model, emitter, len(chunk))
+        yield (t.text, t.bind_rows(chunk))
+
+def insert_many(model, rows, emitter=None, cache=None):
+    """(sql, [parameters]) for DBAPI executemany of mappings of rows by Inserting (or Merging) model"""
+    if cache is None: cache = templates
+    t = cache.template(model, emitter)
+    return (t.text, t.bind_many(rows))
+
+KEYSET_LO = 'keyset_lo'
+KEYSET_HI = 'keyset_hi'
+
+def keyset_range(model, key, lo=False, hi=False):
+    """UpdatingAll or DeletingAll model restricted to range :keyset_lo < key <= :keyset_hi, bound omitted when False"""
+    t = model.table
+    if lo: t = t.where(models.Item(key) > models.Parameter(KEYSET_LO))
+    if hi: t = t.where(models.Item(key) <= models.Parameter(KEYSET_HI))
+    if isinstance(model, models.UpdatingAll): return t.updatingall(*model.setlist)
+    if isinstance(model, models.DeletingAll): return t.deletingall()
+    raise TypeError('Cannot batch by keyset: %s' % repr(model))
+
+def keyset_boundary(model, key, size, lo=False):
+    """query of the size-th key of rows of UpdatingAll or DeletingAll model after :keyset_lo"""
+    t = model.table
+    if lo: t = t.where(models.Item(key) > models.Parameter(KEYSET_LO))
+    return models.Slice(models.OrderBy(t.include(key), [models.Item(key)]), size - 1, size)
+
+class KeysetBatches(object):
+    """UpdatingAll or DeletingAll model executed in ascending ranges of unique key, size rows for each statement"""
+    def __init__(self, model, key, size, emitter=None, cache=None):
+        if size < 1: raise ValueError('size must be positive (size=%s)' % repr(size))
+        self.model = model
+        self.key = key
+        self.size = size
+        self.emitter = emitter if emitter is not None else SqlEmitter()
+        self.cache = cache if cache is not None else templates
+    def boundary(self, lo=False):
+        return self.cache.template(keyset_boundary(self.model, self.key, self.size, lo), self.emitter)
+    def statement(self, lo=False, hi=False):
+        return self.cache.template(keyset_range(self.model, self.key, lo, hi), self.emitter)
+    def execute(self, cursor, values=None, commit=None):
+        """execute statement of each range by DBAPI cursor, call commit after each one, return count of affected rows"""
+        values = dict(values or ())
+        (count, lo) = (0, False)
+        while True:
+            t = self.boundary(lo)
+            cursor.execute(t.text, t.bind(values))
+            row = cursor.fetchone()
+            hi = row is not None
+            if hi: values[KEYSET_HI] = row[0]
+            t = self.statement(lo, hi)
+            cursor.execute(t.text, t.bind(values))
+            if cursor.rowcount > 0: count += cursor.rowcount
+            if commit is not None: commit()
+            if not hi: return count
+            (lo, values[KEYSET_LO]) = (True, values[KEYSET_HI])
+
 # class DialectEmitter(models.SqlExpressionEmitter):
 #     BIND_BY_NAME = property(lambda self: self.dialect.BIND_BY_NAME)
 #     PARAM_PREFIX = property(lambda self: self.dialect.PARAM_PREFIX)
@@ -2,7 +2,6 @@
 
 from functools import cached_property
 from ..model import models
-from ..gen import structure
 from . import gen
 from . import row
 
@@ -143,12 +142,19 @@ class Table(Generic, Containable):
     def _new(self, model): return Table(self.store, model)
     emitter = cached_property(lambda self: SqlStoreEmitter(self.store))
     def gen_select(self):
-        s = self.model.emit(self.emitter)
-        p = structure.PrettyVisitor(self.dialect.TAB)
-        s.visit(p)
-        return (p.pretty(), p.tags)
-    def gen_insert(self):
-        pass
+        t = gen.sql_template(self.model, self.emitter)
+        return (t.text, t.tags)
+    def gen_insert(self, labels, rows):
+        return gen.insert_statements(self.model.inserting(*labels), rows, self.emitter)
+    def gen_updateall(self, *labels, **settings):
+        t = gen.sql_template(self.model.updatingall(*labels, **settings), self.emitter)
+        return (t.text, t.tags)
+    def gen_deleteall(self):
+        t = gen.sql_template(self.model.deletingall(), self.emitter)
+        return (t.text, t.tags)
+    def gen_merge(self, source, inserting=None):
+        t = gen.sql_template(self.merging(source, inserting).model, self.emitter)
+        return (t.text, t.tags)
     all = cached_property(AllValue)
     any = cached_property(AnyValue)
     exists = cached_property(Existence)
@@ -173,11 +179,13 @@ class Table(Generic, Containable):
     def crossjoin(self, right): return self._new(self.model.crossjoin(right.model))
     def distinct(self): return self._new(self.model.distinct())
     def orderby(self, *args): return self._new(self.model.orderby(*args))
-    def inserting(self, *labels, **settings): return Inserting(self.model.inserting(*labels, **settings))
-    def updatingall(self, *labels, **settings): return UpdatingAll(self.model.updatingall(*labels, **settings))
-    def deletingall(self): return DeletingAll(self.model.deletingall())
-    def extending(self, extension): return Extending(self.model.extending(extension))
-    def merging(self, source, inserting=None): return Merging(self.model.merging(source, inserting))
+    def inserting(self, *labels, **settings): return Inserting(self.store, self.model.inserting(*labels, **settings))
+    def updatingall(self, *labels, **settings): return UpdatingAll(self.store, self.model.updatingall(*labels, **settings))
+    def deletingall(self): return DeletingAll(self.store, self.model.deletingall())
+    def extending(self, extension): return Extending(self.store, self.model.extending(extension))
+    def merging(self, source, inserting=None):
+        ins = None if inserting is None else inserting.model
+        return Merging(self.store, self.model.merging(source.model, ins))
     def __bool__(self): return self.exists()
     __nonzero__ = __bool__
     def __contains__(self, x): return self.contains(x)()
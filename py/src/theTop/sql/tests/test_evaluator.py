@@ -0,0 +1,180 @@
+#! -*- coding: utf-8 -*-
+
+import datetime
+import unittest
+from theTop.model import *
+from ... import util
+from ...model import models
+from ...nullable import nullop
+from ...nullable import batchop
+from ...nullable.column import NullableColumn
+from ...schema import Schema, NotNull, Column
+from .. import evaluator
+
+LABELS = ('ID', 'NAME', 'PRICE', 'QTY')
+ROWS = [
+    (1, 'apple',   2.5,    4),
+    (2, 'banana', None,    3),
+    (3, None,      1.0, None),
+    (4, 'cherry',  8.0,    0)]
+
+VALUES = [None, -1, 0, 2, 5]
+
+class TestEvaluator(unittest.TestCase):
+    def evaluate(self, expr, row, params=None, schema=None):
+        return evaluator.compile_expr(expr, LABELS, schema)(row, params or {})
+    def column(self, expr, **kwargs):
+        return [self.evaluate(expr, row, **kwargs) for row in ROWS]
+    def testItem(self):
+        self.assertEqual([r[2] for r in ROWS], self.column(the.PRICE))
+        self.assertRaises(util.NotFound, evaluator.compile_expr, the.UNKNOWN, LABELS)
+    def testComparison(self):
+        self.assertEqual([False, None, False, True], self.column(the.PRICE > 5))
+        self.assertEqual([True, None, None, False], self.column(the.PRICE <= the.QTY))
+    def testArithmetic(self):
+        self.assertEqual([10.0, None, None, 0.0], self.column(the.PRICE * the.QTY))
+        self.assertEqual([5, 5, None, 4], self.column(the.QTY + the.ID))
+        self.assertEqual([-3, -1, None, 4], self.column(the.ID - the.QTY))
+        self.assertEqual([0.5, 1.0, 1.5, 2.0], self.column(the.ID / 2))
+    def testThreeValuedLogic(self):
+        self.assertEqual([True, True, None, False], self.column(op.And(the.ID > 0, the.QTY > 0)))
+        self.assertEqual([True, True, None, True], self.column(op.Or(the.QTY > 0, the.PRICE.is_null, the.ID > 3)))
+        self.assertEqual([False, None, False, True], self.column(op.Not(the.PRICE < 5)))
+    def testAgainstNullop(self):
+        for a in VALUES:
+            for b in VALUES:
+                row = (a, None, b, None)
+                self.assertEqual(nullop.lt(a, b), self.evaluate(the.ID < the.PRICE, row))
+                self.assertEqual(nullop.summarize(a, b, 1), self.evaluate(the.ID + the.PRICE + 1, row))
+                self.assertEqual(nullop.And(nullop.ge(a, 0), nullop.ne(b, 2)),
+                                 self.evaluate((the.ID >= 0).and_(the.PRICE != 2), row))
+                self.assertEqual(nullop.between(a, b, 3), self.evaluate(the.ID.between(the.PRICE, 3), row))
+    def testInAndLike(self):
+        self.assertEqual([True, False, False, True], self.column(the.ID.in_([1, 4])))
+        self.assertEqual([True, None, None, True], self.column(the.ID.in_([1, 4, None])))
+        self.assertEqual([False, True, None, False], self.column(the.NAME.like('b%')))
+        self.assertEqual([False, True, None, False], self.column(the.NAME.like(the.param.P), params={'P': '%an%a'}))
+        self.assertEqual([None, None, None, None], self.column(the.NAME.like(None)))
+    def testNullTests(self):
+        self.assertEqual([False, True, False, False], self.column(the.PRICE.is_null))
+        self.assertEqual([True, True, False, True], self.column(the.QTY.is_not_null))
+    def testFunctions(self):
+        self.assertEqual(['APPLE', 'BANANA', None, 'CHERRY'], self.column(the.NAME.upper()))
+        self.assertEqual([1, 0, None, 3], self.column(op.ABS(the.QTY - 3)))
+        self.assertEqual([1, 0, None, 0], self.column(the.QTY % 3))
+        self.assertEqual([16, 9, None, 0], self.column(the.QTY ** 2))
+        self.assertRaises(util.NotFound, evaluator.compile_expr, op.SOUNDEX(the.NAME), LABELS)
+    def testCast(self):
+        self.assertEqual(['1', '2', '3', '4'], self.column(op.cast(the.ID, 'VARCHAR(5)')))
+        self.assertEqual([2, None, 1, 8], self.column(op.cast(the.PRICE, int)))
+    def testCase(self):
+        expr = op.case([(the.QTY > 3, 'many'), (the.QTY > 0, 'few')], 'none')
+        self.assertEqual(['many', 'few', 'none', 'none'], self.column(expr))
+        expr = op.switch(the.ID, [(1, 'one'), (2, 'two')])
+        self.assertEqual(['one', 'two', None, None], self.column(expr))
+    def testParameter(self):
+        self.assertEqual([False, False, True, True], self.column(the.ID > the.param.MIN, params={'MIN': 2}))
+    def testConstantFolding(self):
+        e = evaluator.Evaluator(LABELS)
+        self.assertEqual(9, e.inner(e, (models.make(1) + 2) * 3, None).constant)
+        self.assertFalse(e.inner(e, the.ID > 2, None).isconstant())
+    def testDateTime(self):
+        d = datetime.datetime(2021, 5, 17, 13, 45, 30)
+        row = (d, None, None, None)
+        self.assertEqual(5, self.evaluate(the.ID.month, row))
+        self.assertEqual(datetime.datetime(2021, 7, 1), self.evaluate(the.ID.monthstart().next(2), row))
+        self.assertEqual(datetime.datetime(2020, 1, 1), self.evaluate(the.ID.yearstart().prev(), row))
+        self.assertEqual(datetime.datetime(2021, 5, 16), self.evaluate(the.ID.daystart().prev(), row))
+        self.assertEqual('2021/05/17', self.evaluate(the.ID.yyyy_mm_dd('/'), row))
+        self.assertEqual('13:45:30', self.evaluate(the.ID.hh_mm_ss(), row))
+        self.assertIsNone(self.evaluate(the.ID.month, (None,) * 4))
+    def testMappingRows(self):
+        f = evaluator.compile_expr(the.A + the.B)
+        self.assertEqual(3, f({'A': 1, 'B': 2}, {}))
+        self.assertEqual(3, (the.A + the.B).eval(A=1, B=2))
+    def testPredicate(self):
+        p = evaluator.compile_predicate(the.PRICE > the.param.P, LABELS, params={'P': 2})
+        self.assertEqual([1, 4], [r[0] for r in ROWS if p(r)])
+
+class TestNotNullSchema(unittest.TestCase):
+    schema = Schema([NotNull('ID', int), NotNull('QTY', int), Column('PRICE')])
+    def term(self, expr):
+        e = evaluator.Evaluator(LABELS, self.schema)
+        return e.inner(e, expr, None)
+    def testNullability(self):
+        self.assertFalse(self.term(the.ID + the.QTY > 3).nullable)
+        self.assertTrue(self.term(the.ID + the.PRICE > 3).nullable)
+        self.assertFalse(self.term(the.PRICE.is_null).nullable)
+        self.assertTrue(self.term(the.ID.in_([1, None])).nullable)
+        self.assertFalse(self.term(the.ID.in_([1, 2])).nullable)
+        self.assertEqual(False, self.term(the.ID.is_null).constant)
+    def testSameResults(self):
+        rows = [(1, 'a', None, 2), (5, 'b', 3.0, 7)]
+        for expr in [the.ID + the.QTY > 3, op.And(the.ID > 1, the.QTY < 9), the.ID.in_([1, 7]), the.ID.between(2, the.QTY)]:
+            general = evaluator.compile_expr(expr, LABELS)
+            special = evaluator.compile_expr(expr, LABELS, self.schema)
+            for row in rows: self.assertEqual(general(row, {}), special(row, {}))
+
+EXPRESSIONS = [
+    the.PRICE > 5, the.PRICE <= the.QTY, the.PRICE * the.QTY, the.QTY + the.ID + 1, the.ID / 2, -the.QTY,
+    op.And(the.ID > 0, the.QTY > 0), op.Or(the.QTY > 0, the.PRICE.is_null, the.ID > 3), op.Not(the.PRICE < 5),
+    the.ID.between(the.QTY, 3), the.ID.in_([1, 4]), the.ID.in_([1, 4, None]), the.QTY.not_in_([0, 3]),
+    the.ID.in_([the.QTY, 2]), the.NAME.like('b%'), the.NAME.like(None), the.NAME.is_null, the.QTY.is_not_null,
+    the.NAME.upper(), op.ABS(the.QTY - 3), op.cast(the.PRICE, int), op.cast(the.ID, 'VARCHAR(5)'),
+    op.case([(the.QTY > 3, 'many'), (the.QTY > 0, 'few')], 'none'),
+    op.case([(the.QTY > 3, the.PRICE), (the.QTY > 0, the.ID)]), op.switch(the.ID, [(1, 'one'), (2, 'two')]),
+    models.make(1) + 2, the.ID > the.param.MIN]
+
+class TestBatchEvaluator(unittest.TestCase):
+    params = {'MIN': 2}
+    def expected(self, expr):
+        f = evaluator.compile_expr(expr, LABELS)
+        return [f(row, self.params) for row in ROWS]
+    def check(self, batch):
+        for expr in EXPRESSIONS:
+            f = evaluator.compile_batch(expr, LABELS)
+            self.assertEqual(self.expected(expr), list(f(batch, self.params)), expr)
+    def testListColumns(self):
+        self.check(list(zip(*ROWS)))
+    def testNullableColumns(self):
+        self.check([NullableColumn.fromlist(c) for c in zip(*ROWS)])
+    @unittest.skipIf(batchop.numpy is None, 'numpy is not available')
+    def testMaskedColumns(self):
+        self.check([NullableColumn.fromlist(c) if i == 1 else batchop.masked(c) for (i, c) in enumerate(zip(*ROWS))])
+    def testMappingBatch(self):
+        f = evaluator.compile_batch(the.A + the.B)
+        self.assertEqual([3, None], list(f({'A': [1, 2], 'B': [2, None]}, {})))
+    def testNotNullSchema(self):
+        schema = Schema([NotNull('ID', int), NotNull('QTY', int)])
+        rows = [(1, 'a', None, 2), (5, 'b', 3.0, 7)]
+        f = evaluator.compile_batch(op.And(the.ID + the.QTY > 3, the.QTY < 9), LABELS, schema)
+        self.assertEqual([False, True], list(f(list(zip(*rows)), {})))
+    def testAllNullColumn(self):
+        for i in range(len(LABELS)):
+            rows = [r[:i] + (None,) + r[i + 1:] for r in ROWS]
+            for expr in EXPRESSIONS:
+                f = evaluator.compile_expr(expr, LABELS)
+                self.assertEqual([f(row, self.params) for row in rows],
+                                 list(evaluator.evaluate_batches(expr, rows, LABELS, params=self.params)), expr)
+        self.assertEqual([None, None], list(evaluator.evaluate_batches(the.X > the.Y, [(None, 1), (None, 2)], ['X', 'Y'])))
+    def testMixedCase(self):
+        exprs = [op.case([(the.QTY > 3, the.PRICE), (the.QTY > 0, 0.5)], the.ID),
+                 op.case([(the.QTY > 3, 1.5)], 7), op.case([(the.QTY > 0, the.ID)], None)]
+        batches = [list(zip(*ROWS)), [NullableColumn.fromlist(c) for c in zip(*ROWS)]]
+        if batchop.numpy is not None: batches.append([batchop.masked(c) for c in zip(*ROWS)])
+        for expr in exprs:
+            expected = self.expected(expr)
+            for batch in batches:
+                r = list(evaluator.compile_batch(expr, LABELS)(batch, self.params))
+                self.assertEqual([(v, type(v)) for v in expected], [(v, type(v)) for v in r], expr)
+    def testEvaluateBatches(self):
+        expr = op.And(the.PRICE > 1, the.NAME.like('%a%'))
+        self.assertEqual(self.expected(expr), list(evaluator.evaluate_batches(expr, ROWS, LABELS, size=3)))
+        self.assertEqual([], list(evaluator.evaluate_batches(expr, [], LABELS)))
+        self.assertEqual([2**64 + 1, 2], list(evaluator.evaluate_batches(the.X + 1, [(2**64,), (1,)], ['X'])))
+    def testDateTime(self):
+        d = datetime.datetime(2021, 5, 17, 13, 45, 30)
+        batch = [[d, None], [None, None], [None, None], [None, None]]
+        self.assertEqual([5, None], list(evaluator.compile_batch(the.ID.month, LABELS)(batch, {})))
+        f = evaluator.compile_batch(the.ID.monthstart().next(2), LABELS)
+        self.assertEqual([datetime.datetime(2021, 7, 1), None], list(f(batch, {})))
@@ -3,7 +3,9 @@
 import textwrap
 import unittest
 from theTop.model import *
+from theTop.model import models
 from .. import gen
+from ... import util
 
 class TestMisc(unittest.TestCase):
     def test_check_illegal_labels(self):
@@ -719,3 +721,286 @@ class TestParamSubst(BaseTestSql):
         self.assertSql("'two'", the.param.Param2)
         self.assertSql("'two'", the.param.ParamTwo)
         self.assertSql(':ParamX', the.param.Param3)
+
+class TestTemplateCache(unittest.TestCase):
+    def query(self, n=1):
+        return T['T'].where(the.A == the.param.X).where(the.B > n).include('A', 'B').define(C=the.param.Z + the.param.X)
+    def testTemplate(self):
+        t = gen.SqlEmitter().template(self.query())
+        self.assertEqual(gen.SqlEmitter().emit_model(self.query()).pretty(), t.text)
+        self.assertEqual(('Z', 'X'), t.params)
+        self.assertEqual(['Z', 'X', 'X'], [n for (n, start, stop) in t.regions])
+        for (n, start, stop) in t.regions: self.assertEqual(':' + n, t.text[start:stop])
+        self.assertEqual(':X', t.commandment()[('param', 'X')])
+    def testCache(self):
+        cache = gen.TemplateCache(2)
+        t = cache.template(self.query())
+        self.assertIs(t, cache.template(self.query()))
+        self.assertIsNot(t, cache.template(self.query(2)))
+        self.assertEqual(dict(hits=1, misses=2, evictions=0, size=2, maxsize=2), cache.stats())
+        cache.template(the.A == the.param.X)
+        self.assertEqual(1, cache.stats()['evictions'])
+        cache.clear()
+        self.assertEqual(0, len(cache))
+    def testDialect(self):
+        class Dollar(gen.Dialect): PARAM_PREFIX = '$'
+        cache = gen.TemplateCache()
+        a = cache.template(the.A == the.param.X)
+        b = cache.template(the.A == the.param.X, gen.SqlEmitter(Dollar()))
+        self.assertEqual(('A = :X', 'A = $X'), (a.text, b.text))
+        d = gen.Dialect()
+        d.PARAM_PREFIX = '@'
+        self.assertEqual('A = @X', cache.template(the.A == the.param.X, gen.SqlEmitter(d)).text)
+    def testEmitterState(self):
+        emitter = gen.SqlEmitter()
+        m = T['T'].include('A').where(the.A == the.param.X).nest('x').where(the.A > 1)
+        first = emitter.emit_model(m).pretty()
+        self.assertEqual(first, emitter.template(m).text)
+        self.assertEqual(first, emitter.template(m).text)
+
+class TestPositionalBinding(unittest.TestCase):
+    model = op.And(the.A == the.param.X, the.B.like('a%'), the.C.in_([the.param.Y, the.param.X]))
+    def template(self, paramstyle):
+        return gen.SqlEmitter(gen.paramstyle_dialect(paramstyle)).template(self.model)
+    def testNamed(self):
+        t = self.template('named')
+        self.assertEqual("(A = :X) AND (B LIKE 'a%') AND (C IN (:Y, :X))", t.text)
+        self.assertFalse(t.positional)
+        self.assertEqual(dict(X=1, Y=2), t.bind(dict(X=1, Y=2, Z=3)))
+    def testQmark(self):
+        t = self.template('qmark')
+        self.assertEqual("(A = ?) AND (B LIKE 'a%') AND (C IN (?, ?))", t.text)
+        self.assertEqual(('X', 'Y', 'X'), t.binds)
+        self.assertEqual((1, 2, 1), t.bind(dict(X=1, Y=2)))
+        self.assertEqual([(1, 2, 1), (3, 4, 3)], t.bind_many([dict(X=1, Y=2), dict(X=3, Y=4)]))
+        for (n, start, stop) in t.regions: self.assertEqual('?', t.text[start:stop])
+    def testFormat(self):
+        t = self.template('format')
+        self.assertEqual("(A = %s) AND (B LIKE 'a%%') AND (C IN (%s, %s))", t.text)
+        self.assertEqual(('X', 'Y', 'X'), t.binds)
+    def testPyformat(self):
+        t = self.template('pyformat')
+        self.assertEqual("(A = %(X)s) AND (B LIKE 'a%%') AND (C IN (%(Y)s, %(X)s))", t.text)
+        self.assertFalse(t.positional)
+        self.assertEqual(dict(X=1, Y=2), t.bind(dict(X=1, Y=2)))
+        for (n, start, stop) in t.regions: self.assertEqual('%(' + n + ')s', t.text[start:stop])
+        self.assertEqual("(A = 1) AND (B LIKE 'a%') AND (C IN (2, 1))", t.text % t.bind(dict(X=1, Y=2)))
+        t = gen.SqlEmitter(gen.paramstyle_dialect('pyformat')).template(T['T'].inserting('A'), 2)
+        self.assertEqual(dict(A_0=1, A_1=2), t.bind_rows([dict(A=1), dict(A=2)]))
+        self.assertIn('(%(A_0)s),', t.text)
+    def testNumbered(self):
+        t = self.template('dollar')
+        self.assertEqual("(A = $1) AND (B LIKE 'a%') AND (C IN ($2, $1))", t.text)
+        self.assertEqual(('X', 'Y'), t.binds)
+        self.assertEqual((1, 2), t.bind(dict(X=1, Y=2)))
+        self.assertEqual("(A = :1) AND (B LIKE 'a%') AND (C IN (:2, :1))", self.template('numeric').text)
+    def testSqlite(self):
+        import sqlite3
+        t = gen.SqlEmitter(gen.paramstyle_dialect(sqlite3.paramstyle)).template(
+            T['T'].where(the.A > the.param.LO).where(the.A < the.param.HI).include('A'))
+        db = sqlite3.connect(':memory:')
+        db.execute('create table T (A integer)')
+        db.executemany('insert into T values (?)', [(i,) for i in range(10)])
+        self.assertEqual([(3,), (4,)], db.execute(t.text, t.bind(dict(LO=2, HI=5))).fetchall())
+    def testCache(self):
+        cache = gen.TemplateCache()
+        named = cache.template(self.model)
+        qmark = cache.template(self.model, gen.SqlEmitter(gen.paramstyle_dialect('qmark')))
+        self.assertNotEqual(named.text, qmark.text)
+        self.assertRaises(util.NotFound, gen.paramstyle_dialect, 'unknown')
+
+class TestInsert(BaseTestSql):
+    model = T['T'].inserting('A', 'B')
+    def rows(self, n): return [dict(A=i, B='b%d' % i) for i in range(n)]
+    def testInserting(self):
+        self.assertSql(textwrap.dedent("""\
+            INSERT INTO T (A, B)
+            VALUES
+              (:A, :B)"""),
+            self.model)
+        self.assertSql(textwrap.dedent("""\
+            INSERT INTO T (A, B)
+            VALUES
+              ((:A + 1), NULL)"""),
+            T['T'].inserting(('A', the.param.A + 1), ('B', None)))
+        with self.assertRaises(ValueError): self.sql(T['T'].where(the.A > 1).inserting('A'))
+    def testMultiRow(self):
+        t = gen.SqlEmitter().template(self.model, 2)
+        self.assertEqual(textwrap.dedent("""\
+            INSERT INTO T (A, B)
+            VALUES
+              (:A_0, :B_0),
+              (:A_1, :B_1)"""),
+            t.text)
+        self.assertEqual(dict(A_0=0, B_0='b0', A_1=1, B_1='b1'), t.bind_rows(self.rows(2)))
+        t = gen.SqlEmitter(gen.paramstyle_dialect('qmark')).template(self.model, 2)
+        self.assertEqual((0, 'b0', 1, 'b1'), t.bind_rows(self.rows(2)))
+    def testChunks(self):
+        d = gen.paramstyle_dialect('qmark')
+        d.MAX_PARAMS = 7
+        statements = list(gen.insert_statements(self.model, self.rows(8), gen.SqlEmitter(d)))
+        self.assertEqual([6, 6, 4], [len(params) for (sql, params) in statements])
+        self.assertEqual(6, statements[0][0].count('?'))
+        d.MAX_INSERT_ROWS = 2
+        self.assertEqual(4, len(list(gen.insert_statements(self.model, iter(self.rows(8)), gen.SqlEmitter(d)))))
+        d.MULTI_ROW_INSERT = False
+        statements = list(gen.insert_statements(self.model, self.rows(3), gen.SqlEmitter(d)))
+        self.assertEqual([(1, 'b1')], [params for (sql, params) in statements][1:2])
+        self.assertEqual([], list(gen.insert_statements(self.model, [])))
+    def testExecuteMany(self):
+        (sql, S) = gen.insert_many(self.model, self.rows(3), gen.SqlEmitter(gen.paramstyle_dialect('qmark')))
+        self.assertEqual('INSERT INTO T (A, B)\nVALUES\n  (?, ?)', sql)
+        self.assertEqual([(0, 'b0'), (1, 'b1'), (2, 'b2')], S)
+    def testExtending(self):
+        self.assertSql(textwrap.dedent("""\
+            INSERT INTO T (A, B)
+            SELECT
+              S.A,
+              S.B
+            FROM
+              S
+            WHERE
+              (S.Q > :P)"""),
+            T['T'].extending(T['S'].where(the.Q > the.param.P).include('A', 'B')))
+        self.assertEqual(textwrap.dedent("""\
+            INSERT INTO T
+            SELECT
+              *
+            FROM
+              S"""),
+            gen.SqlEmitter().template(T['T'].extending(T['S'])).text)
+    def testSqlite(self):
+        import sqlite3
+        db = sqlite3.connect(':memory:')
+        db.execute('create table T (A integer, B text)')
+        db.execute('create table S (A integer, B text)')
+        d = gen.paramstyle_dialect(sqlite3.paramstyle)
+        d.MAX_INSERT_ROWS = 40
+        for (sql, params) in gen.insert_statements(self.model, self.rows(100), gen.SqlEmitter(d)):
+            db.execute(sql, params)
+        db.executemany(*gen.insert_many(T['S'].inserting('A', 'B'), self.rows(5), gen.SqlEmitter(d)))
+        db.execute(gen.SqlEmitter(d).template(T['T'].extending(T['S'].where(the.A >= the.param.LO).include('A', 'B'))).text, (3,))
+        self.assertEqual((102, 4950 + 7), db.execute('select count(*), sum(A) from T').fetchone())
+        self.assertEqual([(99, 'b99')], db.execute('select * from T where A = 99').fetchall())
+
+class TestUpdateDelete(BaseTestSql):
+    def testUpdatingAll(self):
+        self.assertSql(textwrap.dedent("""\
+            UPDATE T
+            SET
+              A = :A,
+              B = (B + 1)
+            WHERE
+              (Q > 1)"""),
+            T['T'].where(the.Q > 1).updatingall('A', ('B', the.B + 1)))
+        self.assertSql('UPDATE T\nSET\n  A = NULL', T['T'].updatingall(A=None))
+    def testDeletingAll(self):
+        self.assertSql('DELETE FROM T', T['T'].deletingall())
+        self.assertSql(textwrap.dedent("""\
+            DELETE FROM T t
+            WHERE
+              (t.Q > 1) AND
+              (t.R IS NULL)"""),
+            T['T'].alias('t').where(the.Q > 1).where(the.R.is_null).deletingall())
+    def testSlice(self):
+        self.assertSql(textwrap.dedent("""\
+            SELECT
+              ID
+            FROM
+              T
+            ORDER BY
+              ID
+            LIMIT 1
+            OFFSET 9"""),
+            models.Slice(T['T'].include('ID').orderby(the.ID), 9, 10))
+    def testKeysetStatements(self):
+        k = gen.KeysetBatches(T['T'].where(the.Q > 1).deletingall(), 'ID', 100)
+        self.assertEqual(textwrap.dedent("""\
+            DELETE FROM T
+            WHERE
+              (Q > 1) AND
+              (ID > :keyset_lo) AND
+              (ID <= :keyset_hi)"""),
+            k.statement(True, True).text)
+        self.assertIn('(ID > :keyset_lo)\nORDER BY\n  ID\nLIMIT 1\nOFFSET 99', k.boundary(True).text)
+        self.assertEqual('DELETE FROM T\nWHERE\n  (Q > 1)', k.statement().text)
+        self.assertRaises(ValueError, gen.KeysetBatches, T['T'].deletingall(), 'ID', 0)
+        self.assertRaises(TypeError, gen.keyset_range, T['T'].inserting('A'), 'ID')
+    def testKeysetSqlite(self):
+        import sqlite3
+        db = sqlite3.connect(':memory:')
+        db.execute('create table T (ID integer primary key, Q integer, A integer)')
+        db.executemany('insert into T values (?, ?, 0)', [(i, i % 3) for i in range(1, 101)])
+        emitter = gen.SqlEmitter(gen.paramstyle_dialect(sqlite3.paramstyle))
+        commits = []
+        k = gen.KeysetBatches(T['T'].where(the.Q > 0).updatingall(A=the.param.A), 'ID', 10, emitter)
+        self.assertEqual(67, k.execute(db.cursor(), dict(A=7), lambda: commits.append(1)))
+        self.assertEqual(7, len(commits))
+        self.assertEqual((67, 67 * 7), db.execute('select count(*), sum(A) from T where Q > 0').fetchone())
+        k = gen.KeysetBatches(T['T'].where(the.Q == the.param.Q).deletingall(), 'ID', 5, emitter)
+        self.assertEqual(33, k.execute(db.cursor(), dict(Q=0)))
+        self.assertEqual(67, db.execute('select count(*) from T').fetchone()[0])
+
+class TestMerge(unittest.TestCase):
+    table = T['T'].where(the.ID == the.param.ID)
+    model = table.merging(table.updatingall('NAME', ('QTY', the.QTY + the.param.QTY)), table.inserting('ID', 'NAME', 'QTY'))
+    def sql(self, model, **flags):
+        d = gen.Dialect()
+        for (k, v) in flags.items(): setattr(d, k, v)
+        return gen.SqlEmitter(d).template(model).text
+    def testMerge(self):
+        self.assertEqual(textwrap.dedent("""\
+            MERGE INTO T
+            USING (SELECT 1 AS ONE) ONE
+            ON ((ID = :ID))
+            WHEN MATCHED THEN UPDATE SET
+              NAME = :NAME,
+              QTY = (QTY + :QTY)
+            WHEN NOT MATCHED THEN INSERT (ID, NAME, QTY)
+            VALUES
+              (:ID, :NAME, :QTY)"""),
+            self.sql(self.model))
+        self.assertEqual(textwrap.dedent("""\
+            MERGE INTO T
+            USING DUAL
+            ON ((ID = :ID))
+            WHEN MATCHED THEN UPDATE SET
+              NAME = :NAME
+            ;"""),
+            self.sql(self.table.merging(self.table.updatingall('NAME')), DUAL_TABLE='DUAL', MERGE_ENDING=';'))
+    def testOnConflict(self):
+        self.assertEqual(textwrap.dedent("""\
+            INSERT INTO T (ID, NAME, QTY)
+            VALUES
+              (:ID, :NAME, :QTY)
+            ON CONFLICT (ID) DO UPDATE SET
+              NAME = :NAME,
+              QTY = (T.QTY + :QTY)"""),
+            self.sql(self.model, USE_ON_CONFLICT=True))
+        self.assertEqual('UPDATE T\nSET\n  NAME = :NAME\nWHERE\n  (ID = :ID)',
+            self.sql(self.table.merging(self.table.updatingall('NAME')), USE_ON_CONFLICT=True))
+    def testOnDuplicateKey(self):
+        self.assertEqual(textwrap.dedent("""\
+            INSERT INTO T (ID, NAME, QTY)
+            VALUES
+              (:ID, :NAME, :QTY)
+            ON DUPLICATE KEY UPDATE
+              NAME = :NAME,
+              QTY = (T.QTY + :QTY)"""),
+            self.sql(self.model, USE_ON_DUPLICATE_KEY=True))
+    def testInvalid(self):
+        self.assertRaises(ValueError, self.sql, T['T'].merging(T['T'].updatingall('NAME')))
+        t = T['T'].where(the.ID > the.param.ID)
+        self.assertRaises(ValueError, self.sql, t.merging(t.updatingall('NAME')))
+        self.assertRaises(TypeError, self.sql, self.table.merging(self.table.inserting('NAME')))
+        self.assertRaises(NotImplementedError, self.sql, self.model, USE_MERGE=False)
+    def testSqlite(self):
+        import sqlite3
+        db = sqlite3.connect(':memory:')
+        db.execute('create table T (ID integer primary key, NAME text, QTY integer)')
+        db.execute("insert into T values (1, 'a', 10)")
+        d = gen.paramstyle_dialect(sqlite3.paramstyle)
+        d.USE_ON_CONFLICT = True
+        rows = [dict(ID=1, NAME='x', QTY=5), dict(ID=2, NAME='y', QTY=7)]
+        db.executemany(*gen.insert_many(self.model, rows, gen.SqlEmitter(d)))
+        self.assertEqual([(1, 'x', 15), (2, 'y', 7)], db.execute('select * from T order by ID').fetchall())
@@ -19,6 +19,21 @@ class TestSlotty(unittest.TestCase):
         with self.assertRaises(AssertionError): util.assert_slotty(TestSlotty)
         util.assert_slotty(self.TheSlotty)
 
+class TestCachedSlot(unittest.TestCase):
+    class TheCached(object):
+        __slots__ = ('_cache', 'calls')
+        def __init__(self): self.calls = 0
+        def compute(self):
+            self.calls += 1
+            return [self.calls]
+        value = util.cached_slot(compute)
+    def test_cached_slot(self):
+        c = self.TheCached()
+        self.assertIs(c.value, c.value)
+        self.assertEqual(1, c.calls)
+        self.assertIsInstance(self.TheCached.value, util.cached_slot)
+        self.assertTrue(util.slotty(c))
+
 class TestLocalFileName(unittest.TestCase):
     def test_local_filename_refclass(self):
         import os.path
@@ -55,6 +70,47 @@ class TestGetSingle(unittest.TestCase):
         with self.assertRaises(util.MoreThanOne):
             util.get_single(range(10))
 
+class TestLruCache(unittest.TestCase):
+    def assertKeys(self, keys, cache): self.assertEqual(keys, ''.join(cache.items.keys()))
+    def test_evict_least_recently_used(self):
+        cache = util.LruCache(3)
+        for (i, k) in enumerate('qwer'): cache.put(k, i)
+        self.assertKeys('wer', cache)
+        self.assertEqual(1, cache.get('w'))
+        cache.put('t', 4)
+        self.assertKeys('rwt', cache)
+        self.assertIsNone(cache.get('q'))
+        self.assertEqual(
+            dict(hits=1, misses=1, evictions=2, size=3, maxsize=3),
+            cache.stats())
+    def test_get_or_create(self):
+        cache = util.LruCache(2)
+        created = []
+        def factory(k):
+            created.append(k)
+            return k.upper()
+        self.assertEqual('A', cache.get_or_create('a', factory))
+        self.assertEqual('A', cache.get_or_create('a', factory))
+        self.assertEqual(['a'], created)
+        self.assertIn('a', cache)
+        self.assertEqual(1, len(cache))
+        cache.clear()
+        self.assertEqual(0, len(cache))
+        self.assertEqual(0, cache.stats()['hits'])
+    def test_threads(self):
+        import threading
+        cache = util.LruCache(10)
+        def work(n):
+            for i in range(1000): cache.get_or_create((n + i) % 20, str)
+        threads = [threading.Thread(target=work, args=(n,)) for n in range(4)]
+        for t in threads: t.start()
+        for t in threads: t.join()
+        stats = cache.stats()
+        self.assertEqual(4000, stats['hits'] + stats['misses'])
+        self.assertEqual(10, len(cache))
+    def test_invalid_size(self):
+        with self.assertRaises(ValueError): util.LruCache(0)
+
 class TestShouldNotReachHere(unittest.TestCase):
     def testShouldNotReachHear(self):
         with self.assertRaises(AssertionError): util.SHOULD_NOT_REACH_HERE()
@@ -1,11 +1,33 @@
 #! -*- coding: utf-8 -*-
 
+import threading
+from collections import OrderedDict
+
 def slotty(obj): return '__dict__' not in dir(obj)
 
 def assert_slotty(cls):
     assert slotty(cls.__new__(cls)), \
            'The class "%s" is expected to be "slotted class"' % str(cls)
 
+class cached_slot(object):
+    '''cached_property for slotted classes, values are kept in a dict in slot "_cache" of the instance'''
+    __slots__ = 'f', 'name'
+    def __init__(self, f):
+        self.f = f
+        self.name = None
+    def __set_name__(self, owner, name): self.name = name
+    def __get__(self, obj, cls=None):
+        if obj is None: return self
+        try:
+            cache = obj._cache
+        except AttributeError:
+            cache = obj._cache = {}
+        try:
+            return cache[self.name]
+        except KeyError:
+            v = cache[self.name] = self.f(obj)
+            return v
+
 def local_filename(name, ref=None):
     import sys
     import os.path
@@ -49,3 +71,51 @@ def assure_singularity(size):
 
 def SHOULD_NOT_REACH_HERE(msg=''):
     raise AssertionError('Should not reach here' + ((' >>> ' + msg) if msg else ''))
+
+class LruCache(object):
+    '''A bounded thread-safe mapping which evicts the least recently used items'''
+    def __init__(self, maxsize):
+        if maxsize < 1: raise ValueError('maxsize must be positive (maxsize=%s)' % repr(maxsize))
+        self.maxsize = maxsize
+        self.items = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+    def __len__(self): return len(self.items)
+    def __contains__(self, key): return key in self.items
+    def get(self, key, default=None):
+        with self.lock:
+            try:
+                value = self.items[key]
+            except KeyError:
+                self.misses += 1
+                return default
+            self.items.move_to_end(key)
+            self.hits += 1
+            return value
+    def put(self, key, value):
+        with self.lock:
+            self.items[key] = value
+            self.items.move_to_end(key)
+            while len(self.items) > self.maxsize:
+                self.items.popitem(last=False)
+                self.evictions += 1
+    def get_or_create(self, key, factory):
+        '''return cached value of key, or cache and return factory(key) when not found'''
+        value = self.get(key, NotImplemented)
+        if value is NotImplemented:
+            value = factory(key)
+            self.put(key, value)
+        return value
+    def clear(self):
+        with self.lock:
+            self.items.clear()
+            self.hits = self.misses = self.evictions = 0
+    def stats(self):
+        return dict(
+            hits=self.hits,
+            misses=self.misses,
+            evictions=self.evictions,
+            size=len(self.items),
+            maxsize=self.maxsize)